@@ -6,8 +6,13 @@
 #   from the shared ``AudioRecorder``.  When a queue is supplied the class will
 #   consume PCM frames from that queue and forward them to Azure via a
 #   ``PushAudioInputStream``.  This allows all engines (Wav2Vec2 + Azure) to use
-#   the same microphone source.
+#   the same microphone source.  One shared ``push_feeder`` thread writes the
+#   frames of all recognizers in coalesced blocks.
 # – Event-based wait on stop() to capture final results
+# – ``use_lease`` swaps in a pre-connected recognizer from a pool (see
+#   webapp/backend/azure_pool.py) instead of building one per recording
+# – ``derive_plain`` lets the evaluator also fill the ``azure_plain`` results,
+#   so a single recognizer stream serves both (see AZURE_PLAIN_PASS)
 # ---------------------------------------------------------------------------
 import os
 import json
@@ -20,6 +25,8 @@ import azure.cognitiveservices.speech as speechsdk
 from rich.console import Console
 from rich.panel import Panel
 
+from push_feeder import feeder
+
 console = Console()
 
 
@@ -36,6 +43,7 @@ class AzurePronunciationEvaluator:
         audio_queue: queue.Queue | None = None,
         sample_rate: int = 16000,
         timeline=None,
+        derive_plain: bool = False,
     ):
         """Pronunciation assessment via Azure.
 
@@ -55,6 +63,10 @@ class AzurePronunciationEvaluator:
             microphone recording.
         sample_rate:
             Sample rate of the audio in ``audio_queue``.
+        derive_plain:
+            Also fill ``results["azure_plain"]`` from the recognized text of
+            this session instead of running an :class:`AzurePlainTranscriber`.
+            Note the text is biased towards the reference sentence.
         """
 
         load_dotenv()
@@ -68,7 +80,9 @@ class AzurePronunciationEvaluator:
         self.audio_queue = audio_queue
         self.sample_rate = sample_rate
         self.timeline = timeline
-        self._feed_thread = None
+        self.derive_plain = derive_plain
+        self._lease = None
+        self._feed = None
         self._push_stream = None
         self.bytes_pushed = 0
         self._event_counts = {"recognizing": 0, "recognized": 0, "canceled": 0}
@@ -129,27 +143,55 @@ class AzurePronunciationEvaluator:
                 "word_timings": [],
                 "pronunciation_scores": {}
             }
+            if self.derive_plain:
+                self.results["azure_plain"] = {
+                    "final_transcript": None,
+                    "interim_transcripts": []
+                }
 
         if self.timeline is not None and "azure_constructed" not in getattr(self.timeline, "_marks", {}):
             self.timeline.mark("azure_constructed")
 
     # ------------------------------------------------------------------ internal
-    def _feed_audio(self):
-        """Forward PCM frames from ``audio_queue`` into Azure."""
+    def _start_feed(self):
+        """Forward PCM frames from ``audio_queue`` into Azure (shared feeder)."""
         if self._push_stream is None or self.audio_queue is None:
+            return None
+        return feeder.attach(
+            self.audio_queue,
+            self._push_stream,
+            sample_rate=self.sample_rate,
+            on_write=self._on_write,
+        )
+
+    def _on_write(self, nbytes: int):
+        if self.timeline is not None and "azure_first_write" not in getattr(self.timeline, "_marks", {}):
+            self.timeline.mark("azure_first_write")
+        self.bytes_pushed += nbytes
+
+    def _plain_interim(self, text: str):
+        """Mirror an interim hypothesis into ``results["azure_plain"]``."""
+        if not self.derive_plain or self.results is None:
             return
-        while True:
-            pcm = self.audio_queue.get()
-            if pcm is None:
-                break
-            try:
-                data = pcm.tobytes()
-                if self.timeline is not None and "azure_first_write" not in getattr(self.timeline, "_marks", {}):
-                    self.timeline.mark("azure_first_write")
-                self.bytes_pushed += len(data)
-                self._push_stream.write(data)
-            except Exception:
-                break
+        plain = self.results.get("azure_plain")
+        if isinstance(plain, dict):
+            plain["interim_transcripts"].append({
+                "text": text,
+                "timestamp": datetime.now(timezone.utc).isoformat()
+            })
+
+    def _plain_final(self, text: str):
+        """Mirror a recognized phrase into ``results["azure_plain"]``."""
+        if not self.derive_plain or self.results is None:
+            return
+        plain = self.results.get("azure_plain")
+        if not isinstance(plain, dict):
+            plain = self.results["azure_plain"] = {
+                "final_transcript": None,
+                "interim_transcripts": []
+            }
+        prev = plain.get("final_transcript")
+        plain["final_transcript"] = f"{prev} {text}".strip() if prev else text
 
     # ------------------------------------------------------------------ callbacks
     def _on_interim(self, evt):
@@ -159,6 +201,7 @@ class AzurePronunciationEvaluator:
         if self.timeline is not None and "azure_handshake_first_event" not in getattr(self.timeline, "_marks", {}):
             self.timeline.mark("azure_handshake_first_event")
         console.print(f"[yellow][Azure Pron interim][/yellow] {evt.result.text}", end="\r")
+        self._plain_interim(evt.result.text)
 
     def _on_final(self, evt):
         if self._turn_id is None:
@@ -175,6 +218,7 @@ class AzurePronunciationEvaluator:
             self.results["azure_pronunciation"]["final_transcript"] = f"{prev} {text}".strip()
         else:
             self.results["azure_pronunciation"]["final_transcript"] = text
+        self._plain_final(text)
 
         raw_json = evt.result.properties.get(
             speechsdk.PropertyId.SpeechServiceResponse_JsonResult
@@ -236,6 +280,8 @@ class AzurePronunciationEvaluator:
         if not self.realtime or self._running:
             return
         self._attach_handlers_once()
+        if self._lease is not None:
+            self._lease.started = True
         self.recognizer.start_continuous_recognition()
         self._running = True
 
@@ -249,17 +295,16 @@ class AzurePronunciationEvaluator:
     def start(self):
         if not self.realtime:
             return
-        if self.audio_queue is not None and (self._feed_thread is None or not self._feed_thread.is_alive()):
-            self._feed_thread = threading.Thread(target=self._feed_audio, daemon=True)
-            self._feed_thread.start()
-            console.log("[Azure Pron] feed thread started")
+        if self.audio_queue is not None and (self._feed is None or not self._feed.is_alive()):
+            self._feed = self._start_feed()
+            console.log("[Azure Pron] feed started")
         self.start_if_needed()
 
     def stop(self, timeout: float | None = None):
         if not self.realtime:
             return
-        if self._feed_thread is not None:
-            self._feed_thread.join()
+        if self._feed is not None:
+            self._feed.join()
         self.stop_if_needed()
         self._done_event.wait(timeout=timeout)
         console.log(
@@ -343,22 +388,60 @@ class AzurePronunciationEvaluator:
         self._attach_handlers_once()
 
         console.log("[Azure Pron] reset_stream: new push stream")
+        self._restart_feed(old_q)
+
+    def use_lease(self, lease, audio_queue: queue.Queue, sample_rate: int = 16000):
+        """Record the next turn on a pre-connected recognizer from a pool.
+
+        ``lease`` already carries the push stream, the recognizer with the
+        pronunciation config for its sentence applied, and forwards the
+        recognizer events to this evaluator.  Hand it back with
+        :meth:`release_lease` once the turn is over.
+        """
+        self.release_lease()
+        old_q = getattr(self, "audio_queue", None)
+        self.audio_queue = audio_queue
+        self.sample_rate = sample_rate
+        self.bytes_pushed = 0
+        self._event_counts = {"recognizing": 0, "recognized": 0, "canceled": 0}
+
+        self._lease = lease
+        lease.owner = self
+        self.reference_text = lease.reference_text
+        self.pa_cfg = lease.pa_cfg
+        self._push_stream = lease.push_stream
+        self.recognizer = lease.recognizer
+        self._handlers_attached = True
+        self._running = False
+        self._done_event.clear()
+        self._restart_feed(old_q)
 
-        if self._feed_thread is not None and self._feed_thread.is_alive():
+    def release_lease(self):
+        """Give a recognizer borrowed with :meth:`use_lease` back to its pool."""
+        lease, self._lease = self._lease, None
+        if lease is None:
+            return
+        lease.owner = None
+        self._running = False
+        self._done_event.set()
+        lease.release()
+
+    def _restart_feed(self, old_q: queue.Queue | None):
+        if self._feed is not None and self._feed.is_alive():
             try:
                 if old_q is not None:
                     old_q.put_nowait(None)
             except Exception:
                 pass
-            self._feed_thread.join()
-        self._feed_thread = threading.Thread(target=self._feed_audio, daemon=True)
-        self._feed_thread.start()
+            self._feed.join()
+        self._feed = self._start_feed()
 
     def process_file(self, wav_path: str):
         """Run pronunciation assessment on a saved WAV."""
         if os.path.getsize(wav_path) == 0:
             if self.results is not None:
                 self.results["azure_pronunciation"]["final_transcript"] = ""
+                self._plain_final("")
             return
         audio_config = speechsdk.audio.AudioConfig(filename=wav_path)
         recognizer = speechsdk.SpeechRecognizer(
@@ -374,6 +457,7 @@ class AzurePronunciationEvaluator:
                 self.results["azure_pronunciation"]["final_transcript"] = f"{prev} {result.text}".strip()
             else:
                 self.results["azure_pronunciation"]["final_transcript"] = result.text
+            self._plain_final(result.text)
 
         raw_json = result.properties.get(
             speechsdk.PropertyId.SpeechServiceResponse_JsonResult
@@ -441,7 +525,7 @@ class AzurePlainTranscriber:
         self.sample_rate = sample_rate
         self.timeline = timeline
         self._push_stream = None
-        self._feed_thread = None
+        self._feed = None
         self.bytes_pushed = 0
         self._event_counts = {"recognizing": 0, "recognized": 0, "canceled": 0}
         self._handlers_attached = False
@@ -480,21 +564,21 @@ class AzurePlainTranscriber:
             self.timeline.mark("azure_constructed")
 
     # ------------------------------------------------------------------ internal
-    def _feed_audio(self):
+    def _start_feed(self):
+        """Forward PCM frames from ``audio_queue`` into Azure (shared feeder)."""
         if self._push_stream is None or self.audio_queue is None:
-            return
-        while True:
-            pcm = self.audio_queue.get()
-            if pcm is None:
-                break
-            try:
-                data = pcm.tobytes()
-                if self.timeline is not None and "azure_first_write" not in getattr(self.timeline, "_marks", {}):
-                    self.timeline.mark("azure_first_write")
-                self.bytes_pushed += len(data)
-                self._push_stream.write(data)
-            except Exception:
-                break
+            return None
+        return feeder.attach(
+            self.audio_queue,
+            self._push_stream,
+            sample_rate=self.sample_rate,
+            on_write=self._on_write,
+        )
+
+    def _on_write(self, nbytes: int):
+        if self.timeline is not None and "azure_first_write" not in getattr(self.timeline, "_marks", {}):
+            self.timeline.mark("azure_first_write")
+        self.bytes_pushed += nbytes
 
     # ------------------------------------------------------------------ callbacks
     def _on_interim(self, evt):
@@ -560,17 +644,16 @@ class AzurePlainTranscriber:
     def start(self):
         if not self.realtime:
             return
-        if self.audio_queue is not None and (self._feed_thread is None or not self._feed_thread.is_alive()):
-            self._feed_thread = threading.Thread(target=self._feed_audio, daemon=True)
-            self._feed_thread.start()
-            console.log("[Azure Plain] feed thread started")
+        if self.audio_queue is not None and (self._feed is None or not self._feed.is_alive()):
+            self._feed = self._start_feed()
+            console.log("[Azure Plain] feed started")
         self.start_if_needed()
 
     def stop(self, timeout: float | None = None):
         if not self.realtime:
             return
-        if self._feed_thread is not None:
-            self._feed_thread.join()
+        if self._feed is not None:
+            self._feed.join()
         self.stop_if_needed()
         self._done_event.wait(timeout=timeout)
         console.log(
@@ -645,12 +728,11 @@ class AzurePlainTranscriber:
 
         console.log("[Azure Plain] reset_stream: new push stream")
 
-        if self._feed_thread is not None and self._feed_thread.is_alive():
+        if self._feed is not None and self._feed.is_alive():
             try:
                 if old_q is not None:
                     old_q.put_nowait(None)
             except Exception:
                 pass
-            self._feed_thread.join()
-        self._feed_thread = threading.Thread(target=self._feed_audio, daemon=True)
-        self._feed_thread.start()
+            self._feed.join()
+        self._feed = self._start_feed()
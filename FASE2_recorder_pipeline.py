@@ -16,22 +16,15 @@ import time, uuid, json, os
 from datetime import datetime, timezone
 from typing import Dict, Any, Optional, Callable, Tuple
 import threading
-import queue
 
 import sounddevice as sd
+import soundfile as sf
 from rich.console import Console
 from rich.panel import Panel
 
 # Existing engine modules
 from FASE2_audio import AudioRecorder, flush_audio_queue          # sentinel already handled
-from FASE2_wav2vec2_process import (
-    Wav2Vec2PhonemeExtractor,
-    Wav2Vec2Transcriber,
-)
-from FASE2_azure_process import (
-    AzurePronunciationEvaluator,
-    AzurePlainTranscriber,
-)
+import engines
 
 from phonemizer import phonemize
 
@@ -51,7 +44,10 @@ class RecorderPipeline:
 
     The realtime behavior of each engine can be configured via ``rt_flags``.
     Pass a dict like ``{"azure_pron": False, "w2v2_phonemes": True}`` to
-    override the default environment-variable driven settings.
+    override the default environment-variable driven settings.  The engines
+    themselves come from the registry in ``engines.py``; with
+    ``derive_plain`` the Azure plain transcript is taken from the
+    pronunciation recognizer instead of a second Azure stream.
     """
 
     def __init__(self,
@@ -60,7 +56,8 @@ class RecorderPipeline:
                  language: str = "nl-NL",
                  rt_flags: Optional[Dict[str, bool]] = None,
                  *,
-                 use_push_to_azure: bool = False):
+                 use_push_to_azure: bool = False,
+                 derive_plain: bool = False):
 
         # Pick best available sample rate if not supplied
         if sample_rate is None:
@@ -79,6 +76,7 @@ class RecorderPipeline:
         self.language = language
         self._ph_cache: dict[str, dict[str, str]] = {}
         self.use_push_to_azure = use_push_to_azure
+        self.derive_plain = derive_plain
 
         def _env_flag(key: str, default: str = "true") -> bool:
             return os.getenv(key, default).lower() in ("1", "true", "yes", "on")
@@ -113,18 +111,6 @@ class RecorderPipeline:
         session_id = str(uuid.uuid4())
         start_time_iso = datetime.now(timezone.utc).isoformat()
 
-        # Dedicated audio queues so each engine receives the full stream
-        phon_q = queue.Queue()
-        asr_q = queue.Queue()
-        audio_queues = [phon_q, asr_q]
-        azure_pron_q = azure_plain_q = None
-        if self.use_push_to_azure and self.rt_flags["azure_pron"]:
-            azure_pron_q = queue.Queue()
-            audio_queues.append(azure_pron_q)
-        if self.use_push_to_azure and self.rt_flags["azure_plain"]:
-            azure_plain_q = queue.Queue()
-            audio_queues.append(azure_plain_q)
-        flush_audio_queue(audio_queues)
         # ---------- shared results dict ----------------------------------
         results: Dict[str, Any] = {
             "session_id": session_id,
@@ -143,43 +129,25 @@ class RecorderPipeline:
             }
         }
 
-        engine_times: Dict[str, Dict[str, float]] = {
-            "azure_pron": {},
-            "azure_plain": {},
-            "w2v2_phonemes": {},
-            "w2v2_asr": {},
-        }
-
-        # ---------- create engine threads --------------------------------
-        azure_pron = AzurePronunciationEvaluator(
-            reference_text,
-            results=results,
-            realtime=self.rt_flags["azure_pron"],
-            audio_queue=azure_pron_q,
-            sample_rate=self.sample_rate,
+        # ---------- create engines (see engines.py) ----------------------
+        plans = engines.scheduler.plan(
+            {name: {"realtime": flag} for name, flag in self.rt_flags.items()},
+            realtime=True,
+            derive=self.derive_plain,
         )
-        azure_plain = AzurePlainTranscriber(
-            language=self.language,
-            results=results,
-            realtime=self.rt_flags["azure_plain"],
-            audio_queue=azure_plain_q,
-            sample_rate=self.sample_rate,
-        )
-
-        extractor_phonemes = Wav2Vec2PhonemeExtractor(
-            sample_rate=self.sample_rate,
-            chunk_duration=self.chunk_duration,
-            results=results,
-            realtime=self.rt_flags["w2v2_phonemes"],
-            audio_queue=phon_q,
-        )
-        extractor_text = Wav2Vec2Transcriber(
+        ctx = engines.EngineContext(
             sample_rate=self.sample_rate,
             chunk_duration=self.chunk_duration,
-            results=results,
-            realtime=self.rt_flags["w2v2_asr"],
-            audio_queue=asr_q,
+            language=self.language,
+            push_stream=self.use_push_to_azure,
         )
+        active = engines.build(plans, ctx)
+        for engine in active.values():
+            engine.start(results, session_id)
+
+        # Dedicated audio queues so each realtime engine receives the full stream
+        audio_queues = [e.queue for e in active.values() if e.queue is not None]
+        flush_audio_queue(audio_queues)
 
         recorder = AudioRecorder(
             sample_rate=self.sample_rate,
@@ -188,20 +156,6 @@ class RecorderPipeline:
             use_vad=False,          # you can expose this as parameter later
             audio_queue=audio_queues,
         )
-
-        # ---------- start threads ----------------------------------------
-        if azure_pron.realtime:
-            engine_times["azure_pron"]["start"] = time.perf_counter()
-            azure_pron.start()
-        if azure_plain.realtime:
-            engine_times["azure_plain"]["start"] = time.perf_counter()
-            azure_plain.start()
-        if extractor_phonemes.realtime:
-            engine_times["w2v2_phonemes"]["start"] = time.perf_counter()
-            extractor_phonemes.start()
-        if extractor_text.realtime:
-            engine_times["w2v2_asr"]["start"] = time.perf_counter()
-            extractor_text.start()
         recorder.start()
 
         # filename now known
@@ -230,102 +184,29 @@ class RecorderPipeline:
             filler_cb(reference_text, t_stop_press) if filler_cb else None
         )
 
-        # ---------- shutdown order ---------------------------------------
-        offline_threads = []
-
-        if extractor_phonemes.realtime:
-            # Do not call stop(); the AudioRecorder places a sentinel `None`
-            # in the queue, which naturally lets the thread finish
-            # processing any remaining audio before exiting. Calling
-            # `stop()` here can interrupt that draining and result in
-            # empty outputs.  We simply join the thread to wait for
-            # completion.
-            extractor_phonemes.join()
-            engine_times["w2v2_phonemes"]["end"] = time.perf_counter()
-        else:
-            def _do_phon():
-                extractor_phonemes.process_file(recorder.filename)
-            if parallel_offline:
-                engine_times["w2v2_phonemes"]["start"] = time.perf_counter()
-                def _wrap():
-                    _do_phon()
-                    engine_times["w2v2_phonemes"]["end"] = time.perf_counter()
-                t = threading.Thread(target=_wrap)
-                t.start()
-                offline_threads.append(t)
-            else:
-                engine_times["w2v2_phonemes"]["start"] = time.perf_counter()
-                _do_phon()
-                engine_times["w2v2_phonemes"]["end"] = time.perf_counter()
-
-        if extractor_text.realtime:
-            # Same reasoning as above: allow the transcriber thread to
-            # consume the final queue sentinel and flush its buffer
-            # before finishing.
-            extractor_text.join()
-            engine_times["w2v2_asr"]["end"] = time.perf_counter()
-        else:
-            def _do_asr():
-                extractor_text.process_file(recorder.filename)
-            if parallel_offline:
-                engine_times["w2v2_asr"]["start"] = time.perf_counter()
-                def _wrap():
-                    _do_asr()
-                    engine_times["w2v2_asr"]["end"] = time.perf_counter()
-                t = threading.Thread(target=_wrap)
-                t.start()
-                offline_threads.append(t)
-            else:
-                engine_times["w2v2_asr"]["start"] = time.perf_counter()
-                _do_asr()
-                engine_times["w2v2_asr"]["end"] = time.perf_counter()
-
-        if azure_pron.realtime:
-            azure_pron.stop()
-            engine_times["azure_pron"]["end"] = time.perf_counter()
-        else:
-            def _do_pron():
-                azure_pron.process_file(recorder.filename)
-            if parallel_offline:
-                engine_times["azure_pron"]["start"] = time.perf_counter()
-                def _wrap():
-                    _do_pron()
-                    engine_times["azure_pron"]["end"] = time.perf_counter()
-                t = threading.Thread(target=_wrap)
-                t.start()
-                offline_threads.append(t)
-            else:
-                engine_times["azure_pron"]["start"] = time.perf_counter()
-                _do_pron()
-                engine_times["azure_pron"]["end"] = time.perf_counter()
-
-        if azure_plain.realtime:
-            azure_plain.stop()
-            engine_times["azure_plain"]["end"] = time.perf_counter()
-        else:
-            def _do_plain():
-                azure_plain.process_file(recorder.filename)
-            if parallel_offline:
-                engine_times["azure_plain"]["start"] = time.perf_counter()
-                def _wrap():
-                    _do_plain()
-                    engine_times["azure_plain"]["end"] = time.perf_counter()
-                t = threading.Thread(target=_wrap)
-                t.start()
-                offline_threads.append(t)
-            else:
-                engine_times["azure_plain"]["start"] = time.perf_counter()
-                _do_plain()
-                engine_times["azure_plain"]["end"] = time.perf_counter()
-
-        for t in offline_threads:
-            t.join()
+        # ---------- finalize ---------------------------------------------
+        # Realtime engines drain their queues (the recorder already placed
+        # the end sentinel); offline engines run on the saved WAV.
+        try:
+            audio_seconds = sf.info(recorder.filename).duration
+        except Exception:
+            audio_seconds = None
+        report = engines.scheduler.finalize(
+            plans,
+            active,
+            results,
+            wav_path=recorder.filename,
+            audio_seconds=audio_seconds,
+            parallel=parallel_offline,
+        )
+        for engine in active.values():
+            engine.shutdown()
 
         results["end_time"] = datetime.now(timezone.utc).isoformat()
         results["timing"] = {
             "stop_press": t_stop_press,                  # moment Ctrl+C or auto-stop
             "json_ready": time.perf_counter(),           # END of stop→JSON interval
-            "engines": engine_times,
+            "engines": report,
         }
         
         # ─── Print the full JSON to the console ───────────────
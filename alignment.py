@@ -0,0 +1,137 @@
+"""
+alignment.py
+------------
+Word alignment of transcripts against the reference sentence and a quick
+local verdict built on it.
+
+Usage:
+    ops = align(["de", "maan"], ["de", "man"])
+    verdict = local_verdict(req)   # req is a TutorRequest
+
+``local_verdict`` follows steps 1-2 of the decision tree in
+``prompt_template.md``: a word counts as wrong when every transcript shows
+the same error, or when one transcript and the Azure pronunciation flag agree.
+When the evidence is mixed the verdict is ``None`` and GPT decides.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Sequence, Tuple
+
+from tutor_schema import TutorRequest
+
+# ErrorItem.issue values used by the tutor prompt
+ISSUES = {"substitution": "mispronunciation", "omission": "omission", "insertion": "insertion"}
+
+
+@dataclass(frozen=True)
+class WordOp:
+    op: str  # "match" | "substitution" | "omission" | "insertion"
+    expected: str | None
+    heard: str | None
+    # Reference position; insertions use the index of the next reference word.
+    ref_index: int
+
+
+@dataclass
+class LocalVerdict:
+    correct: bool | None  # ``None``: unsure, wait for GPT
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+    suspects: List[str] = field(default_factory=list)
+
+
+def align(reference: Sequence[str], heard: Sequence[str]) -> List[WordOp]:
+    """Minimum edit-distance word alignment (Levenshtein with backtrace)."""
+    n, m = len(reference), len(heard)
+    cost = [[0] * (m + 1) for _ in range(n + 1)]
+    for i in range(1, n + 1):
+        cost[i][0] = i
+    for j in range(1, m + 1):
+        cost[0][j] = j
+    for i in range(1, n + 1):
+        for j in range(1, m + 1):
+            sub = cost[i - 1][j - 1] + (reference[i - 1] != heard[j - 1])
+            cost[i][j] = min(sub, cost[i - 1][j] + 1, cost[i][j - 1] + 1)
+
+    ops: List[WordOp] = []
+    i, j = n, m
+    while i or j:
+        if i and j and cost[i][j] == cost[i - 1][j - 1] + (reference[i - 1] != heard[j - 1]):
+            kind = "match" if reference[i - 1] == heard[j - 1] else "substitution"
+            ops.append(WordOp(kind, reference[i - 1], heard[j - 1], i - 1))
+            i, j = i - 1, j - 1
+        elif i and cost[i][j] == cost[i - 1][j] + 1:
+            ops.append(WordOp("omission", reference[i - 1], None, i - 1))
+            i -= 1
+        else:
+            ops.append(WordOp("insertion", None, heard[j - 1], i))
+            j -= 1
+    ops.reverse()
+    return ops
+
+
+def mismatches(reference: Sequence[str], heard: Sequence[str]) -> List[WordOp]:
+    return [op for op in align(reference, heard) if op.op != "match"]
+
+
+def _flagged(reference: List[str], pron: Dict[str, Any]) -> set[int]:
+    """Reference indices Azure pronunciation assessment flagged."""
+    timings = pron.get("word_timings") or []
+    words = [str(w.get("word", "")).lower() for w in timings]
+    flagged = set()
+    pos = 0
+    for op in align(reference, words):
+        if op.op == "insertion":
+            pos += 1
+            continue
+        if op.op == "omission":
+            continue
+        if timings[pos].get("error_type") not in (None, "None"):
+            flagged.add(op.ref_index)
+        pos += 1
+    return flagged
+
+
+def _key(op: WordOp) -> Tuple[str, int]:
+    return (op.op, op.ref_index)
+
+
+def local_verdict(req: TutorRequest) -> LocalVerdict:
+    """Quick verdict from the transcripts and pronunciation flags in ``req``."""
+    reference = req.reference_text.split()
+    transcripts = [
+        t.split()
+        for t in (
+            (req.azure.get("plain") or {}).get("final_transcript"),
+            req.wav2vec2.get("asr"),
+        )
+        if isinstance(t, str) and t.strip()
+    ]
+    if not reference or not transcripts:
+        return LocalVerdict(None)
+
+    per_source = [{_key(op): op for op in mismatches(reference, t)} for t in transcripts]
+    flagged = _flagged(reference, req.azure.get("pronunciation") or {})
+
+    if not any(per_source) and not flagged:
+        return LocalVerdict(True)
+
+    consensus = set.intersection(*(set(s) for s in per_source))
+    corroborated = {k for s in per_source for k in s if k[1] in flagged}
+    confirmed = consensus | corroborated
+    suspects = sorted(
+        {op.expected or op.heard for s in per_source for op in s.values()}
+        | {reference[i] for i in flagged}
+    )
+    if not confirmed:
+        return LocalVerdict(None, suspects=suspects)
+
+    ops = sorted(
+        {k: s[k] for s in per_source for k in s if k in confirmed}.values(),
+        key=lambda op: op.ref_index,
+    )
+    errors = [
+        {"word": op.expected, "heard_word": op.heard, "issue": ISSUES[op.op]} for op in ops
+    ]
+    return LocalVerdict(False, errors, suspects)
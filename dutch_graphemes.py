@@ -0,0 +1,80 @@
+"""
+dutch_graphemes.py
+------------------
+Dutch grapheme inventory and word segmentation, shared by the webapp
+backend (decodability checks, word bank) and ``phoneme_diff``.
+
+Usage:
+    segment("school")   # ("sch", "oo", "l")
+    pattern("maan")     # "CVC"
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+
+# Canonical Dutch grapheme inventory used for decodability checks.
+# Include multi-letter vowel groups and consonant clusters that function as a unit.
+DUTCH_MULTI_GRAPHEMES: list[str] = [
+    # long/double vowels & common digraphs
+    "aa",
+    "ee",
+    "oo",
+    "uu",
+    "ij",
+    "ei",
+    "ie",
+    "ou",
+    "au",
+    "ui",
+    "eu",
+    "oe",
+    # complex clusters and endings
+    "ng",
+    "nk",
+    "ch",
+    "sch",
+    # vowel triphthongs/groups introduced later in Start
+    "aai",
+    "ooi",
+    "oei",
+    # -uw families
+    "uw",
+    "ieuw",
+    "eeuw",
+]
+
+# Graphemes that count as ``V`` in a word pattern; ``-`` stays ``-`` and
+# everything else is ``C`` (same as frontend-react/src/lib/decodability.ts).
+VOWEL_GRAPHEMES: frozenset[str] = frozenset(
+    ["a", "e", "i", "o", "u"]
+    + [g for g in DUTCH_MULTI_GRAPHEMES if g not in {"ng", "nk", "ch", "sch"}]
+)
+
+# Longest first so "sch" wins over "ch" and "ieuw" over "ie".
+_BY_LENGTH = sorted(DUTCH_MULTI_GRAPHEMES, key=len, reverse=True)
+
+
+@lru_cache(maxsize=20000)
+def segment(word: str) -> tuple[str, ...]:
+    """Split ``word`` into graphemes, preferring the longest multi-letter match."""
+    w = word.lower()
+    out: list[str] = []
+    i = 0
+    while i < len(w):
+        for g in _BY_LENGTH:
+            if w.startswith(g, i):
+                out.append(g)
+                i += len(g)
+                break
+        else:
+            out.append(w[i])
+            i += 1
+    return tuple(out)
+
+
+def pattern(word: str) -> str:
+    """C/V pattern of ``word``, e.g. ``"maan"`` -> ``"CVC"``."""
+    return "".join(
+        "V" if g in VOWEL_GRAPHEMES else "-" if g == "-" else "C" for g in segment(word)
+    )
@@ -0,0 +1,627 @@
+"""
+engines.py
+----------
+Registry of the analysis engines plus a deadline scheduler that runs them.
+
+Usage:
+    plans = scheduler.plan(settings, realtime=True)
+    active = build(plans, EngineContext(sample_rate=16000))
+    for engine in active.values():
+        engine.start(results, turn_id)       # new recording
+    ...                                      # engine.feed(pcm) per int16 frame
+    report = scheduler.finalize(plans, active, results,
+                                wav_path=wav, audio_seconds=3.2)
+
+``settings`` maps engine names to optional ``enabled``, ``realtime`` and
+``budget`` overrides (``config.ENGINES`` in the webapp).  Every
+:class:`EngineSpec` carries a cost estimate (seconds of processing per second
+of audio when run on the WAV file) and a latency budget (seconds after the
+end of the audio).  The scheduler derives results that another engine
+already produces, skips optional offline engines whose estimate exceeds
+their budget, finalizes all engines in parallel and gives up on each one at
+its deadline; required engines running on the WAV file are always
+awaited.  Cost estimates are refined from observed runs.
+
+Adding an engine takes an :class:`Engine` adapter and a :func:`register`
+call; the realtime session, the upload pipeline and ``RecorderPipeline`` pick
+it up from the registry.
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Tuple
+
+from rich.console import Console
+
+console = Console()
+
+
+def _remaining(deadline: float) -> float:
+    return max(0.0, deadline - time.monotonic())
+
+
+@dataclass
+class EngineContext:
+    """Session-wide settings the adapters are built with."""
+
+    sample_rate: int = 16000
+    chunk_duration: float = 10
+    language: str = "nl-NL"
+    # Azure gets the shared audio through push streams, else its own microphone
+    push_stream: bool = True
+    # Start Azure recognition in a background thread instead of in start()
+    async_start: bool = False
+    # ``lease(sentence, sample_rate)`` lends a pre-connected Azure recognizer
+    lease: Callable[[str, int], Any] | None = None
+    timeline: Any = None
+
+
+@dataclass(frozen=True)
+class EngineSpec:
+    name: str
+    # Keys of the results dict this engine fills
+    result_keys: Tuple[str, ...]
+    factory: Callable[["Plan", EngineContext], "Engine"]
+    # Seconds of processing per second of audio when run on the WAV file
+    cost: float
+    # Seconds after the end of the audio before its result is given up on
+    budget: float
+    # Never skipped because of its cost estimate, nor given up on offline
+    required: bool = False
+    # Engine whose results include this engine's as a by-product
+    derivable_from: str | None = None
+
+
+@dataclass
+class Plan:
+    spec: EngineSpec
+    mode: str  # "realtime", "offline", "derived" or "skipped"
+    budget: float
+    # Also fill the results of the engines derived from this one
+    derive: bool = False
+    reason: str = ""
+
+    @property
+    def runs(self) -> bool:
+        return self.mode in ("realtime", "offline")
+
+
+class Engine(ABC):
+    """Common life cycle of an analysis engine.
+
+    ``start`` prepares a recording that writes into ``results`` (resetting
+    the engine's entries to :meth:`empty`), ``feed``
+    passes int16 frames to realtime engines, ``finalize`` ends the audio and
+    waits for the last result until ``deadline`` (``time.monotonic``), and
+    ``process_file`` analyses a WAV file into ``results`` (offline mode).
+    """
+
+    def __init__(self, plan: Plan, ctx: EngineContext) -> None:
+        self.plan = plan
+        self.spec = plan.spec
+        self.ctx = ctx
+        self.realtime = plan.mode == "realtime"
+        self.queue: queue.Queue | None = None
+
+    @property
+    def name(self) -> str:
+        return self.spec.name
+
+    @abstractmethod
+    def empty(self) -> Dict[str, Any]:
+        """Fresh result entries of this engine."""
+
+    @abstractmethod
+    def start(self, results: Dict[str, Any], turn_id: str) -> None:
+        """Prepare a new recording that writes into ``results``."""
+
+    def feed(self, pcm) -> None:
+        if self.queue is not None:
+            self.queue.put(pcm)
+
+    def finalize(self, deadline: float) -> bool:
+        return True
+
+    @abstractmethod
+    def process_file(self, wav_path: str, results: Dict[str, Any]) -> None:
+        """Analyse ``wav_path`` into ``results``."""
+
+    def shutdown(self) -> None:
+        pass
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Wav2Vec2
+# ─────────────────────────────────────────────────────────────────────────────
+class _Wav2Vec2Engine(Engine):
+    ready_mark = ""
+
+    def __init__(self, plan: Plan, ctx: EngineContext) -> None:
+        super().__init__(plan, ctx)
+        self.thread = self._new_thread()
+
+    @abstractmethod
+    def _engine_class(self):
+        """Thread class from ``FASE2_wav2vec2_process``."""
+
+    def _new_thread(self):
+        thread = self._engine_class()(
+            sample_rate=self.ctx.sample_rate,
+            chunk_duration=self.ctx.chunk_duration,
+            results=None,
+            realtime=self.realtime,
+            audio_queue=queue.Queue(),
+            timeline=self.ctx.timeline,
+        )
+        if self.realtime:
+            thread.start()
+        return thread
+
+    def empty(self) -> Dict[str, Any]:
+        return {self.spec.result_keys[0]: []}
+
+    def start(self, results: Dict[str, Any], turn_id: str) -> None:
+        if self.realtime and not self.thread.is_alive():
+            self.thread = self._new_thread()
+        self.thread.timeline = self.ctx.timeline
+        if self.realtime:
+            self.queue = queue.Queue()
+            self.thread.on_new_recording(self.queue)
+        results.update(self.empty())
+        self.thread.results = results
+        if self.ctx.timeline is not None:
+            self.ctx.timeline.mark(self.ready_mark)
+
+    def finalize(self, deadline: float) -> bool:
+        if not self.realtime:
+            return True
+        # The thread flushes its buffer on the boundary and signals eor_event
+        self.queue.put(None)
+        done = self.thread.eor_event.wait(_remaining(deadline))
+        if not done:
+            # Late output of this recording must not land in the results
+            self.thread.results = self.empty()
+        return done
+
+    def process_file(self, wav_path: str, results: Dict[str, Any]) -> None:
+        self.thread.results = results
+        self.thread.process_file(wav_path)
+
+    def shutdown(self) -> None:
+        if self.realtime:
+            self.thread.terminate()
+            self.thread.join()
+
+
+class Wav2Vec2PhonemeEngine(_Wav2Vec2Engine):
+    ready_mark = "w2v2_ready_ph"
+
+    def _engine_class(self):
+        from FASE2_wav2vec2_process import Wav2Vec2PhonemeExtractor
+
+        return Wav2Vec2PhonemeExtractor
+
+
+class Wav2Vec2AsrEngine(_Wav2Vec2Engine):
+    ready_mark = "w2v2_ready_asr"
+
+    def _engine_class(self):
+        from FASE2_wav2vec2_process import Wav2Vec2Transcriber
+
+        return Wav2Vec2Transcriber
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Azure
+# ─────────────────────────────────────────────────────────────────────────────
+class _AzureEngine(Engine):
+    def __init__(self, plan: Plan, ctx: EngineContext) -> None:
+        super().__init__(plan, ctx)
+        self.push = self.realtime and ctx.push_stream
+        # Built on the first start(), when the sentence is known
+        self.recognizer = None
+
+    @abstractmethod
+    def _new(self, sentence: str):
+        """Recognizer for ``sentence``."""
+
+    @abstractmethod
+    def _new_stream(self, sentence: str) -> None:
+        """Point the recognizer at a fresh push stream."""
+
+    def _prepare(self, sentence: str) -> None:
+        pass
+
+    def _release(self) -> None:
+        pass
+
+    def start(self, results: Dict[str, Any], turn_id: str) -> None:
+        sentence = results.get("reference_text") or ""
+        if self.recognizer is None:
+            self.recognizer = self._new(sentence)
+        rec = self.recognizer
+        rec.timeline = self.ctx.timeline
+        results.update(self.empty())
+        if self.push:
+            self.queue = queue.Queue()
+            self._new_stream(sentence)
+        else:
+            self._prepare(sentence)
+        rec.begin_turn(turn_id, results)
+        if self.realtime:
+            self._start_recognition()
+
+    def _start_recognition(self) -> None:
+        rec = self.recognizer
+        if not self.ctx.async_start:
+            rec.start()
+            return
+        timeline = self.ctx.timeline
+
+        def _run():
+            if timeline is not None and "azure_start_called" not in timeline._marks:
+                timeline.mark("azure_start_called")
+            try:
+                rec.start_if_needed()
+            finally:
+                if timeline is not None:
+                    timeline.mark("azure_start_returned")
+
+        threading.Thread(target=_run, daemon=True, name="azure-start").start()
+
+    def finalize(self, deadline: float) -> bool:
+        rec = self.recognizer
+        if not self.realtime or rec is None:
+            return True
+        got = False
+        if self.push:
+            self.queue.put(None)
+            if rec._feed is not None:
+                rec._feed.join(_remaining(deadline))
+            # Half the remaining budget for the final result, the rest for a
+            # forced stop, which also flushes it
+            got = rec.wait_for_final(_remaining(deadline) / 2)
+        if not got:
+            rec.stop_if_needed()
+            rec._done_event.wait(_remaining(deadline))
+            got = rec.wait_for_final(0)
+        rec.end_turn()
+        self._release()
+        return got
+
+    def process_file(self, wav_path: str, results: Dict[str, Any]) -> None:
+        self.recognizer.results = results
+        self.recognizer.process_file(wav_path)
+
+    def shutdown(self) -> None:
+        if self.recognizer is None:
+            return
+        self._release()
+        try:
+            self.recognizer.stop(timeout=1.0)
+        except Exception:
+            pass
+
+
+class AzurePronunciationEngine(_AzureEngine):
+    def _new(self, sentence: str):
+        from FASE2_azure_process import AzurePronunciationEvaluator
+
+        return AzurePronunciationEvaluator(
+            sentence,
+            results=None,
+            realtime=self.realtime,
+            audio_queue=queue.Queue() if self.push else None,
+            sample_rate=self.ctx.sample_rate,
+            timeline=self.ctx.timeline,
+            derive_plain=self.plan.derive,
+        )
+
+    def empty(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {
+            "azure_pronunciation": {
+                "final_transcript": None,
+                "word_timings": [],
+                "pronunciation_scores": {},
+            }
+        }
+        if self.plan.derive:
+            out["azure_plain"] = {"final_transcript": None, "interim_transcripts": []}
+        return out
+
+    def _new_stream(self, sentence: str) -> None:
+        rec, sr = self.recognizer, self.ctx.sample_rate
+        if self.ctx.lease is not None:
+            rec.use_lease(self.ctx.lease(sentence, sr), self.queue, sr)
+        else:
+            rec.update_reference_text(sentence)
+            rec.reset_stream(self.queue, sr)
+
+    def _prepare(self, sentence: str) -> None:
+        if sentence != self.recognizer.reference_text:
+            self.recognizer.update_reference_text(sentence)
+
+    def _release(self) -> None:
+        self.recognizer.release_lease()
+
+
+class AzurePlainEngine(_AzureEngine):
+    def _new(self, sentence: str):
+        from FASE2_azure_process import AzurePlainTranscriber
+
+        return AzurePlainTranscriber(
+            language=self.ctx.language,
+            results=None,
+            realtime=self.realtime,
+            audio_queue=queue.Queue() if self.push else None,
+            sample_rate=self.ctx.sample_rate,
+            timeline=self.ctx.timeline,
+        )
+
+    def empty(self) -> Dict[str, Any]:
+        return {"azure_plain": {"final_transcript": None, "interim_transcripts": []}}
+
+    def _new_stream(self, sentence: str) -> None:
+        self.recognizer.reset_stream(self.queue, self.ctx.sample_rate)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Registry
+# ─────────────────────────────────────────────────────────────────────────────
+SPECS: Dict[str, EngineSpec] = {}
+
+
+def register(spec: EngineSpec) -> EngineSpec:
+    """Add ``spec`` to the engines every pipeline runs."""
+    SPECS[spec.name] = spec
+    return spec
+
+
+register(EngineSpec(
+    "azure_pron", ("azure_pronunciation",), AzurePronunciationEngine,
+    cost=0.6, budget=2.0, required=True,
+))
+register(EngineSpec(
+    "azure_plain", ("azure_plain",), AzurePlainEngine,
+    cost=0.5, budget=2.0, derivable_from="azure_pron",
+))
+register(EngineSpec(
+    "w2v2_phonemes", ("wav2vec2_phonemes",), Wav2Vec2PhonemeEngine,
+    cost=0.3, budget=5.0,
+))
+register(EngineSpec(
+    "w2v2_asr", ("wav2vec2_asr",), Wav2Vec2AsrEngine,
+    cost=0.3, budget=5.0, required=True,
+))
+
+
+def build(
+    plans: Dict[str, Plan],
+    ctx: EngineContext,
+    existing: Dict[str, Engine] | None = None,
+) -> Dict[str, Engine]:
+    """Adapters for the engines in ``plans`` that run.
+
+    Adapters in ``existing`` are reused when their mode still matches;
+    the others are shut down.
+    """
+    existing = dict(existing or {})
+    active: Dict[str, Engine] = {}
+    for name, plan in plans.items():
+        if not plan.runs:
+            continue
+        engine = existing.pop(name, None)
+        if engine is not None and (engine.plan.mode, engine.plan.derive) == (plan.mode, plan.derive):
+            engine.plan = plan
+        else:
+            if engine is not None:
+                engine.shutdown()
+            engine = plan.spec.factory(plan, ctx)
+        active[name] = engine
+    for engine in existing.values():
+        engine.shutdown()
+    return active
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Scheduler
+# ─────────────────────────────────────────────────────────────────────────────
+class Scheduler:
+    """Decide which engines run and wait for each until its deadline."""
+
+    def __init__(self, specs: Dict[str, EngineSpec] = SPECS, alpha: float = 0.2) -> None:
+        self.specs = specs
+        self.alpha = alpha
+        self._lock = threading.Lock()
+        self._cost: Dict[str, float] = {}
+        self.stats: Dict[str, Dict[str, float]] = {}
+
+    def _stat(self, name: str) -> Dict[str, float]:
+        return self.stats.setdefault(
+            name,
+            {"runs": 0, "ok": 0, "timeouts": 0, "errors": 0, "skipped": 0, "derived": 0, "seconds": 0.0},
+        )
+
+    def cost(self, name: str) -> float:
+        """Observed (or else estimated) seconds per second of audio."""
+        with self._lock:
+            return self._cost.get(name, self.specs[name].cost)
+
+    def plan(
+        self,
+        settings: Dict[str, Dict[str, Any]],
+        *,
+        realtime: bool = True,
+        derive: bool = True,
+    ) -> Dict[str, Plan]:
+        """Mode and budget of every registered engine for one session."""
+        plans: Dict[str, Plan] = {}
+        for name, spec in self.specs.items():
+            s = settings.get(name, {})
+            budget = float(s.get("budget", spec.budget))
+            if not s.get("enabled", True):
+                plans[name] = Plan(spec, "skipped", budget, reason="disabled")
+            elif realtime and s.get("realtime", True):
+                plans[name] = Plan(spec, "realtime", budget)
+            else:
+                plans[name] = Plan(spec, "offline", budget)
+        if derive:
+            for plan in plans.values():
+                source = plans.get(plan.spec.derivable_from or "")
+                if plan.runs and source is not None and source.runs:
+                    plan.mode = "derived"
+                    plan.reason = f"from {source.spec.name}"
+                    source.derive = True
+        return plans
+
+    def finalize(
+        self,
+        plans: Dict[str, Plan],
+        engines: Dict[str, Engine],
+        results: Dict[str, Any],
+        *,
+        wav_path: str | None = None,
+        audio_seconds: float | None = None,
+        parallel: bool = True,
+    ) -> Dict[str, Dict[str, Any]]:
+        """End the recording on all engines; keep what arrives in time.
+
+        Realtime engines flush and wait for their last result.  Offline
+        engines process ``wav_path`` into a scratch copy that is merged into
+        ``results`` only when they finish within their budget; they run in
+        parallel unless ``parallel`` is false.  Required offline engines are
+        never given up on: their result is always awaited.  Returns per engine its mode,
+        status (``ok``, ``timeout``, ``error``, ``skipped`` or ``derived``)
+        and start/end ``perf_counter`` times.
+        """
+        t0 = time.monotonic()
+        lock = threading.Lock()
+        report: Dict[str, Dict[str, Any]] = {}
+        realtime_jobs: List[Tuple[Engine, Dict[str, Any], float]] = []
+        offline_jobs: List[Tuple[Engine, Dict[str, Any]]] = []
+
+        for name, plan in plans.items():
+            entry = report[name] = {"mode": plan.mode, "budget": plan.budget}
+            engine = engines.get(name)
+            if not plan.runs or engine is None:
+                entry["status"] = plan.mode if plan.mode == "derived" else "skipped"
+                if plan.reason:
+                    entry["reason"] = plan.reason
+                continue
+            if engine.realtime:
+                realtime_jobs.append((engine, entry, t0 + plan.budget))
+                continue
+            estimate = self.cost(name) * audio_seconds if audio_seconds else None
+            if estimate is not None:
+                entry["estimate"] = round(estimate, 3)
+            if wav_path is None:
+                entry["status"] = "skipped"
+                entry["reason"] = "no audio file"
+            elif estimate is not None and estimate > plan.budget and not plan.spec.required:
+                entry["status"] = "skipped"
+                entry["reason"] = "over budget"
+            else:
+                offline_jobs.append((engine, entry))
+
+        def _run(engine: Engine, entry: Dict[str, Any], fn: Callable[[], Any]) -> None:
+            try:
+                ok, scratch = fn()
+            except Exception as exc:
+                console.log(f"[engines] {engine.name} failed: {exc!r}")
+                ok, scratch = None, None
+            with lock:
+                entry["end"] = time.perf_counter()
+                if "status" in entry:
+                    return  # given up already
+                entry["status"] = "error" if ok is None else "ok" if ok else "timeout"
+                if ok and scratch is not None:
+                    results.update(scratch)
+
+        def _realtime(engine: Engine, deadline: float):
+            return engine.finalize(deadline), None
+
+        def _offline(engine: Engine):
+            scratch = engine.empty()
+            engine.process_file(wav_path, scratch)
+            return True, scratch
+
+        def _spawn(engine: Engine, entry: Dict[str, Any], fn: Callable[[], Any]) -> threading.Thread:
+            entry["start"] = time.perf_counter()
+            t = threading.Thread(
+                target=_run, args=(engine, entry, fn), daemon=True, name=f"finalize-{engine.name}"
+            )
+            t.start()
+            return t
+
+        waits: List[Tuple[threading.Thread, Engine, Dict[str, Any], float | None]] = []
+        for engine, entry, deadline in realtime_jobs:
+            t = _spawn(engine, entry, lambda e=engine, d=deadline: _realtime(e, d))
+            # A little slack over the engine's own deadline for its cleanup
+            waits.append((t, engine, entry, deadline + 0.5))
+        for engine, entry in offline_jobs:
+            t = _spawn(engine, entry, lambda e=engine: _offline(e))
+            deadline = None if engine.spec.required else time.monotonic() + engine.plan.budget
+            if parallel:
+                waits.append((t, engine, entry, deadline))
+            else:
+                self._give_up_after(t, entry, deadline, lock)
+        for t, engine, entry, deadline in waits:
+            self._give_up_after(t, entry, deadline, lock)
+
+        self._observe(report, audio_seconds)
+        return report
+
+    @staticmethod
+    def _give_up_after(
+        t: threading.Thread, entry: Dict[str, Any], deadline: float | None, lock
+    ) -> None:
+        t.join(None if deadline is None else _remaining(deadline))
+        with lock:
+            if "status" not in entry:
+                entry["status"] = "timeout"
+                entry["end"] = time.perf_counter()
+
+    def _observe(self, report: Dict[str, Dict[str, Any]], audio_seconds: float | None) -> None:
+        with self._lock:
+            for name, entry in report.items():
+                st = self._stat(name)
+                status = entry["status"]
+                if status in ("skipped", "derived"):
+                    st[status] += 1
+                    continue
+                st["runs"] += 1
+                st[{"ok": "ok", "timeout": "timeouts", "error": "errors"}[status]] += 1
+                seconds = entry["end"] - entry["start"]
+                st["seconds"] += seconds
+                if status == "ok" and entry["mode"] == "offline" and audio_seconds:
+                    observed = seconds / audio_seconds
+                    previous = self._cost.get(name)
+                    self._cost[name] = (
+                        observed
+                        if previous is None
+                        else (1 - self.alpha) * previous + self.alpha * observed
+                    )
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            out = {}
+            for name, spec in self.specs.items():
+                st = self._stat(name)
+                n = st["runs"]
+                out[name] = {
+                    **st,
+                    "seconds": round(st["seconds"], 3),
+                    "avg_seconds": round(st["seconds"] / n, 3) if n else None,
+                    "timeout_rate": round(st["timeouts"] / n, 3) if n else None,
+                    "cost": round(self._cost.get(name, spec.cost), 3),
+                    "budget": spec.budget,
+                }
+            return out
+
+
+scheduler = Scheduler()
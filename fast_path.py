@@ -0,0 +1,111 @@
+"""
+fast_path.py
+------------
+Rule-based verdict for readings that are clearly correct, so they can skip
+the GPT tutor call.
+
+Usage:
+    req, messages = prompt_builder.build(results, state={})
+    resp = fast_path.verdict(req)          # TutorResponse or None
+    if resp is None:
+        resp = await gpt_client.chat(messages)
+
+It only ever says "correct": both transcripts must equal the reference text
+word for word and Azure pronunciation assessment must flag nothing and score
+above the thresholds (the CORRECT branch of the decision tree in
+``prompt_template.md``).  Anything else returns ``None`` and goes to GPT.
+
+Without a plain Azure transcript (``AZURE_PLAIN_PASS`` off, see
+``prompt_builder``) the pronunciation transcript takes its place: it must
+then equal the reference too, and so must the wav2vec2 transcript.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict
+
+from tutor_schema import TutorRequest, TutorResponse
+
+# Same wording GPT is told to use when there are no errors.
+PRAISE_TEXT = "Goed gelezen! Klaar voor de volgende zin."
+
+
+@dataclass(frozen=True)
+class Thresholds:
+    min_pron_score: float = 90.0
+    min_accuracy_score: float = 90.0
+    min_completeness_score: float = 95.0
+    min_word_accuracy: float = 80.0
+    # Without a wav2vec2 transcript only Azure vouches for the words.
+    require_wav2vec2: bool = True
+
+
+DEFAULT_THRESHOLDS = Thresholds()
+
+stats: Dict[str, Any] = {"checked": 0, "bypassed": 0, "blocked": Counter()}
+
+
+def _words(text: Any) -> list[str]:
+    return text.split() if isinstance(text, str) else []
+
+
+def blocker(req: TutorRequest, th: Thresholds = DEFAULT_THRESHOLDS) -> str | None:
+    """Name of the first rule that rules out the fast path, or ``None``."""
+    ref = _words(req.reference_text)
+    if not ref:
+        return "no_reference"
+
+    plain = req.azure.get("plain")
+    if plain is not None and _words(plain.get("final_transcript")) != ref:
+        return "azure_plain_mismatch"
+
+    asr = _words(req.wav2vec2.get("asr"))
+    if asr != ref and (asr or th.require_wav2vec2 or plain is None):
+        return "wav2vec2_mismatch"
+
+    pron = req.azure.get("pronunciation") or {}
+    pron_words = _words(pron.get("final_transcript"))
+    if pron_words != ref and (pron_words or plain is None):
+        return "azure_pron_mismatch"
+    scores = pron.get("pronunciation_scores") or {}
+    if (scores.get("pron_score") or 0.0) < th.min_pron_score:
+        return "pron_score"
+    if (scores.get("accuracy_score") or 0.0) < th.min_accuracy_score:
+        return "accuracy_score"
+    if (scores.get("completeness_score") or 0.0) < th.min_completeness_score:
+        return "completeness_score"
+
+    timings = pron.get("word_timings") or []
+    if len(timings) != len(ref):
+        return "word_count"
+    for w in timings:
+        if w.get("error_type") not in (None, "None"):
+            return "error_type"
+        if (w.get("accuracy_score") or 0.0) < th.min_word_accuracy:
+            return "word_accuracy"
+    return None
+
+
+def verdict(req: TutorRequest, th: Thresholds = DEFAULT_THRESHOLDS) -> TutorResponse | None:
+    """Praise response for a clearly correct reading, else ``None``."""
+    reason = blocker(req, th)
+    stats["checked"] += 1
+    if reason is not None:
+        stats["blocked"][reason] += 1
+        return None
+    stats["bypassed"] += 1
+    return TutorResponse(
+        mode="reading", feedback_text=PRAISE_TEXT, repeat=False, is_correct=True, errors=[]
+    )
+
+
+def metrics() -> Dict[str, Any]:
+    checked = stats["checked"]
+    return {
+        "checked": checked,
+        "bypassed": stats["bypassed"],
+        "bypass_rate": round(stats["bypassed"] / checked, 3) if checked else None,
+        "blocked": dict(stats["blocked"]),
+    }
@@ -1,6 +1,7 @@
 import { useEffect, useRef, useState } from "react";
 import { RingBuffer } from "../utils/ringBuffer";
 import { getAudioEl, type AudioHandle } from "../utils/audioCache";
+import { readSse, type SseEvent } from "../utils/sse";
 
 const SEND_INTERVAL_MS = 100; // how often to upload audio (in ms)
 const DEBUG = false; // set true to enable chunk logs
@@ -34,6 +35,11 @@ export function getStatusLabel(phase: TutorPhase): string {
   }
 }
 
+// Shown until the GPT feedback for the verdict arrives
+export function getVerdictLabel(correct: boolean): string {
+  return correct ? "Goed gelezen!" : "Kijk nog eens naar de rode woorden.";
+}
+
 const FILLER_AUDIO = "de_zin_was.wav";
 
 async function playSequentially(
@@ -86,15 +92,24 @@ function stopAllAudio(active: Set<AudioHandle>) {
 export interface FeedbackData {
   feedback_text: string;
   feedback_audio: string;
+  feedback_audio_parts?: string[];
   errors?: { word?: string; expected_word?: string }[];
   correct?: boolean;
 }
 
+// Local verdict /stop answers with before the GPT feedback is ready
+export interface VerdictData {
+  correct: boolean | null; // null: unsure, wait for the feedback
+  errors?: { word?: string; heard_word?: string; issue?: string }[];
+  suspects?: string[];
+}
+
 interface RecorderOptions {
   sentence: string;
   sentenceAudio?: string;
   teacherId: number;
   studentId: string;
+  onVerdict?: (data: VerdictData) => void;
   onFeedback: (data: FeedbackData) => void;
   canvas?: HTMLCanvasElement | null;
 }
@@ -104,6 +119,7 @@ export function useRecorder({
   sentenceAudio,
   teacherId,
   studentId,
+  onVerdict,
   onFeedback,
   canvas,
 }: RecorderOptions) {
@@ -133,6 +149,8 @@ export function useRecorder({
   const preRollAbortRef = useRef<AbortController | null>(null);
   const preRollPlayingRef = useRef(false);
   const pendingFeedbackRef = useRef<(() => void) | null>(null);
+  const feedbackAbortRef = useRef<AbortController | null>(null);
+  const partsRef = useRef({ files: [] as string[], next: 0, playing: false, done: false });
 
   function ensureRing(sampleRate: number) {
     const cap = Math.max(
@@ -159,6 +177,7 @@ export function useRecorder({
     const activeSet = activeAudiosRef.current;
     return () => {
       preRollAbortRef.current?.abort();
+      feedbackAbortRef.current?.abort();
       stopAllAudio(activeSet);
     };
   }, []);
@@ -210,6 +229,7 @@ export function useRecorder({
   async function startRecording() {
     console.log("startRecording");
     preRollAbortRef.current?.abort();
+    feedbackAbortRef.current?.abort();
     stopAllAudio(activeAudiosRef.current);
     preRollPlayingRef.current = false;
     pendingFeedbackRef.current = null;
@@ -411,7 +431,29 @@ export function useRecorder({
     await audioCtxRef.current?.close();
     audioCtxRef.current = null;
 
-    let feedbackPromise: Promise<FeedbackData>;
+    const playback = () => {
+      const total = recordedChunksRef.current.reduce((n, c) => n + c.length, 0);
+      const flat = new Int16Array(total);
+      let pos = 0;
+      for (const c of recordedChunksRef.current) {
+        flat.set(c, pos);
+        pos += c.length;
+      }
+      const wav = encodeWav(flat, sampleRate);
+      console.log("final wav blob", wav.size, "bytes");
+      setPlaybackUrl(URL.createObjectURL(wav));
+      return wav;
+    };
+    const fail = (err: unknown) => {
+      if (err instanceof DOMException && err.name === "AbortError") return;
+      const showErr = () => {
+        console.error(err);
+        setPhase("error");
+      };
+      if (preRollPlayingRef.current) pendingFeedbackRef.current = showErr;
+      else showErr();
+    };
+
     if (realtimeRef.current) {
       if (PCM_QUEUE.length) {
         const total = PCM_QUEUE.reduce((n, c) => n + c.length, 0);
@@ -424,90 +466,119 @@ export function useRecorder({
         PCM_QUEUE.length = 0;
         sendChunk(new Blob([flat], { type: "application/octet-stream" }));
       }
-      feedbackPromise = fetch(`/api/realtime/stop/${sessionIdRef.current}`, {
-        method: "POST",
-        headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({ client_timeline: timelineRef.current }),
-      }).then(async (r) => {
-        const j = await r.json();
-        if (!r.ok) throw new Error(j.detail);
-        console.log("STOP json_ready");
-        return j as FeedbackData;
-      });
+      const sid = sessionIdRef.current;
       sessionIdRef.current = null;
+      startPreRoll();
+      streamFeedback(sid)
+        .then(() => playback())
+        .catch(fail);
     } else {
-      const total = recordedChunksRef.current.reduce((n, c) => n + c.length, 0);
-      const flat = new Int16Array(total);
-      let pos = 0;
-      for (const c of recordedChunksRef.current) {
-        flat.set(c, pos);
-        pos += c.length;
-      }
-      const wav = encodeWav(flat, sampleRate);
-      console.log("final wav blob", wav.size, "bytes");
-      const url = URL.createObjectURL(wav);
-      setPlaybackUrl(url);
+      const wav = playback();
       const fd = new FormData();
       fd.append("file", wav, "audio.wav");
       fd.append("sentence", sentence);
       fd.append("teacher_id", String(teacherId));
       fd.append("student_id", studentId);
-      feedbackPromise = fetch("/api/process", { method: "POST", body: fd }).then(
-        async (r) => {
+      startPreRoll();
+      fetch("/api/process", { method: "POST", body: fd })
+        .then(async (r) => {
           const j = await r.json();
           if (!r.ok) throw new Error(j.detail);
           console.log("STOP json_ready");
           return j as FeedbackData & { delay_seconds: number };
-        },
-      );
+        })
+        .then((data) => {
+          onFeedback(data);
+          const fb = getAudioEl(data.feedback_audio);
+          fb.onended = () => {
+            activeAudiosRef.current.delete(fb);
+            setPhase("idle");
+          };
+          const playFb = () => {
+            console.log("FEEDBACK play_start");
+            setPhase("playing-feedback");
+            fb.currentTime = 0;
+            activeAudiosRef.current.add(fb);
+            fb.play().catch(() => {});
+          };
+          if (preRollPlayingRef.current) pendingFeedbackRef.current = playFb;
+          else playFb();
+        })
+        .catch(fail);
     }
 
-    startPreRoll();
+    recStateRef.current = "idle";
+  }
 
-    feedbackPromise
-      .then((data) => {
-        if (realtimeRef.current) {
-          const total = recordedChunksRef.current.reduce(
-            (n, c) => n + c.length,
-            0,
-          );
-          const flat = new Int16Array(total);
-          let pos = 0;
-          for (const c of recordedChunksRef.current) {
-            flat.set(c, pos);
-            pos += c.length;
-          }
-          const wav = encodeWav(flat, sampleRate);
-          console.log("final wav blob", wav.size, "bytes");
-          const url = URL.createObjectURL(wav);
-          setPlaybackUrl(url);
-        }
-        onFeedback(data);
-        const fb = getAudioEl(data.feedback_audio);
-        fb.onended = () => {
-          activeAudiosRef.current.delete(fb);
-          setPhase("idle");
-        };
-        const playFb = () => {
-          console.log("FEEDBACK play_start");
-          setPhase("playing-feedback");
-          fb.currentTime = 0;
-          activeAudiosRef.current.add(fb);
-          fb.play().catch(() => {});
-        };
-        if (preRollPlayingRef.current) pendingFeedbackRef.current = playFb;
-        else playFb();
-      })
-      .catch((err) => {
-        const showErr = () => {
-          console.error(err);
-          setPhase("error");
-        };
-        if (preRollPlayingRef.current) pendingFeedbackRef.current = showErr;
-        else showErr();
-      });
+  // Feedback arrives as one clip per sentence while GPT is still writing;
+  // play the clips in order as soon as each one (and the pre-roll) is ready.
+  function playNextPart() {
+    const parts = partsRef.current;
+    const signal = feedbackAbortRef.current?.signal;
+    if (signal?.aborted || parts.playing || preRollPlayingRef.current) return;
+    const file = parts.files[parts.next];
+    if (!file) {
+      if (parts.done) setPhase("idle");
+      return;
+    }
+    parts.playing = true;
+    parts.next += 1;
+    setPhase("playing-feedback");
+    playSequentially(
+      [{ handle: getAudioEl(file), log: `FEEDBACK play_start part=${parts.next - 1}` }],
+      activeAudiosRef.current,
+      signal,
+    ).finally(() => {
+      parts.playing = false;
+      playNextPart();
+    });
+  }
 
-    recStateRef.current = "idle";
+  function whenPreRollDone(fn: () => void) {
+    if (preRollPlayingRef.current) pendingFeedbackRef.current = fn;
+    else fn();
+  }
+
+  async function streamFeedback(sid: string | null): Promise<void> {
+    const ac = new AbortController();
+    feedbackAbortRef.current = ac;
+    partsRef.current = { files: [], next: 0, playing: false, done: false };
+    // Two-tier stop: the verdict comes back as soon as the engines are
+    // done, the GPT feedback follows on its channel.
+    const stop = await fetch(`/api/realtime/stop/${sid}`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ client_timeline: timelineRef.current, two_tier: true }),
+      signal: ac.signal,
+    });
+    const verdict = await stop.json();
+    if (!stop.ok) throw new Error(verdict.detail);
+    console.log("STOP verdict_ready");
+    onVerdict?.(verdict as VerdictData);
+    const r = await fetch(`/api/feedback/${verdict.feedback_id}`, {
+      signal: ac.signal,
+    });
+    if (!r.ok) throw new Error((await r.json()).detail);
+    let failure: Error | null = null;
+    await readSse(r, (ev: SseEvent) => {
+      if (ac.signal.aborted) return;
+      if (ev.event === "audio") {
+        const part = JSON.parse(ev.data);
+        partsRef.current.files[part.index] = part.audio;
+        whenPreRollDone(playNextPart);
+      } else if (ev.event === "feedback") {
+        console.log("STOP json_ready");
+        const data = JSON.parse(ev.data) as FeedbackData;
+        onFeedback(data);
+        partsRef.current.done = true;
+        whenPreRollDone(playNextPart);
+      } else if (ev.event === "error") {
+        failure = new Error(JSON.parse(ev.data).detail);
+      }
+    });
+    if (ac.signal.aborted) return;
+    if (failure) throw failure;
+    if (!partsRef.current.done) throw new Error("feedback stream ended early");
   }
 
   const statusLabel = getStatusLabel(phase);
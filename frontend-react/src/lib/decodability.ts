@@ -6,6 +6,10 @@ const DIGRAPHS = [
   'oei',
   'ieuw',
   'eeuw',
+  'aa',
+  'ee',
+  'oo',
+  'uu',
   'sch',
   'ng',
   'nk',
@@ -30,6 +34,7 @@ const VOWELS = new Set([
   'aa',
   'ee',
   'oo',
+  'uu',
   'eu',
   'ie',
   'ij',
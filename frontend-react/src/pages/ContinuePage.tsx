@@ -7,6 +7,7 @@ import { BookOpen } from 'lucide-react';
 import type { StoryItem } from '@/components/story/SentenceDisplay';
 import { ShimmerText } from '@/components/ShimmerText';
 import { findLevelUnit } from '@/lib/contentConfig';
+import { useAuthStore } from '@/lib/useAuthStore';
 
 export default function ContinuePage() {
   const [progress, setProgress] = useState(0);
@@ -34,6 +35,8 @@ export default function ContinuePage() {
     const patterns = localStorage.getItem('patterns') ?? '';
     const maxWords = localStorage.getItem('max_words') ?? '';
     const strictForbid = localStorage.getItem('strict_forbid') ?? '';
+    // Prefetched continuations are kept per student
+    const studentId = useAuthStore.getState().studentId ?? '';
     const storySoFar = JSON.parse(localStorage.getItem('story_data') ?? '[]')
       .filter((i: StoryItem) => i.type === 'sentence')
       .map((i: StoryItem) => i.text)
@@ -45,21 +48,31 @@ export default function ContinuePage() {
     }
 
     const ev = new EventSource(
-      `/api/continue_story?theme=${theme}&level=${level}&direction=${encodeURIComponent(direction)}&story=${encodeURIComponent(storySoFar)}&focus=${encodeURIComponent(focus)}&allowed=${encodeURIComponent(allowed)}&patterns=${encodeURIComponent(patterns)}&max_words=${maxWords}&strict_forbid=${strictForbid}`,
+      `/api/continue_story?theme=${theme}&level=${level}&direction=${encodeURIComponent(direction)}&story=${encodeURIComponent(storySoFar)}&focus=${encodeURIComponent(focus)}&allowed=${encodeURIComponent(allowed)}&patterns=${encodeURIComponent(patterns)}&max_words=${maxWords}&strict_forbid=${strictForbid}&student_id=${encodeURIComponent(studentId)}`,
     );
-    const data: StoryItem[] = [];
+    // Items arrive in the order they finish; place them by their index.
+    const sentences: StoryItem[] = [];
+    const directions: StoryItem[] = [];
 
     ev.addEventListener('progress', (e) => {
       setProgress(parseFloat((e as MessageEvent).data) * 100);
     });
     ev.addEventListener('sentence', (e) => {
-      data.push({ type: 'sentence', ...(JSON.parse((e as MessageEvent).data)) });
+      const item = JSON.parse((e as MessageEvent).data);
+      sentences[item.index] = { type: 'sentence', ...item };
     });
     ev.addEventListener('direction', (e) => {
-      data.push({ type: 'direction', ...(JSON.parse((e as MessageEvent).data)) });
+      const item = JSON.parse((e as MessageEvent).data);
+      directions[item.index] = { type: 'direction', ...item };
+    });
+    ev.addEventListener('error', (e) => {
+      if (!(e as MessageEvent).data) return;
+      ev.close();
+      navigate(`/story${location.search}`);
     });
     ev.addEventListener('complete', () => {
       ev.close();
+      const data = [...sentences, ...directions].filter(Boolean);
       const story = JSON.parse(localStorage.getItem('story_data') ?? '[]');
       story.splice(idx, 2, ...data);
       localStorage.setItem('story_data', JSON.stringify(story));
@@ -2,7 +2,7 @@ import { useEffect, useRef, useState } from 'react';
 import AppShell from '@/components/layout/AppShell';
 import { useAuthStore } from '@/lib/useAuthStore';
 import { useNavigate, useLocation } from 'react-router-dom';
-import { useRecorder } from '@/hooks/useRecorder';
+import { getVerdictLabel, useRecorder } from '@/hooks/useRecorder';
 import type { FeedbackData } from '@/hooks/useRecorder';
 import { getAudioEl } from '@/utils/audioCache';
 import { SentenceDisplay } from '@/components/story/SentenceDisplay';
@@ -42,6 +42,11 @@ export default function StoryPage() {
     sentenceAudio,
     teacherId: Number(teacherId) || 0,
     studentId: studentId ?? '',
+    onVerdict: (d) => {
+      if (d.correct === null) return;
+      setIsCorrect(d.correct);
+      setErrorIndices(buildErrorIndices(sentenceText, d.errors || []));
+    },
     onFeedback: (d) => {
       setFeedback(d);
       setIsCorrect(d.correct ?? false);
@@ -73,6 +78,38 @@ export default function StoryPage() {
     }
   }, [studentId, navigate]);
 
+  // Let the backend start preparing both continuations while the child is
+  // still reading; /continue then usually finds the chosen one ready.
+  const directionKey =
+    currentItem?.type === 'direction' && nextItem
+      ? `${currentItem.text}|${nextItem.text}`
+      : null;
+  useEffect(() => {
+    if (!directionKey) return;
+    const list = (key: string) =>
+      (localStorage.getItem(key) ?? '').split(',').filter((x) => x);
+    const storySoFar = storyData
+      .filter((i) => i.type === 'sentence')
+      .map((i) => i.text)
+      .join(' ');
+    fetch('/api/prefetch_story', {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({
+        student_id: studentId,
+        theme: localStorage.getItem('theme'),
+        level: localStorage.getItem('level'),
+        story: storySoFar,
+        directions: directionKey.split('|'),
+        focus: list('focus'),
+        allowed: list('allowed'),
+        patterns: list('patterns'),
+        max_words: Number(localStorage.getItem('max_words')) || null,
+        strict_forbid: localStorage.getItem('strict_forbid') === 'true',
+      }),
+    }).catch(() => {});
+  }, [directionKey, storyData, studentId]);
+
   function handleDirection(choice: number) {
     if (!currentItem || currentItem.type !== 'direction') return;
     const choiceText =
@@ -106,7 +143,17 @@ export default function StoryPage() {
   }
 
   function replayFeedback() {
-    if (feedback?.feedback_audio) new Audio('/api/audio/' + feedback.feedback_audio).play();
+    // Streamed feedback comes as one clip per sentence
+    const parts =
+      feedback?.feedback_audio_parts ??
+      (feedback?.feedback_audio ? [feedback.feedback_audio] : []);
+    const playFrom = (i: number) => {
+      if (i >= parts.length) return;
+      const a = new Audio('/api/audio/' + parts[i]);
+      a.onended = () => playFrom(i + 1);
+      a.play();
+    };
+    playFrom(0);
   }
 
   const progress = ((index + 1) / storyData.length) * 100;
@@ -175,11 +222,13 @@ export default function StoryPage() {
                   /\*\*(.*?)\*\*/g,
                   '<strong class="highlight">$1</strong>',
                 )
-              : ''
+              : isCorrect === null
+                ? ''
+                : getVerdictLabel(isCorrect)
           }
           isCorrect={!!isCorrect}
           onReplay={replayFeedback}
-          visible={!!feedback}
+          visible={!!feedback || isCorrect !== null}
         />
       </div>
     </AppShell>
@@ -0,0 +1,14 @@
+import { parseSseBlock } from './sse';
+
+test('parseSseBlock reads event name and data', () => {
+  const ev = parseSseBlock('event: audio\r\ndata: {"index": 0}');
+  expect(ev).toEqual({ event: 'audio', data: '{"index": 0}' });
+});
+
+test('parseSseBlock joins data lines and defaults to message', () => {
+  expect(parseSseBlock('data: a\ndata: b')).toEqual({ event: 'message', data: 'a\nb' });
+});
+
+test('parseSseBlock skips pings', () => {
+  expect(parseSseBlock(': ping - 2024-01-01')).toBeNull();
+});
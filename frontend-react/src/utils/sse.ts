@@ -0,0 +1,42 @@
+export interface SseEvent {
+  event: string;
+  data: string;
+}
+
+// One event block of a text/event-stream; null for comments and pings.
+export function parseSseBlock(block: string): SseEvent | null {
+  let event = 'message';
+  const data: string[] = [];
+  for (const line of block.split(/\r?\n/)) {
+    if (!line || line.startsWith(':')) continue;
+    const colon = line.indexOf(':');
+    const field = colon < 0 ? line : line.slice(0, colon);
+    let value = colon < 0 ? '' : line.slice(colon + 1);
+    if (value.startsWith(' ')) value = value.slice(1);
+    if (field === 'event') event = value;
+    else if (field === 'data') data.push(value);
+  }
+  return data.length ? { event, data: data.join('\n') } : null;
+}
+
+// EventSource only does GET; this reads the SSE body of any fetch response.
+export async function readSse(
+  response: Response,
+  onEvent: (ev: SseEvent) => void,
+): Promise<void> {
+  if (!response.body) return;
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  for (;;) {
+    const { value, done } = await reader.read();
+    buffer += decoder.decode(value, { stream: !done });
+    const blocks = buffer.split(/\r?\n\r?\n/);
+    buffer = done ? '' : (blocks.pop() ?? '');
+    for (const block of blocks) {
+      const ev = parseSseBlock(block);
+      if (ev) onEvent(ev);
+    }
+    if (done) return;
+  }
+}
@@ -10,6 +10,8 @@ Env vars required when using the OpenAI API::
     OPENAI_API_KEY
     GPT_TUTOR_MODEL (optional, defaults to "gpt-4o-mini")
     GPT_TUTOR_TEMPERATURE (optional)
+    GPT_TUTOR_STRUCTURED_OUTPUTS (optional, "1" = strict JSON schema;
+                                  default on for OpenAI, off for Azure)
 
 When ``GPT_TUTOR_PROVIDER`` is set to ``"azure"`` the following Azure
 variables must be provided::
@@ -17,6 +19,20 @@ variables must be provided::
     AZURE_OPENAI_ENDPOINT   (e.g. "https://my-resource.openai.azure.com")
     AZURE_OPENAI_DEPLOYMENT (name of the chat deployment)
     AZURE_OPENAI_VERSION    (optional API version)
+    AZURE_OPENAI_DEPLOYMENTS (optional "model=deployment,..." used when a
+                              call asks for another model, e.g. the small
+                              model of ``model_router``)
+
+When both providers are configured and ``GPT_TUTOR_HEDGE`` is on (default),
+the other provider is used as backup: if the primary has not answered after
+its p95 latency (``GPT_TUTOR_HEDGE_QUANTILE``, clamped to at least
+``GPT_TUTOR_HEDGE_MIN_DELAY`` seconds; ``GPT_TUTOR_HEDGE_DELAY`` until enough
+samples exist) a second request is sent, the first answer wins and the other
+request is cancelled.  A failing primary fails over straight away.  Each
+provider has a circuit breaker that opens after ``GPT_TUTOR_BREAKER_FAILURES``
+consecutive failures and lets a single probe through after
+``GPT_TUTOR_BREAKER_COOLDOWN`` seconds.  The Azure deployment should serve
+the same model as ``GPT_TUTOR_MODEL``.
 """
 
 from __future__ import annotations
@@ -24,12 +40,20 @@ from __future__ import annotations
 import asyncio
 import json
 import os
-from typing import List, Dict, Any
+import time
+from collections import deque
+from contextlib import nullcontext
+from contextvars import ContextVar
+from typing import List, Dict, Any, AsyncIterator, Callable, Deque, Tuple, Type
 
 import httpx
+from pydantic import BaseModel
+from rich.console import Console
 # `tutor_schema.py` lives in the repository root. Import it directly so the
 # application does not depend on a `tutor` package being installed.
-from tutor_schema import TutorResponse
+from tutor_schema import TutorResponse, tutor_response_json_schema
+from json_stream import JsonFieldStream
+from json_repair import parse_tutor_response
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -44,44 +68,215 @@ AZURE_OPENAI_KEY = os.getenv("AZURE_OPENAI_KEY")
 AZURE_OPENAI_ENDPOINT = os.getenv("AZURE_OPENAI_ENDPOINT")
 AZURE_OPENAI_DEPLOYMENT = os.getenv("AZURE_OPENAI_DEPLOYMENT")
 AZURE_OPENAI_VERSION = os.getenv("AZURE_OPENAI_VERSION", "2024-05-13")
+AZURE_OPENAI_DEPLOYMENTS = dict(
+    item.split("=", 1)
+    for item in os.getenv("AZURE_OPENAI_DEPLOYMENTS", "").split(",")
+    if "=" in item
+)
 
 ENDPOINT = "https://api.openai.com/v1/chat/completions"
 TIMEOUT_S = 200.0
 
 TEMPERATURE_MODELS = {"gpt-4o", "gpt-4o-mini", "gpt-4.1"}
 
+# Strict JSON-schema structured outputs; older Azure API versions only know
+# ``json_object``, so Azure has to opt in.
+STRUCTURED_OUTPUTS = os.getenv("GPT_TUTOR_STRUCTURED_OUTPUTS")
+
+# Hedging / failover to the other provider and per-provider circuit breakers
+HEDGE = os.getenv("GPT_TUTOR_HEDGE", "1") == "1"
+HEDGE_QUANTILE = float(os.getenv("GPT_TUTOR_HEDGE_QUANTILE", "0.95"))
+HEDGE_MIN_DELAY = float(os.getenv("GPT_TUTOR_HEDGE_MIN_DELAY", "0.5"))
+HEDGE_DELAY = float(os.getenv("GPT_TUTOR_HEDGE_DELAY", "3.0"))
+HEDGE_MIN_SAMPLES = 20
+LATENCY_WINDOW = 200
+BREAKER_FAILURES = int(os.getenv("GPT_TUTOR_BREAKER_FAILURES", "3"))
+BREAKER_COOLDOWN = float(os.getenv("GPT_TUTOR_BREAKER_COOLDOWN", "30"))
+
+
+# Keep-alive connection pools, one per provider and event loop (connections
+# belong to the loop that opened them, and the CLI runs every sentence in its
+# own ``asyncio.run``).  The web backend registers its application-wide pools
+# via ``set_http_client``; otherwise a pool is created lazily on first use.
+MAX_CONNECTIONS = int(os.getenv("GPT_TUTOR_MAX_CONNECTIONS", "20"))
+_http_clients: Dict[Tuple[str, Any], httpx.AsyncClient] = {}
+
 
 class GPTClientError(Exception):
     pass
 
 
-async def chat(messages: List[Dict[str, str]],
-               max_retries: int = 2) -> TutorResponse:
-    """Send ``messages`` to the configured GPT provider and return a
-    ``TutorResponse``.
+console = Console()
 
-    Raises ``GPTClientError`` on failure.
-    """
+# Token usage reported by the provider, summed over all requests.
+usage_stats: Dict[str, int] = {
+    "requests": 0,
+    "prompt_tokens": 0,
+    "cached_prompt_tokens": 0,
+    "completion_tokens": 0,
+}
+
+
+# Per-call accounting: callers such as ``model_router`` set a dict here and
+# read the tokens and parse outcomes of the requests made in their context.
+call_stats: ContextVar[Dict[str, int] | None] = ContextVar("gpt_call_stats",
+                                                            default=None)
+
+
+def _count_call(key: str, n: int = 1) -> None:
+    sink = call_stats.get()
+    if sink is not None:
+        sink[key] = sink.get(key, 0) + n
+
+
+def _record_usage(usage: Dict[str, Any] | None) -> None:
+    """Add one response's ``usage`` block to ``usage_stats`` and log it."""
+    if not usage:
+        return
+    prompt = usage.get("prompt_tokens") or 0
+    cached = (usage.get("prompt_tokens_details") or {}).get("cached_tokens") or 0
+    completion = usage.get("completion_tokens") or 0
+    usage_stats["requests"] += 1
+    usage_stats["prompt_tokens"] += prompt
+    usage_stats["cached_prompt_tokens"] += cached
+    usage_stats["completion_tokens"] += completion
+    _count_call("prompt_tokens", prompt)
+    _count_call("completion_tokens", completion)
+    console.log(f"[gpt] prompt_tokens={prompt} cached={cached} completion_tokens={completion}")
+
+
+# Optional admission control around every request: ``limiter(provider)``
+# returns an async context manager held for the duration of the request.
+_limiter: Callable[[str], Any] = lambda provider: nullcontext()
+
+
+def set_limiter(limiter: Callable[[str], Any]) -> None:
+    """Wrap each outbound request in ``limiter(provider)``."""
+    global _limiter
+    _limiter = limiter
+
+
+def _loop() -> Any:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def set_http_client(provider: str, client: httpx.AsyncClient) -> None:
+    """Use ``client`` for requests to ``provider`` on the running loop."""
+    _http_clients[(provider, _loop())] = client
 
-    if PROVIDER == "azure":
+
+def _get_http_client(provider: str) -> httpx.AsyncClient:
+    loop = _loop()
+    client = _http_clients.get((provider, loop))
+    if client is None or client.is_closed:
+        # Pools of loops that have ended cannot be closed any more; drop them.
+        for key in [k for k in _http_clients if k[1] is not None and k[1].is_closed()]:
+            del _http_clients[key]
+        client = httpx.AsyncClient(
+            timeout=TIMEOUT_S,
+            http2=True,
+            limits=httpx.Limits(max_connections=MAX_CONNECTIONS),
+        )
+        _http_clients[(provider, loop)] = client
+    return client
+
+
+async def aclose() -> None:
+    """Close the pools of the running loop; forget those of other loops."""
+    loop = _loop()
+    clients = [c for (_, l), c in _http_clients.items() if l is loop]
+    _http_clients.clear()
+    for client in clients:
+        if not client.is_closed:
+            await client.aclose()
+
+
+# How answers were parsed and what the full retries cost.
+retry_stats: Dict[str, float] = {
+    "responses": 0,
+    "repaired": 0,
+    "retries": 0,
+    "parse_retries": 0,
+    "retry_seconds": 0.0,
+}
+
+
+def _count_retry(exc: Exception) -> None:
+    retry_stats["retries"] += 1
+    if isinstance(exc, ValueError):
+        retry_stats["parse_retries"] += 1
+
+
+def _parse(raw_json: str, response_model: Type[BaseModel] = TutorResponse) -> Any:
+    """Validate ``raw_json``, repairing it locally when possible."""
+    try:
+        resp, repaired = parse_tutor_response(raw_json, response_model)
+    except ValueError:
+        _count_call("invalid")
+        raise
+    retry_stats["responses"] += 1
+    if repaired:
+        retry_stats["repaired"] += 1
+        _count_call("repaired")
+    return resp
+
+
+def _response_format(provider: str,
+                     response_model: Type[BaseModel] = TutorResponse
+                     ) -> Dict[str, Any]:
+    structured = (STRUCTURED_OUTPUTS == "1" if STRUCTURED_OUTPUTS is not None
+                  else provider != "azure")
+    if structured:
+        return tutor_response_json_schema(response_model)
+    return {"type": "json_object"}
+
+
+def _credentials_error(provider: str) -> str | None:
+    if provider == "azure":
         if not all((AZURE_OPENAI_KEY, AZURE_OPENAI_ENDPOINT,
                     AZURE_OPENAI_DEPLOYMENT)):
-            raise GPTClientError(
-                "AZURE_OPENAI_KEY, AZURE_OPENAI_ENDPOINT and "
-                "AZURE_OPENAI_DEPLOYMENT must be set"
-            )
+            return ("AZURE_OPENAI_KEY, AZURE_OPENAI_ENDPOINT and "
+                    "AZURE_OPENAI_DEPLOYMENT must be set")
+    elif not OPENAI_API_KEY:
+        return "OPENAI_API_KEY env var not set"
+    return None
+
+
+def providers() -> List[str]:
+    """Providers used for tutor calls, the primary ``PROVIDER`` first."""
+    names = [PROVIDER]
+    if HEDGE:
+        names += [n for n in ("openai", "azure")
+                  if n != PROVIDER and _credentials_error(n) is None]
+    return names
+
+
+def _request_parts(messages: List[Dict[str, str]], provider: str = PROVIDER,
+                   model: str = OPENAI_MODEL,
+                   response_model: Type[BaseModel] = TutorResponse
+                   ) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+    """Return ``(endpoint, headers, payload)`` for ``provider`` and ``model``."""
 
+    error = _credentials_error(provider)
+    if error:
+        raise GPTClientError(error)
+
+    if provider == "azure":
         endpoint = (
             f"{AZURE_OPENAI_ENDPOINT}/openai/deployments/"
-            f"{AZURE_OPENAI_DEPLOYMENT}/chat/completions"
+            f"{AZURE_OPENAI_DEPLOYMENTS.get(model, AZURE_OPENAI_DEPLOYMENT)}"
+            f"/chat/completions"
             f"?api-version={AZURE_OPENAI_VERSION}"
         )
 
         payload: Dict[str, Any] = {
             "messages": messages,
-            "response_format": {"type": "json_object"},
+            "response_format": _response_format(provider, response_model),
         }
-        if OPENAI_MODEL in TEMPERATURE_MODELS:
+        if model in TEMPERATURE_MODELS:
             payload["temperature"] = OPENAI_TEMPERATURE
 
         headers = {
@@ -89,34 +284,326 @@ async def chat(messages: List[Dict[str, str]],
             "Content-Type": "application/json",
         }
     else:
-        if not OPENAI_API_KEY:
-            raise GPTClientError("OPENAI_API_KEY env var not set")
-
         endpoint = ENDPOINT
 
         payload = {
-            "model": OPENAI_MODEL,
+            "model": model,
             "messages": messages,
-            "response_format": {"type": "json_object"},
+            "response_format": _response_format(provider, response_model),
         }
-        if OPENAI_MODEL in TEMPERATURE_MODELS:
+        if model in TEMPERATURE_MODELS:
             payload["temperature"] = OPENAI_TEMPERATURE
 
         headers = {
             "Authorization": f"Bearer {OPENAI_API_KEY}",
             "Content-Type": "application/json",
         }
+    return endpoint, headers, payload
+
+
+def _is_outage(exc: Exception) -> bool:
+    """Errors that say the provider is down or overloaded, not the request bad."""
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code >= 500 or exc.response.status_code == 429
+    return isinstance(exc, httpx.TransportError)
+
 
-    async with httpx.AsyncClient(timeout=TIMEOUT_S, http2=True) as client:
-        for attempt in range(max_retries + 1):
+class _Provider:
+    """Latency window, circuit breaker and counters of one provider."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        # Seconds to the full answer ("chat") or the first event ("stream"),
+        # per "kind:model".
+        self.latency: Dict[str, Deque[float]] = {}
+        self.failures = 0
+        self.opened_at: float | None = None
+        self.probing = False
+        self.stats = {"requests": 0, "wins": 0, "errors": 0, "cancelled": 0,
+                      "breaker_opened": 0}
+
+    def available(self) -> bool:
+        """Closed breaker, or open long enough for one probe request."""
+        if self.opened_at is None:
+            return True
+        return (not self.probing
+                and time.monotonic() - self.opened_at >= BREAKER_COOLDOWN)
+
+    def begin(self) -> None:
+        self.stats["requests"] += 1
+        if self.opened_at is not None:
+            self.probing = True
+
+    def observe(self, key: str, seconds: float) -> None:
+        self.latency.setdefault(key, deque(maxlen=LATENCY_WINDOW)).append(seconds)
+
+    def success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    def failure(self, exc: Exception) -> None:
+        self.stats["errors"] += 1
+        self.probing = False
+        if not _is_outage(exc):
+            return
+        self.failures += 1
+        if self.opened_at is not None or self.failures >= BREAKER_FAILURES:
+            if self.opened_at is None:
+                self.stats["breaker_opened"] += 1
+                console.log(f"[yellow][gpt] circuit open for {self.name}[/yellow]")
+            self.opened_at = time.monotonic()
+
+    def cancelled(self) -> None:
+        self.stats["cancelled"] += 1
+        self.probing = False
+
+    def hedge_delay(self, key: str) -> float:
+        """Seconds to wait for this provider before hedging."""
+        samples = sorted(self.latency.get(key, ()))
+        if len(samples) < HEDGE_MIN_SAMPLES:
+            return HEDGE_DELAY
+        idx = min(len(samples) - 1, int(HEDGE_QUANTILE * len(samples)))
+        return max(HEDGE_MIN_DELAY, samples[idx])
+
+    def metrics(self) -> Dict[str, Any]:
+        if self.opened_at is None:
+            state = "closed"
+        else:
+            state = "half_open" if self.available() or self.probing else "open"
+        return {
+            **self.stats,
+            "state": state,
+            "hedge_delay": {k: round(self.hedge_delay(k), 3) for k in self.latency},
+        }
+
+
+_providers: Dict[str, _Provider] = {n: _Provider(n) for n in ("openai", "azure")}
+
+hedge_stats: Dict[str, int] = {"hedged": 0, "backup_wins": 0, "failovers": 0}
+
+
+def provider_metrics() -> Dict[str, Any]:
+    return {
+        **hedge_stats,
+        "providers": {n: _providers[n].metrics() for n in providers()},
+    }
+
+
+async def _chat_once(provider: str, messages: List[Dict[str, str]], model: str,
+                     response_model: Type[BaseModel]
+                     ) -> AsyncIterator[Tuple[str, Any]]:
+    """One plain request to ``provider``; yields ``("response", resp)``."""
+    endpoint, headers, payload = _request_parts(messages, provider, model,
+                                                response_model)
+    r = await _get_http_client(provider).post(endpoint, headers=headers,
+                                              json=payload)
+    r.raise_for_status()
+    body = r.json()
+    _record_usage(body.get("usage"))
+    raw_json = body["choices"][0]["message"]["content"]
+    yield "response", _parse(raw_json, response_model)
+
+
+async def _stream_once(provider: str, messages: List[Dict[str, str]],
+                       model: str, response_model: Type[BaseModel]
+                       ) -> AsyncIterator[Tuple[str, Any]]:
+    """One streamed request to ``provider``, see :func:`chat_stream`."""
+    endpoint, headers, payload = _request_parts(messages, provider, model,
+                                                response_model)
+    payload = {**payload, "stream": True}
+    if provider != "azure":
+        payload["stream_options"] = {"include_usage": True}
+
+    parser = JsonFieldStream()
+    async with _get_http_client(provider).stream(
+            "POST", endpoint, headers=headers, json=payload) as r:
+        r.raise_for_status()
+        async for line in r.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            data = line[5:].strip()
+            if data == "[DONE]":
+                break
+            event = json.loads(data)
+            _record_usage(event.get("usage"))
+            choices = event.get("choices") or []
+            if not choices:
+                continue
+            delta = (choices[0].get("delta") or {}).get("content")
+            if not delta:
+                continue
+            for ev in parser.feed(delta):
+                if ev.key == "feedback_text" and not ev.done:
+                    yield "feedback", ev.text
+    yield "response", _parse(parser.text, response_model)
+
+
+async def _pump(p: _Provider, kind: str, messages: List[Dict[str, str]],
+                model: str, response_model: Type[BaseModel],
+                out: asyncio.Queue) -> None:
+    """Run one request and put ``(provider, (event, value))`` on ``out``."""
+    once = _stream_once if kind == "stream" else _chat_once
+    first = True
+    try:
+        async with _limiter(p.name):
+            p.begin()
+            t0 = time.perf_counter()
+            async for item in once(p.name, messages, model, response_model):
+                if first:
+                    p.observe(f"{kind}:{model}", time.perf_counter() - t0)
+                    first = False
+                await out.put((p, item))
+    except asyncio.CancelledError:
+        p.cancelled()
+        raise
+    except Exception as exc:
+        p.failure(exc)
+        await out.put((p, ("error", exc)))
+        return
+    p.success()
+    await out.put((p, ("done", None)))
+
+
+async def _hedged(kind: str, messages: List[Dict[str, str]], model: str,
+                  response_model: Type[BaseModel]
+                  ) -> AsyncIterator[Tuple[str, Any]]:
+    """Race the available providers and yield the events of the winner.
+
+    The primary starts alone; a backup is launched when the primary is slower
+    than its hedge delay or fails.  The first provider to produce an event
+    wins and the others are cancelled.
+    """
+    order = [_providers[n] for n in providers() if _providers[n].available()]
+    if not order:
+        raise GPTClientError("circuit open for every GPT provider")
+
+    out: asyncio.Queue = asyncio.Queue()
+    tasks: List[asyncio.Task] = []
+    backups = order[1:]
+    failed: List[Exception] = []
+    winner: _Provider | None = None
+
+    def launch(p: _Provider) -> None:
+        tasks.append(asyncio.create_task(_pump(p, kind, messages, model,
+                                               response_model, out)))
+
+    launch(order[0])
+    deadline = time.monotonic() + order[0].hedge_delay(f"{kind}:{model}")
+    try:
+        while True:
+            timeout = None
+            if winner is None and backups:
+                timeout = max(0.0, deadline - time.monotonic())
             try:
-                r = await client.post(endpoint, headers=headers, json=payload)
-                r.raise_for_status()
-                raw_json = r.json()["choices"][0]["message"]["content"]
-                parsed = json.loads(raw_json)
-                return TutorResponse.parse_obj(parsed)
-            except Exception as exc:
-                if attempt == max_retries:
-                    raise GPTClientError(f"GPT request failed: {exc}") from exc
-                await asyncio.sleep(1.0 * (attempt + 1))
+                p, (event, value) = await asyncio.wait_for(out.get(), timeout)
+            except asyncio.TimeoutError:
+                hedge_stats["hedged"] += 1
+                launch(backups.pop(0))
+                continue
+            if winner is not None and p is not winner:
+                continue
+            if event == "error":
+                if p is winner:
+                    raise value
+                failed.append(value)
+                if backups:
+                    hedge_stats["failovers"] += 1
+                    launch(backups.pop(0))
+                elif len(failed) == len(tasks):
+                    raise value
+                continue
+            if winner is None:
+                winner = p
+                p.stats["wins"] += 1
+                if p is not order[0]:
+                    hedge_stats["backup_wins"] += 1
+                for task in tasks:
+                    if not task.done():
+                        task.cancel()
+            if event == "done":
+                return
+            yield event, value
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+
+async def chat(messages: List[Dict[str, str]],
+               max_retries: int = 2,
+               model: str | None = None,
+               response_model: Type[BaseModel] = TutorResponse) -> Any:
+    """Send ``messages`` to the configured GPT provider and return a
+    ``TutorResponse`` (or ``response_model``).  ``model`` defaults to
+    ``GPT_TUTOR_MODEL``.
+
+    Raises ``GPTClientError`` on failure.
+    """
+
+    error = _credentials_error(PROVIDER)
+    if error:
+        raise GPTClientError(error)
+
+    t0 = time.perf_counter()
+    for attempt in range(max_retries + 1):
+        t_attempt = time.perf_counter()
+        resp = None
+        try:
+            async for event, value in _hedged("chat", messages, model or OPENAI_MODEL,
+                                              response_model):
+                if event == "response":
+                    resp = value
+            if resp is None:
+                raise GPTClientError("no response received")
+        except Exception as exc:
+            if attempt == max_retries:
+                raise GPTClientError(f"GPT request failed: {exc}") from exc
+            _count_retry(exc)
+            await asyncio.sleep(1.0 * (attempt + 1))
+            continue
+        if attempt:
+            # Latency the failed attempts and back-off added to this answer.
+            retry_stats["retry_seconds"] += t_attempt - t0
+        return resp
+
+
+async def chat_stream(messages: List[Dict[str, str]],
+                      max_retries: int = 2,
+                      model: str | None = None,
+                      response_model: Type[BaseModel] = TutorResponse
+                      ) -> AsyncIterator[Tuple[str, Any]]:
+    """Stream a tutor answer.
+
+    Yields ``("feedback", delta)`` for every decoded piece of
+    ``feedback_text`` as soon as it arrives and finally
+    ``("response", TutorResponse)`` once the whole JSON object was received.
+    Retries only happen while nothing has been yielded yet.
+
+    Raises ``GPTClientError`` on failure.
+    """
+
+    error = _credentials_error(PROVIDER)
+    if error:
+        raise GPTClientError(error)
 
+    t0 = time.perf_counter()
+    for attempt in range(max_retries + 1):
+        t_attempt = time.perf_counter()
+        emitted = False
+        try:
+            async for event, value in _hedged("stream", messages, model or OPENAI_MODEL,
+                                              response_model):
+                if event == "response":
+                    if attempt:
+                        retry_stats["retry_seconds"] += t_attempt - t0
+                    yield event, value
+                    return
+                emitted = True
+                yield event, value
+            raise GPTClientError("stream ended without a response")
+        except Exception as exc:
+            if emitted or attempt == max_retries:
+                raise GPTClientError(f"GPT stream failed: {exc}") from exc
+            _count_retry(exc)
+            await asyncio.sleep(1.0 * (attempt + 1))
@@ -0,0 +1,105 @@
+"""
+json_repair.py
+--------------
+Tolerant parsing of near-valid tutor answers, so a stray code fence or a
+trailing comma does not cost a full GPT round-trip.
+
+Usage:
+    resp, repaired = parse_tutor_response(raw_text)
+
+``repaired`` tells whether anything had to be fixed.  ``ValueError`` is
+raised when the text cannot be turned into a valid ``TutorResponse``.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from typing import Any, Dict, Tuple, Type, TypeVar
+
+from pydantic import BaseModel, ValidationError
+
+from tutor_schema import TutorResponse
+
+_FENCE = re.compile(r"^\s*```(?:json)?\s*|\s*```\s*$", re.IGNORECASE)
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+_PY_LITERALS = {"True": "true", "False": "false", "None": "null"}
+
+M = TypeVar("M", bound=BaseModel)
+
+
+def _outside_strings(text: str, fn) -> str:
+    """Apply ``fn`` to the parts of ``text`` that are not JSON strings."""
+    out, buf = [], []
+    in_string = escape = False
+    for ch in text:
+        if in_string:
+            out.append(ch)
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            out.append(fn("".join(buf)))
+            buf = []
+            out.append(ch)
+            in_string = True
+        else:
+            buf.append(ch)
+    out.append(fn("".join(buf)))
+    return "".join(out)
+
+
+def _fix_code(part: str) -> str:
+    part = _TRAILING_COMMA.sub(r"\1", part)
+    return re.sub(r"\b(True|False|None)\b", lambda m: _PY_LITERALS[m.group(1)], part)
+
+
+def repair_json(text: str) -> Dict[str, Any]:
+    """Parse ``text`` after removing fences, prose and trailing commas."""
+    text = _FENCE.sub("", text.strip())
+    start, end = text.find("{"), text.rfind("}")
+    if start == -1 or end < start:
+        raise ValueError("no JSON object found")
+    text = _outside_strings(text[start : end + 1], _fix_code)
+    return json.loads(text)
+
+
+def _fix_fields(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Smooth over field-level slips the schema would reject."""
+    if "errors" in data and data["errors"] is None:
+        data["errors"] = []
+    for item in data.get("errors") or []:
+        if not isinstance(item, dict):
+            continue
+        # "word" is the old alias of "expected_word"; keep one of them.
+        if "word" in item and "expected_word" in item:
+            item.pop("word")
+        for key in ("expected_phonemes", "heard_phonemes"):
+            if item.get(key) is None:
+                item[key] = ""
+        if item.get("letter_errors") is None:
+            item["letter_errors"] = []
+    return data
+
+
+def parse_tutor_response(
+    text: str, model: Type[M] = TutorResponse
+) -> Tuple[M, bool]:
+    """Return ``(model instance, repaired)``; raises ``ValueError`` if hopeless."""
+    try:
+        return model.model_validate(json.loads(text)), False
+    except (ValueError, ValidationError):
+        pass
+    try:
+        data = repair_json(text)
+    except ValueError as exc:
+        raise ValueError(f"unrepairable JSON: {exc}") from exc
+    if not isinstance(data, dict):
+        raise ValueError("JSON is not an object")
+    try:
+        return model.model_validate(_fix_fields(data)), True
+    except ValidationError as exc:
+        raise ValueError(f"invalid {model.__name__}: {exc}") from exc
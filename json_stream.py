@@ -0,0 +1,173 @@
+"""
+json_stream.py
+--------------
+Incremental extraction of string fields from a JSON object that arrives in
+pieces, e.g. a streamed chat completion with ``response_format=json_object``.
+
+Usage:
+    parser = JsonFieldStream()
+    for chunk in chunks:
+        for ev in parser.feed(chunk):
+            ...  # ev.key, ev.index, ev.text, ev.done
+
+Only string values directly under a top-level key (``{"k": "..."}``) or
+inside a top-level array (``{"k": ["...", "..."]}``) are reported; all other
+values are skipped.  The full text is still available via ``parser.text`` so
+the caller can run a regular ``json.loads`` once the stream is complete.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import List
+
+_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+# Sentence ends at ., ! or ? (optionally followed by closing quotes) + space.
+_SENTENCE_END = re.compile(r"[.!?]+[\"')\]]*\s+")
+
+
+@dataclass
+class FieldEvent:
+    """A piece of a string value.
+
+    ``text`` is the newly decoded fragment while ``done`` is ``False`` and the
+    complete value once the closing quote has been seen.
+    """
+
+    key: str
+    index: int | None
+    text: str
+    done: bool = False
+
+
+class JsonFieldStream:
+    """Tolerant character-level scanner for streamed JSON objects."""
+
+    def __init__(self) -> None:
+        self.text = ""
+        self._depth = 0
+        self._stack: List[str] = []  # "{" / "[" per open container
+        self._in_string = False
+        self._escape = ""  # pending escape sequence (``\\`` or ``\\uXX..``)
+        self._string_is_key = False
+        self._expect_key = False
+        self._key: str | None = None
+        self._index: int | None = None
+        self._buf: List[str] = []
+        self._value: List[str] = []
+
+    # ------------------------------------------------------------------ helpers
+    def _tracked(self) -> bool:
+        """Is the current string a value we report?"""
+        if self._string_is_key or self._key is None:
+            return False
+        return self._depth == 1 or (self._depth == 2 and self._stack[-1] == "[")
+
+    def _flush(self, events: List[FieldEvent]) -> None:
+        if not self._tracked():
+            return
+        if self._buf:
+            frag = "".join(self._buf)
+            self._value.append(frag)
+            events.append(FieldEvent(self._key, self._index, frag))
+        self._buf = []
+
+    def _decode_escape(self, seq: str) -> str | None:
+        """Return the decoded char or ``None`` when ``seq`` is incomplete."""
+        if seq[1] == "u":
+            if len(seq) < 6:
+                return None
+            try:
+                return chr(int(seq[2:6], 16))
+            except ValueError:
+                return ""
+        return _ESCAPES.get(seq[1], seq[1])
+
+    # ------------------------------------------------------------------ public
+    def feed(self, chunk: str) -> List[FieldEvent]:
+        """Consume ``chunk`` and return the events it produced."""
+        self.text += chunk
+        events: List[FieldEvent] = []
+        for ch in chunk:
+            if self._in_string:
+                if self._escape:
+                    self._escape += ch
+                    decoded = self._decode_escape(self._escape)
+                    if decoded is not None:
+                        self._buf.append(decoded)
+                        self._escape = ""
+                elif ch == "\\":
+                    self._escape = ch
+                elif ch == '"':
+                    self._in_string = False
+                    if self._string_is_key:
+                        self._key = "".join(self._buf)
+                        self._buf = []
+                    else:
+                        self._flush(events)
+                        if self._tracked():
+                            events.append(
+                                FieldEvent(self._key, self._index, "".join(self._value), done=True)
+                            )
+                        self._value = []
+                else:
+                    self._buf.append(ch)
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                self._string_is_key = self._depth == 1 and self._expect_key
+                self._buf = []
+                self._value = []
+                if self._depth == 2 and self._stack[-1] == "[":
+                    self._index = 0 if self._index is None else self._index + 1
+            elif ch in "{[":
+                self._stack.append(ch)
+                self._depth += 1
+                if self._depth == 1:
+                    self._expect_key = True
+                elif self._depth == 2 and ch == "[":
+                    self._index = None
+            elif ch in "}]":
+                if self._stack:
+                    self._stack.pop()
+                self._depth = max(0, self._depth - 1)
+                if self._depth == 1:
+                    self._index = None
+            elif ch == ":" and self._depth == 1:
+                self._expect_key = False
+            elif ch == "," and self._depth == 1:
+                self._expect_key = True
+                self._key = None
+        # Report partial text of an open string so callers see progress.
+        if self._in_string and not self._escape:
+            self._flush(events)
+        return events
+
+
+class SentenceSplitter:
+    """Accumulate streamed text and emit complete sentences."""
+
+    def __init__(self) -> None:
+        self._pending = ""
+
+    def feed(self, text: str) -> List[str]:
+        self._pending += text
+        out: List[str] = []
+        while True:
+            m = _SENTENCE_END.search(self._pending)
+            if not m:
+                break
+            sentence = self._pending[: m.end()].strip()
+            self._pending = self._pending[m.end():]
+            if sentence:
+                out.append(sentence)
+        return out
+
+    def flush(self) -> List[str]:
+        """Return whatever is left once the stream has ended."""
+        rest = self._pending.strip()
+        self._pending = ""
+        return [rest] if rest else []
@@ -0,0 +1,214 @@
+"""
+model_router.py
+---------------
+Route tutor requests by difficulty: easy readings go to a small, fast model,
+hard ones to the large model.
+
+Usage:
+    router = Router(small_model="gpt-4o-mini", large_model="gpt-4o")
+    resp = await router.chat(req, messages)          # req is a TutorRequest
+
+A reading is easy when the transcripts hardly differ from the reference or
+from each other, the Azure summary scores agree and few words are flagged by
+pronunciation assessment.  Such answers are mostly a short encouraging
+remark, which the small model writes just as well.  When the small model
+fails (also after its retries) the request is escalated to the large model.
+"""
+
+from __future__ import annotations
+
+import time
+from contextlib import suppress
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Tuple, Type
+
+from pydantic import BaseModel
+
+import gpt_client
+from alignment import mismatches
+from tutor_schema import TutorRequest, TutorResponse
+
+SCORE_KEYS = ("pron_score", "accuracy_score", "fluency_score", "completeness_score")
+
+
+@dataclass(frozen=True)
+class Rules:
+    # Word errors in the worst transcript, and between the two transcripts
+    max_mismatches: int = 1
+    # Highest minus lowest Azure summary score (0-100)
+    max_score_spread: float = 25.0
+    # Words with an Azure error type or an accuracy below ``min_word_accuracy``
+    max_flagged_words: int = 1
+    min_word_accuracy: float = 60.0
+
+
+DEFAULT_RULES = Rules()
+
+
+def _words(text: Any) -> List[str]:
+    return text.lower().split() if isinstance(text, str) else []
+
+
+def features(req: TutorRequest, rules: Rules = DEFAULT_RULES) -> Dict[str, Any]:
+    """Difficulty signals of ``req`` used by :func:`classify`."""
+    ref = _words(req.reference_text)
+    transcripts = [
+        t
+        for t in (
+            _words((req.azure.get("plain") or {}).get("final_transcript")),
+            _words(req.wav2vec2.get("asr")),
+        )
+        if t
+    ]
+    pron = req.azure.get("pronunciation") or {}
+    scores = [
+        v
+        for v in ((pron.get("pronunciation_scores") or {}).get(k) for k in SCORE_KEYS)
+        if isinstance(v, (int, float))
+    ]
+    flagged = sum(
+        1
+        for w in pron.get("word_timings") or []
+        if w.get("error_type") not in (None, "None")
+        or (w.get("accuracy_score") or 0.0) < rules.min_word_accuracy
+    )
+    return {
+        "transcripts": len(transcripts),
+        "mismatches": max((len(mismatches(ref, t)) for t in transcripts), default=0),
+        "disagreement": len(mismatches(*transcripts)) if len(transcripts) == 2 else 0,
+        "score_spread": max(scores) - min(scores) if scores else None,
+        "flagged_words": flagged,
+    }
+
+
+def classify(req: TutorRequest, rules: Rules = DEFAULT_RULES) -> str:
+    """``"easy"`` or ``"hard"``; missing evidence counts as hard."""
+    f = features(req, rules)
+    if not f["transcripts"] or f["score_spread"] is None:
+        return "hard"
+    easy = (
+        f["mismatches"] <= rules.max_mismatches
+        and f["disagreement"] <= rules.max_mismatches
+        and f["score_spread"] <= rules.max_score_spread
+        and f["flagged_words"] <= rules.max_flagged_words
+    )
+    return "easy" if easy else "hard"
+
+
+class Router:
+    """Pick a model per request and keep per-route statistics."""
+
+    def __init__(self, small_model: str, large_model: str, rules: Rules = DEFAULT_RULES) -> None:
+        self.rules = rules
+        self.models = {"easy": small_model, "hard": large_model}
+        self.stats: Dict[str, Dict[str, float]] = {
+            route: {
+                "requests": 0,
+                "failures": 0,
+                "escalated": 0,
+                "invalid": 0,
+                "repaired": 0,
+                "prompt_tokens": 0,
+                "completion_tokens": 0,
+                "seconds": 0.0,
+            }
+            for route in self.models
+        }
+
+    def route(self, req: TutorRequest) -> Tuple[str, str]:
+        """``(route, model)`` for ``req``."""
+        route = classify(req, self.rules)
+        return route, self.models[route]
+
+    def _account(self, route: str, calls: Dict[str, int], seconds: float) -> None:
+        st = self.stats[route]
+        st["requests"] += 1
+        st["seconds"] += seconds
+        for key in ("invalid", "repaired", "prompt_tokens", "completion_tokens"):
+            st[key] += calls.get(key, 0)
+
+    async def chat(
+        self,
+        req: TutorRequest,
+        messages: List[Dict[str, str]],
+        response_model: Type[BaseModel] = TutorResponse,
+    ) -> Any:
+        route, _ = self.route(req)
+        try:
+            return await self._chat(route, messages, response_model)
+        except gpt_client.GPTClientError:
+            if route == "hard":
+                raise
+            self.stats[route]["escalated"] += 1
+            return await self._chat("hard", messages, response_model)
+
+    async def chat_stream(
+        self,
+        req: TutorRequest,
+        messages: List[Dict[str, str]],
+        response_model: Type[BaseModel] = TutorResponse,
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """Routed :func:`gpt_client.chat_stream`; escalates only before output."""
+        route, _ = self.route(req)
+        emitted = False
+        try:
+            async for item in self._stream(route, messages, response_model):
+                emitted = True
+                yield item
+        except gpt_client.GPTClientError:
+            if emitted or route == "hard":
+                raise
+            self.stats[route]["escalated"] += 1
+            async for item in self._stream("hard", messages, response_model):
+                yield item
+
+    async def _chat(
+        self, route: str, messages: List[Dict[str, str]], response_model: Type[BaseModel]
+    ) -> Any:
+        calls: Dict[str, int] = {}
+        token = gpt_client.call_stats.set(calls)
+        t0 = time.perf_counter()
+        try:
+            return await gpt_client.chat(
+                messages, model=self.models[route], response_model=response_model
+            )
+        except gpt_client.GPTClientError:
+            self.stats[route]["failures"] += 1
+            raise
+        finally:
+            gpt_client.call_stats.reset(token)
+            self._account(route, calls, time.perf_counter() - t0)
+
+    async def _stream(
+        self, route: str, messages: List[Dict[str, str]], response_model: Type[BaseModel]
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        calls: Dict[str, int] = {}
+        token = gpt_client.call_stats.set(calls)
+        t0 = time.perf_counter()
+        try:
+            async for item in gpt_client.chat_stream(
+                messages, model=self.models[route], response_model=response_model
+            ):
+                yield item
+        except gpt_client.GPTClientError:
+            self.stats[route]["failures"] += 1
+            raise
+        finally:
+            # A generator closed by the garbage collector runs in another context.
+            with suppress(ValueError):
+                gpt_client.call_stats.reset(token)
+            self._account(route, calls, time.perf_counter() - t0)
+
+    def metrics(self) -> Dict[str, Any]:
+        out = {}
+        for route, st in self.stats.items():
+            n = st["requests"]
+            out[route] = {
+                **st,
+                "model": self.models[route],
+                "seconds": round(st["seconds"], 3),
+                "avg_seconds": round(st["seconds"] / n, 3) if n else None,
+                "failure_rate": round(st["failures"] / n, 3) if n else None,
+                "invalid_rate": round(st["invalid"] / n, 3) if n else None,
+            }
+        return out
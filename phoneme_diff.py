@@ -0,0 +1,349 @@
+"""
+phoneme_diff.py
+---------------
+Deterministic error details (phonemes and letters) from the engine results,
+so the tutor model only has to decide and write ``feedback_text``.
+
+Usage:
+    diffs = word_diffs(req)                 # req is a TutorRequest
+    resp = complete(req, feedback)          # TutorFeedback -> TutorResponse
+
+The espeak reference phonemes of the sentence are aligned with the wav2vec2
+phoneme stream by a weighted edit distance, computed row by row with numpy.
+Leading and trailing phonemes of the recording are free, so noise before or
+after the sentence does not count.  Each word's phonemes are then mapped onto
+its Dutch graphemes with the same aligner, which gives the letters behind
+every wrong or missing sound.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from alignment import align
+from tutor_schema import ErrorItem, LetterError, TutorFeedback, TutorRequest, TutorResponse
+from dutch_graphemes import segment
+
+# Multi-character units in espeak-ng Dutch output and the wav2vec2 vocabulary
+_UNITS = sorted(("ɛi", "œy", "ʌu", "ɑu", "ɔu", "ɑi", "ɔi", "ui"), key=len, reverse=True)
+_MODIFIERS = set("ːˑʰʲʷ̩̯̃")
+_IGNORED = set("ˈˌ-_.,!?'\"()|0123456789")
+_VOWELS = set("aeiouyæɑɐɒɔəɛɜɪʊʌœøɵʏɨ")
+
+# Substitution costs; a gap (missing or extra phoneme) costs 1.
+SAME_BASE = 0.3  # only length differs (aː / a)
+SAME_CLASS = 1.0  # vowel for vowel, consonant for consonant
+OTHER_CLASS = 1.6
+
+# Sounds a Dutch grapheme can stand for; single letters not listed map to
+# themselves.
+G2P: Dict[str, Tuple[str, ...]] = {
+    "a": ("ɑ", "aː", "a"),
+    "aa": ("aː", "a"),
+    "e": ("ɛ", "ə", "eː", "e"),
+    "ee": ("eː", "e"),
+    "i": ("ɪ", "i", "ə"),
+    "ie": ("i", "iː"),
+    "o": ("ɔ", "oː", "o"),
+    "oo": ("oː", "o"),
+    "u": ("ʏ", "y", "ə"),
+    "uu": ("y", "yː"),
+    "oe": ("u", "uː"),
+    "eu": ("øː", "ø"),
+    "ui": ("œy",),
+    "ij": ("ɛi",),
+    "ei": ("ɛi",),
+    "ou": ("ʌu", "ɑu", "ɔu"),
+    "au": ("ʌu", "ɑu", "ɔu"),
+    "aai": ("aː", "i", "j"),
+    "ooi": ("oː", "i", "j"),
+    "oei": ("u", "i", "j"),
+    "uw": ("y", "ʋ", "w"),
+    "ieuw": ("i", "ʋ", "w"),
+    "eeuw": ("eː", "ʋ", "w"),
+    "ch": ("x", "χ"),
+    "sch": ("s", "x", "χ"),
+    "g": ("ɣ", "x", "χ"),
+    "ng": ("ŋ",),
+    "nk": ("ŋ", "k"),
+    "w": ("ʋ", "w"),
+    "v": ("v", "f"),
+    "z": ("z", "s"),
+    "d": ("d", "t"),
+    "b": ("b", "p"),
+    "r": ("r", "ʁ", "ɾ", "ɹ"),
+    "c": ("k", "s"),
+    "x": ("k", "s"),
+    "q": ("k",),
+    "y": ("i", "j", "ɛi"),
+    "h": ("h", "ɦ"),
+    "l": ("l", "ɫ"),
+}
+# Letters without a sound of their own (doubled consonants) or spread over
+# two sounds (nk, sch) cost less than a real mismatch.
+GRAPHEME_GAP = 0.5
+
+
+def tokenize(text: str) -> List[str]:
+    """Split an IPA string into phoneme units, keeping length marks."""
+    out: List[str] = []
+    i = 0
+    while i < len(text):
+        ch = text[i]
+        if ch in _IGNORED or ch.isspace():
+            i += 1
+            continue
+        unit = next((u for u in _UNITS if text.startswith(u, i)), ch)
+        i += len(unit)
+        while i < len(text) and text[i] in _MODIFIERS:
+            unit += text[i]
+            i += 1
+        out.append(unit)
+    return out
+
+
+def _base(token: str) -> str:
+    return "".join(ch for ch in token if ch not in _MODIFIERS)
+
+
+def is_vowel(token: str) -> bool:
+    return any(ch in _VOWELS for ch in token)
+
+
+def _substitution_costs(a: Sequence[str], b: Sequence[str]) -> np.ndarray:
+    """``len(a) x len(b)`` matrix of substitution costs."""
+    symbols = sorted(set(a) | set(b))
+    ids = {s: i for i, s in enumerate(symbols)}
+    base_ids = {s: i for i, s in enumerate(sorted({_base(s) for s in symbols}))}
+    a_id = np.array([ids[s] for s in a])
+    b_id = np.array([ids[s] for s in b])
+    a_base = np.array([base_ids[_base(s)] for s in a])
+    b_base = np.array([base_ids[_base(s)] for s in b])
+    a_vowel = np.array([is_vowel(s) for s in a])
+    b_vowel = np.array([is_vowel(s) for s in b])
+    return np.where(
+        a_id[:, None] == b_id[None, :],
+        0.0,
+        np.where(
+            a_base[:, None] == b_base[None, :],
+            SAME_BASE,
+            np.where(a_vowel[:, None] == b_vowel[None, :], SAME_CLASS, OTHER_CLASS),
+        ),
+    )
+
+
+def align_costs(
+    sub: np.ndarray, gap_a: float = 1.0, gap_b: float = 1.0, free_b_ends: bool = False
+) -> List[Tuple[int | None, int | None]]:
+    """Minimum-cost alignment for a substitution matrix.
+
+    Returns ``(i, j)`` pairs in order; ``j`` is ``None`` for an unmatched
+    ``a[i]`` and ``i`` is ``None`` for an unmatched ``b[j]``.  With
+    ``free_b_ends`` the elements of ``b`` before and after the aligned part
+    cost nothing and are left out.  Each row is one vectorized step: the
+    chain of gaps in ``a``'s direction is a running minimum.
+    """
+    n, m = sub.shape
+    ramp = np.arange(m + 1) * gap_b
+    cost = np.empty((n + 1, m + 1))
+    cost[0] = 0.0 if free_b_ends else ramp
+    t = np.empty(m + 1)
+    for i in range(1, n + 1):
+        t[0] = cost[i - 1, 0] + gap_a
+        np.minimum(cost[i - 1, :-1] + sub[i - 1], cost[i - 1, 1:] + gap_a, out=t[1:])
+        cost[i] = np.minimum.accumulate(t - ramp) + ramp
+
+    i = n
+    j = int(np.argmin(cost[n])) if free_b_ends else m
+    pairs: List[Tuple[int | None, int | None]] = []
+    while i > 0 or (j > 0 and not free_b_ends):
+        here = cost[i, j]
+        if i and j and abs(here - (cost[i - 1, j - 1] + sub[i - 1, j - 1])) < 1e-9:
+            pairs.append((i - 1, j - 1))
+            i, j = i - 1, j - 1
+        elif i and abs(here - (cost[i - 1, j] + gap_a)) < 1e-9:
+            pairs.append((i - 1, None))
+            i -= 1
+        else:
+            pairs.append((None, j - 1))
+            j -= 1
+    pairs.reverse()
+    return pairs
+
+
+def _fits(grapheme: str, token: str) -> bool:
+    sounds = G2P.get(grapheme, (grapheme,))
+    return token in sounds or _base(token) in sounds
+
+
+def grapheme_map(word: str, tokens: Sequence[str]) -> Tuple[Tuple[str, ...], List[int]]:
+    """Graphemes of ``word`` and the grapheme index of every phoneme token."""
+    graphemes = segment(word)
+    if not graphemes or not tokens:
+        return graphemes, [0] * len(tokens)
+    sub = np.array([[0.0 if _fits(g, t) else 1.0 for t in tokens] for g in graphemes])
+    owner: List[int | None] = [None] * len(tokens)
+    for gi, ti in align_costs(sub, GRAPHEME_GAP, GRAPHEME_GAP):
+        if ti is not None:
+            owner[ti] = gi
+    # Extra sounds go to a neighbouring grapheme that can make them (the "k"
+    # of "nk"), otherwise to the grapheme before them.
+    for k, o in enumerate(owner):
+        if o is not None:
+            continue
+        prev = next((owner[x] for x in range(k - 1, -1, -1) if owner[x] is not None), None)
+        nxt = next((owner[x] for x in range(k + 1, len(owner)) if owner[x] is not None), None)
+        if nxt is not None and _fits(graphemes[nxt], tokens[k]):
+            owner[k] = nxt
+        elif prev is not None:
+            owner[k] = prev
+        else:
+            owner[k] = nxt if nxt is not None else 0
+    return graphemes, owner  # type: ignore[return-value]
+
+
+@dataclass
+class WordDiff:
+    index: int
+    word: str
+    expected: List[str]
+    heard: List[str] = field(default_factory=list)
+    # Positions in ``expected`` that were replaced or missing
+    wrong: List[int] = field(default_factory=list)
+    inserted: int = 0
+
+    @property
+    def issue(self) -> str:
+        if self.expected and not self.heard:
+            return "omission"
+        kinds = {is_vowel(self.expected[p]) for p in self.wrong}
+        if kinds == {True}:
+            return "vowel"
+        if kinds == {False}:
+            return "consonant"
+        return "mispronunciation"
+
+    def letter_errors(self) -> List[LetterError]:
+        graphemes, owner = grapheme_map(self.word, self.expected)
+        hit = sorted({owner[p] for p in self.wrong})
+        return [
+            LetterError(
+                letters=graphemes[g],
+                phonemes="".join(t for t, o in zip(self.expected, owner) if o == g),
+            )
+            for g in hit
+        ]
+
+
+def _heard_tokens(chunks: Any) -> List[str]:
+    text = "".join(
+        "".join(c.get("phonemes") or []) if isinstance(c, dict) else str(c)
+        for c in chunks or []
+    )
+    return tokenize(text)
+
+
+def word_diffs(req: TutorRequest) -> List[WordDiff]:
+    """Per reference word, the phonemes heard for it and which ones differ.
+
+    Empty when the reference phonemes or the wav2vec2 stream are missing.
+    """
+    words = req.reference_text.split()
+    diffs = [
+        WordDiff(i, w, tokenize(req.reference_phonemes.get(w) or "")) for i, w in enumerate(words)
+    ]
+    ref: List[str] = []
+    owner: List[Tuple[int, int]] = []
+    for d in diffs:
+        ref += d.expected
+        owner += [(d.index, p) for p in range(len(d.expected))]
+    heard = _heard_tokens(req.wav2vec2.get("phonemes"))
+    if not ref or not heard:
+        return []
+
+    sub = _substitution_costs(ref, heard)
+    current = 0
+    for i, j in align_costs(sub, free_b_ends=True):
+        if i is None:
+            diffs[current].heard.append(heard[j])
+            diffs[current].inserted += 1
+            continue
+        current, pos = owner[i]
+        d = diffs[current]
+        if j is None:
+            d.wrong.append(pos)
+        else:
+            d.heard.append(heard[j])
+            if heard[j] != ref[i]:
+                d.wrong.append(pos)
+    return diffs
+
+
+def _heard_words(req: TutorRequest) -> Dict[int, str | None]:
+    """Reference index -> word a transcript heard there (``None``: omitted)."""
+    reference = req.reference_text.split()
+    for text in (
+        (req.azure.get("plain") or {}).get("final_transcript"),
+        req.wav2vec2.get("asr"),
+    ):
+        if isinstance(text, str) and text.strip():
+            return {
+                op.ref_index: op.heard
+                for op in align(reference, text.split())
+                if op.op != "insertion"
+            }
+    return {}
+
+
+def complete(req: TutorRequest, feedback: TutorFeedback) -> TutorResponse:
+    """Expand the words the tutor judged wrong into full ``ErrorItem``s."""
+    reference = req.reference_text.split()
+    diffs = {d.index: d for d in word_diffs(req)}
+    heard_words = _heard_words(req)
+    used: set[int] = set()
+    errors: List[ErrorItem] = []
+    for word in feedback.error_words:
+        w = word.strip().lower()
+        idx = next(
+            (i for i, r in enumerate(reference) if r.lower() == w and i not in used), None
+        )
+        if idx is None:
+            errors.append(
+                ErrorItem(
+                    expected_word=None,
+                    heard_word=word,
+                    expected_phonemes="",
+                    heard_phonemes="",
+                    issue="insertion",
+                )
+            )
+            continue
+        used.add(idx)
+        diff = diffs.get(idx)
+        heard = heard_words.get(idx, reference[idx])
+        if idx in heard_words and heard is None:
+            issue = "omission"
+        elif diff and diff.wrong:
+            issue = diff.issue
+        else:
+            issue = "mispronunciation"
+        errors.append(
+            ErrorItem(
+                expected_word=reference[idx],
+                heard_word=heard,
+                expected_phonemes=req.reference_phonemes.get(reference[idx]) or "",
+                heard_phonemes="".join(diff.heard) if diff else "",
+                issue=issue,
+                letter_errors=diff.letter_errors() if diff else [],
+            )
+        )
+    return TutorResponse(
+        mode=feedback.mode,
+        feedback_text=feedback.feedback_text,
+        repeat=feedback.repeat,
+        is_correct=feedback.is_correct,
+        errors=errors,
+    )
@@ -5,6 +5,15 @@ Builds the TutorRequest object and the `messages` list for a GPT chat call.
 
 Usage:
     req, messages = build(results_json, state, system_prompt_file="prompt_template.md")
+    req, messages = build(results_json, state, compact=True)
+    req, messages = build(results_json, state, local_errors=True)
+
+``compact=True`` sends only the decision-relevant fields in a dense format
+(see ``COMPACT_LEGEND``); the legend is appended to the system prompt so the
+whole system message stays an identical, cacheable prefix.
+
+``local_errors=True`` asks for a ``TutorFeedback`` (``error_words`` instead of
+full ``errors``); ``phoneme_diff.complete`` fills in phonemes and letters.
 """
 
 from __future__ import annotations
@@ -47,13 +56,104 @@ def _combine_asr_chunks(chunks: Any) -> str:
     return _strip_punctuation(text.strip())
 
 
+_system_prompts: Dict[Path, Tuple[float, str]] = {}
+
+
 def _load_system_prompt(path: str | Path) -> str:
-    return Path(path).read_text(encoding="utf-8")
+    """Read the system prompt, re-reading only when the file has changed."""
+    path = Path(path)
+    mtime = path.stat().st_mtime
+    cached = _system_prompts.get(path)
+    if cached is None or cached[0] != mtime:
+        cached = (mtime, path.read_text(encoding="utf-8"))
+        _system_prompts[path] = cached
+    return cached[1]
+
+
+COMPACT_LEGEND = """
+──────────────────────────────────────────────────────────────
+**COMPACT INPUT FORMAT**
+──────────────────────────────────────────────────────────────
+The user message is a dense JSON object; absent keys mean "no data".
+  ref        reference_text
+  ref_ph     reference_phonemes (word → phonemes)
+  plain      Azure-plain final transcript
+  pron.text  Azure-pronunciation final transcript
+  pron.scores  {pron, accuracy, fluency, completeness, prosody}
+  pron.words [word, accuracy_score, error_type] (error_type only when flagged)
+  asr        W2V2-ASR transcript
+  ph         W2V2-phoneme slice, chunks separated by " | "
+  history    short conversation memory
+"""
+
+LOCAL_ERRORS_NOTE = """
+──────────────────────────────────────────────────────────────
+**ERROR DETAILS ARE FILLED IN LOCALLY**
+──────────────────────────────────────────────────────────────
+Do not return `errors`.  Return `error_words` instead: the reference words
+you judged wrong, in sentence order (for an insertion, the extra word you
+heard).  Phonemes and letter errors are added afterwards.
+"""
+
+_SCORE_NAMES = {
+    "pron_score": "pron",
+    "accuracy_score": "accuracy",
+    "fluency_score": "fluency",
+    "completeness_score": "completeness",
+    "prosody_score": "prosody",
+}
+
+
+def _compact_payload(req: TutorRequest) -> str:
+    """Decision-relevant fields of ``req`` as dense JSON, stable fields first."""
+    out: Dict[str, Any] = {"ref": req.reference_text}
+    if req.reference_phonemes:
+        out["ref_ph"] = req.reference_phonemes
+
+    plain = req.azure.get("plain") or {}
+    if plain.get("final_transcript") is not None:
+        out["plain"] = plain["final_transcript"]
+
+    pron = req.azure.get("pronunciation") or {}
+    p: Dict[str, Any] = {}
+    if pron.get("final_transcript") is not None:
+        p["text"] = pron["final_transcript"]
+    raw_scores = pron.get("pronunciation_scores") or {}
+    scores = {
+        short: raw_scores[k] for k, short in _SCORE_NAMES.items() if raw_scores.get(k) is not None
+    }
+    if scores:
+        p["scores"] = scores
+    words = []
+    for w in pron.get("word_timings") or []:
+        item = [w.get("word", ""), w.get("accuracy_score")]
+        if w.get("error_type") not in (None, "None"):
+            item.append(w["error_type"])
+        words.append(item)
+    if words:
+        p["words"] = words
+    if p:
+        out["pron"] = p
+
+    if req.wav2vec2.get("asr"):
+        out["asr"] = req.wav2vec2["asr"]
+    chunks = req.wav2vec2.get("phonemes") or []
+    ph = " | ".join(
+        " ".join(c.get("phonemes") or []) if isinstance(c, dict) else str(c) for c in chunks
+    ).strip(" |")
+    if ph:
+        out["ph"] = ph
+
+    if req.history:
+        out["history"] = req.history
+    return json.dumps(out, ensure_ascii=False, separators=(",", ":"))
 
 
 def build(results: Dict[str, Any],
           state: Dict[str, Any] | None,
-          system_prompt_file: str = Path(__file__).with_name("prompt_template.md")
+          system_prompt_file: str = Path(__file__).with_name("prompt_template.md"),
+          compact: bool = False,
+          local_errors: bool = False,
           ) -> Tuple[TutorRequest, List[Dict[str, str]]]:
     """
     Convert raw engine `results` + `state` into:
@@ -63,6 +163,10 @@ def build(results: Dict[str, Any],
     sentence_id = results["session_id"]  # reuse until you add per-sentence IDs
 
     azure_plain = results.get("azure_plain")
+    if (results.get("metadata") or {}).get("azure_plain_source") == "pronunciation":
+        # Derived from the pronunciation recognizer, which is primed with the
+        # reference sentence: no independent evidence of what was read.
+        azure_plain = None
     if isinstance(azure_plain, dict):
         ft = azure_plain.get("final_transcript")
         if isinstance(ft, str):
@@ -99,9 +203,16 @@ def build(results: Dict[str, Any],
 
     # ── Build messages
     system_txt = _load_system_prompt(system_prompt_file)
+    if compact:
+        system_txt += COMPACT_LEGEND
+        user_txt = _compact_payload(req)
+    else:
+        user_txt = req.model_dump_json()
+    if local_errors:
+        system_txt += LOCAL_ERRORS_NOTE
     messages: List[Dict[str, str]] = [
         {"role": "system", "content": system_txt},
-        {"role": "user",   "content": req.model_dump_json()}
+        {"role": "user",   "content": user_txt}
     ]
 
     # If the previous assistant turn exists, prepend it (few LMs like short context)
@@ -0,0 +1,213 @@
+"""
+push_feeder.py
+--------------
+One thread that forwards queued PCM frames into Azure push streams for all
+recognizers.
+
+Usage:
+    feed = feeder.attach(audio_queue, push_stream, sample_rate=16000,
+                         on_write=callback)   # callback(nbytes)
+    ...
+    audio_queue.put(None)                     # end of recording
+    feed.join()
+
+Every ``AZURE_FEED_INTERVAL_MS`` the thread drains the queues of all attached
+feeds.  Frames are collected until ``AZURE_FEED_WRITE_MS`` of audio is
+pending (or the oldest frame waited ``AZURE_FEED_MAX_DELAY_MS``, or the
+recording ended) and then go out in a single ``write``.  The frames are
+joined straight from their buffers, so each write costs one copy instead of
+a ``tobytes()`` per frame plus an SDK call per frame.
+"""
+
+from __future__ import annotations
+
+import os
+import queue
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Tuple
+
+WRITE_MS = float(os.getenv("AZURE_FEED_WRITE_MS", "100"))
+INTERVAL_MS = float(os.getenv("AZURE_FEED_INTERVAL_MS", "20"))
+MAX_DELAY_MS = float(os.getenv("AZURE_FEED_MAX_DELAY_MS", "200"))
+# Seconds of history behind the bytes/s figure
+RATE_WINDOW = 10.0
+
+
+def _view(pcm) -> memoryview:
+    """Byte view of a numpy array or bytes-like frame, without copying."""
+    return memoryview(pcm).cast("B")
+
+
+class Feed:
+    """One queue → push stream pairing; ``join``/``is_alive`` like a thread."""
+
+    def __init__(
+        self,
+        audio_queue: queue.Queue,
+        push_stream,
+        write_bytes: int,
+        on_write: Callable[[int], None] | None,
+    ) -> None:
+        self.audio_queue = audio_queue
+        self.push_stream = push_stream
+        self.write_bytes = write_bytes
+        self.on_write = on_write
+        self._pending: List[memoryview] = []
+        self._pending_bytes = 0
+        self._oldest = 0.0
+        self._done = threading.Event()
+
+    def is_alive(self) -> bool:
+        return not self._done.is_set()
+
+    def join(self, timeout: float | None = None) -> None:
+        self._done.wait(timeout)
+
+    def _finish(self) -> None:
+        self._pending = []
+        self._pending_bytes = 0
+        self._done.set()
+
+    def pump(self, feeder: "PushFeeder", now: float, max_delay: float) -> None:
+        """Drain the queue and write when enough audio is pending."""
+        ended = False
+        while True:
+            try:
+                pcm = self.audio_queue.get_nowait()
+            except queue.Empty:
+                break
+            if pcm is None:
+                ended = True
+                break
+            view = _view(pcm)
+            if not view.nbytes:
+                continue
+            if not self._pending:
+                self._oldest = now
+            self._pending.append(view)
+            self._pending_bytes += view.nbytes
+        if self._pending and (
+            ended
+            or self._pending_bytes >= self.write_bytes
+            or now - self._oldest >= max_delay
+        ):
+            data = b"".join(self._pending)
+            frames = len(self._pending)
+            self._pending = []
+            self._pending_bytes = 0
+            t0 = time.perf_counter()
+            try:
+                self.push_stream.write(data)
+            except Exception:
+                feeder._record_error()
+                self._finish()
+                return
+            feeder._record_write(len(data), frames, time.perf_counter() - t0)
+            if self.on_write is not None:
+                self.on_write(len(data))
+        if ended:
+            self._finish()
+
+
+class PushFeeder:
+    """Shared timer-driven writer for all attached :class:`Feed` objects."""
+
+    def __init__(
+        self,
+        write_ms: float = WRITE_MS,
+        interval_ms: float = INTERVAL_MS,
+        max_delay_ms: float = MAX_DELAY_MS,
+    ) -> None:
+        self.write_ms = write_ms
+        self.interval = interval_ms / 1000
+        self.max_delay = max_delay_ms / 1000
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._feeds: List[Feed] = []
+        self._thread: threading.Thread | None = None
+        self._latencies: Deque[float] = deque(maxlen=1000)
+        self._recent: Deque[Tuple[float, int]] = deque()
+        self.stats = {"feeds": 0, "writes": 0, "frames": 0, "bytes": 0, "errors": 0}
+
+    def attach(
+        self,
+        audio_queue: queue.Queue,
+        push_stream,
+        *,
+        sample_rate: int = 16000,
+        on_write: Callable[[int], None] | None = None,
+    ) -> Feed:
+        """Start forwarding ``audio_queue`` (16-bit mono) into ``push_stream``."""
+        write_bytes = max(2, int(sample_rate * 2 * self.write_ms / 1000))
+        feed = Feed(audio_queue, push_stream, write_bytes, on_write)
+        with self._lock:
+            self._feeds.append(feed)
+            self.stats["feeds"] += 1
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, daemon=True, name="azure-feeder"
+                )
+                self._thread.start()
+        self._wake.set()
+        return feed
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                feeds = list(self._feeds)
+            if not feeds:
+                self._wake.wait()
+                self._wake.clear()
+                continue
+            now = time.monotonic()
+            for feed in feeds:
+                try:
+                    feed.pump(self, now, self.max_delay)
+                except Exception:
+                    # A bad frame or callback ends only this feed, not the
+                    # thread serving every session.
+                    self._record_error()
+                    feed._finish()
+            with self._lock:
+                self._feeds = [f for f in self._feeds if f.is_alive()]
+            time.sleep(self.interval)
+
+    def _record_write(self, nbytes: int, frames: int, seconds: float) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self.stats["writes"] += 1
+            self.stats["frames"] += frames
+            self.stats["bytes"] += nbytes
+            self._latencies.append(seconds)
+            self._recent.append((now, nbytes))
+            while self._recent and now - self._recent[0][0] > RATE_WINDOW:
+                self._recent.popleft()
+
+    def _record_error(self) -> None:
+        with self._lock:
+            self.stats["errors"] += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            lat = sorted(self._latencies)
+            recent = sum(n for t, n in self._recent if now - t <= RATE_WINDOW)
+            writes = self.stats["writes"]
+            return {
+                **self.stats,
+                "active": len(self._feeds),
+                "frames_per_write": round(self.stats["frames"] / writes, 2) if writes else None,
+                "bytes_per_second": round(recent / RATE_WINDOW),
+                "avg_write_ms": round(1000 * sum(lat) / len(lat), 3) if lat else None,
+                "p95_write_ms": (
+                    round(1000 * lat[min(len(lat) - 1, int(0.95 * len(lat)))], 3)
+                    if lat
+                    else None
+                ),
+                "max_write_ms": round(1000 * lat[-1], 3) if lat else None,
+            }
+
+
+feeder = PushFeeder()
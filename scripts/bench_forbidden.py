@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Benchmark forbidden-grapheme filtering.
+
+Compares a plain per-word segmentation check with the compiled
+``ForbiddenMatcher`` on the word bank, on random sentences and on one clean
+seven-line story section, for every cumulative allowed set of the AVI Start
+units, and checks both agree.
+"""
+
+import argparse
+from pathlib import Path
+import random
+import sys
+import time
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from webapp.backend.graphemes import forbidden_matcher, forbidden_sequences_from_allowed, segment
+from webapp.backend.word_bank import DATA_FILE
+
+# focus_klanken of AVI Start units A-E (frontend-react/src/lib/contentConfig.ts)
+UNITS = [
+    ["m", "r", "v", "i", "s", "aa", "p", "e"],
+    ["t", "n", "b", "oo", "ee"],
+    ["d", "oe", "k", "ij", "z"],
+    ["h", "w", "o", "a", "u"],
+    ["eu", "j", "ie", "l", "ou", "uu"],
+]
+
+
+def naive(text: str, forbidden: list[str]) -> bool:
+    return any(g in forbidden for w in text.lower().split() for g in segment(w))
+
+
+def _timed(fn, repeat: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t0) * 1000 / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=20, help="Runs per measurement")
+    parser.add_argument("--sentences", type=int, default=2000, help="Synthetic sentences")
+    args = parser.parse_args()
+
+    words = [
+        line.strip()
+        for line in DATA_FILE.read_text(encoding="utf-8").splitlines()
+        if line.strip() and not line.startswith("#")
+    ]
+    rng = random.Random(0)
+    sentences = [
+        " ".join(rng.choice(words) for _ in range(rng.randint(3, 7))) + "."
+        for _ in range(args.sentences)
+    ]
+
+    allowed: list[str] = []
+    print(f"{'unit':<6}{'forbidden':>10}{'corpus':>11}{'naive ms':>12}{'matcher ms':>12}{'speedup':>9}")
+    for n, focus in enumerate(UNITS):
+        allowed = allowed + focus
+        forb = forbidden_sequences_from_allowed(allowed)
+        matcher = forbidden_matcher(allowed)
+        clean = [w for w in words if not naive(w, forb)] or ["ik"]
+        story = [
+            " ".join(rng.choice(clean) for _ in range(rng.randint(3, 7))) + "."
+            for _ in range(7)
+        ]
+        for name, corpus in (("words", words), ("sentences", sentences), ("story", story)):
+            assert [naive(t, forb) for t in corpus] == matcher.check_many(corpus)
+            old = _timed(lambda: [naive(t, forb) for t in corpus], args.repeat)
+            new = _timed(lambda: matcher.check_many(corpus), args.repeat)
+            print(
+                f"{'ABCDE'[n]:<6}{len(forb):>10}{name:>11}{old:>12.3f}{new:>12.3f}{old / new:>8.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
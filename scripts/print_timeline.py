@@ -26,6 +26,9 @@ def main(path: str) -> None:
         ("first_chunk_received", "azure_first_write", "azure first write"),
         ("w2v2_ready_ph", "w2v2_first_decode", "w2v2 first decode"),
         ("/stop_in", "json_ready", "/stop roundtrip"),
+        ("json_ready", "gpt_first_token", "gpt first token"),
+        ("/stop_in", "tts_first_audio", "stop to first audio"),
+        ("/stop_in", "local_verdict", "stop to local verdict"),
     ]:
         d = _delta(tb, a, b)
         if d is not None:
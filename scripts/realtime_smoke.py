@@ -37,9 +37,8 @@ def main() -> None:
     parser.add_argument("--reps", type=int, default=3)
     args = parser.parse_args()
 
-    config.REALTIME_FLAGS.update(
-        {"azure_pron": True, "azure_plain": True, "w2v2_phonemes": True, "w2v2_asr": True}
-    )
+    for settings in config.ENGINES.values():
+        settings["realtime"] = True
 
     sr = 16000
     if args.wav:
@@ -59,11 +58,14 @@ def main() -> None:
             session.add_chunk(chunk.tobytes())
         res = session.stop()
 
-        assert session.phon_thread.eor_event.is_set()
-        assert session.asr_thread.eor_event.is_set()
-        if session.azure_plain_q is not None:
-            assert session.azure_plain.bytes_pushed > 0
-            assert session.azure_pron.bytes_pushed > 0
+        report = res["timing"]["engines"]
+        assert report["w2v2_phonemes"]["status"] == "ok"
+        assert report["w2v2_asr"]["status"] == "ok"
+        if config.AZURE_PUSH_STREAM:
+            for name in ("azure_pron", "azure_plain"):
+                engine = session.engines.get(name)
+                if engine is not None:
+                    assert engine.recognizer.bytes_pushed > 0
             if res["azure_plain"]["final_transcript"] is None or res["azure_pronunciation"]["final_transcript"] is None:
                 print("warning: Azure returned no transcript")
         assert res["wav2vec2_asr"]
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Replay stored results through the fast-path verdict.
+
+Every result in the database that was judged by GPT is rebuilt into a
+``TutorRequest`` and checked with ``fast_path.blocker``.  Prints the bypass
+rate, how often GPT agreed ("correct") with the bypassed readings and which
+rules blocked the rest, so thresholds can be tuned before changing
+``FAST_PATH_*`` in ``webapp/backend/config.py``.
+"""
+
+import argparse
+from collections import Counter
+import json
+from pathlib import Path
+import sqlite3
+import sys
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+import fast_path
+import prompt_builder
+from webapp.backend import storage
+
+
+def main() -> None:
+    d = fast_path.DEFAULT_THRESHOLDS
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--db", default=str(storage.DB_PATH), help="SQLite database")
+    parser.add_argument("--min-pron-score", type=float, default=d.min_pron_score)
+    parser.add_argument("--min-accuracy-score", type=float, default=d.min_accuracy_score)
+    parser.add_argument("--min-completeness-score", type=float, default=d.min_completeness_score)
+    parser.add_argument("--min-word-accuracy", type=float, default=d.min_word_accuracy)
+    parser.add_argument("--allow-missing-wav2vec2", action="store_true")
+    parser.add_argument("--show-disagreements", action="store_true")
+    args = parser.parse_args()
+
+    th = fast_path.Thresholds(
+        min_pron_score=args.min_pron_score,
+        min_accuracy_score=args.min_accuracy_score,
+        min_completeness_score=args.min_completeness_score,
+        min_word_accuracy=args.min_word_accuracy,
+        require_wav2vec2=not args.allow_missing_wav2vec2,
+    )
+
+    conn = sqlite3.connect(args.db)
+    rows = conn.execute("SELECT id, json_data FROM results").fetchall()
+
+    total = bypassed = agree = gpt_correct = 0
+    blocked: Counter = Counter()
+    for rid, raw in rows:
+        try:
+            results = json.loads(raw)
+        except (TypeError, ValueError):
+            continue
+        # Readings that already took the fast path have no GPT label.
+        if results.get("fast_path") or results.get("correct") is None:
+            continue
+        try:
+            req, _ = prompt_builder.build(results, state={})
+        except Exception:
+            continue
+        total += 1
+        gpt_correct += bool(results["correct"])
+        reason = fast_path.blocker(req, th)
+        if reason is not None:
+            blocked[reason] += 1
+            continue
+        bypassed += 1
+        if results["correct"]:
+            agree += 1
+        elif args.show_disagreements:
+            print(f"disagree {rid}: {req.reference_text!r}")
+
+    if not total:
+        print("No GPT-judged results to replay.")
+        return
+    print(f"replayed          {total}")
+    print(f"bypassed          {bypassed} ({bypassed / total:.1%})")
+    if bypassed:
+        print(f"agreement         {agree}/{bypassed} ({agree / bypassed:.1%})")
+    if gpt_correct:
+        print(f"correct coverage  {agree}/{gpt_correct} ({agree / gpt_correct:.1%})")
+    print("blocked by:")
+    for reason, n in blocked.most_common():
+        print(f"  {reason:<22}{n}")
+
+
+if __name__ == "__main__":
+    main()
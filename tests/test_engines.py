@@ -0,0 +1,96 @@
+import time
+
+from engines import Engine, EngineContext, EngineSpec, Scheduler
+
+
+class FakeEngine(Engine):
+    """Engine that takes ``seconds`` to finalize or to process a file."""
+
+    seconds = 0.0
+
+    def empty(self):
+        return {self.spec.result_keys[0]: None}
+
+    def start(self, results, turn_id):
+        results.update(self.empty())
+
+    def finalize(self, deadline):
+        time.sleep(self.seconds)
+        return True
+
+    def process_file(self, wav_path, results):
+        time.sleep(self.seconds)
+        results[self.spec.result_keys[0]] = "done"
+
+
+def _spec(name, seconds, **kw):
+    engine_class = type(f"Fake_{name}", (FakeEngine,), {"seconds": seconds})
+    return EngineSpec(name, (name,), engine_class, **kw)
+
+
+def _run(spec, realtime, **finalize_kw):
+    scheduler = Scheduler({spec.name: spec})
+    plans = scheduler.plan({spec.name: {"realtime": realtime}}, realtime=realtime)
+    engine = spec.factory(plans[spec.name], EngineContext())
+    results = {}
+    engine.start(results, "turn")
+    t0 = time.monotonic()
+    report = scheduler.finalize(plans, {spec.name: engine}, results, **finalize_kw)
+    return report[spec.name], results, time.monotonic() - t0
+
+
+def test_realtime_engine_within_budget_is_ok():
+    entry, _, elapsed = _run(_spec("fast", 0.05, cost=0.1, budget=1.0), realtime=True)
+    assert entry["mode"] == "realtime"
+    assert entry["status"] == "ok"
+    assert elapsed < 1.0
+
+
+def test_realtime_engine_past_its_deadline_is_given_up_on():
+    entry, _, elapsed = _run(_spec("slow", 3.0, cost=0.1, budget=0.1), realtime=True)
+    assert entry["status"] == "timeout"
+    # budget plus the cleanup slack, not the engine's own three seconds
+    assert elapsed < 1.5
+
+
+def test_optional_offline_engine_late_result_is_dropped():
+    entry, results, elapsed = _run(
+        _spec("late", 2.0, cost=0.1, budget=0.1),
+        realtime=False,
+        wav_path="x.wav",
+        audio_seconds=1.0,
+    )
+    assert entry["status"] == "timeout"
+    assert results["late"] is None
+    assert elapsed < 1.0
+
+
+def test_optional_offline_engine_over_budget_is_skipped():
+    entry, _, _ = _run(
+        _spec("costly", 0.0, cost=0.6, budget=0.3),
+        realtime=False,
+        wav_path="x.wav",
+        audio_seconds=1.0,
+    )
+    assert entry["status"] == "skipped"
+    assert entry["reason"] == "over budget"
+
+
+def test_required_offline_engine_is_awaited():
+    entry, results, elapsed = _run(
+        _spec("required", 0.6, cost=0.6, budget=0.3, required=True),
+        realtime=False,
+        wav_path="x.wav",
+        audio_seconds=1.0,
+    )
+    assert entry["status"] == "ok"
+    assert results["required"] == "done"
+    assert elapsed >= 0.6
+
+
+def test_plan_reports_derived_engines():
+    source = _spec("source", 0.0, cost=0.1, budget=1.0)
+    derived = _spec("derived", 0.0, cost=0.1, budget=1.0, derivable_from="source")
+    plans = Scheduler({"source": source, "derived": derived}).plan({})
+    assert plans["derived"].mode == "derived"
+    assert plans["source"].derive
@@ -0,0 +1,38 @@
+import asyncio
+import threading
+import time
+
+from webapp.backend.outbound import Lane
+
+
+def test_released_slot_admits_waiter_once_bucket_refills():
+    lane = Lane("x", concurrency=1, rate=1.0, burst=1.0)
+    admitted = []
+
+    async def user(i):
+        async with lane.slot():
+            admitted.append(i)
+            await asyncio.sleep(0.05)
+
+    async def main():
+        await asyncio.wait_for(asyncio.gather(user(0), user(1)), 3.0)
+
+    asyncio.run(main())
+    assert admitted == [0, 1]
+
+
+def test_released_slot_admits_sync_waiter_once_bucket_refills():
+    lane = Lane("x", concurrency=1, rate=2.0, burst=1.0)
+    admitted = []
+
+    def user(i):
+        with lane.slot_sync():
+            admitted.append(i)
+            time.sleep(0.05)
+
+    threads = [threading.Thread(target=user, args=(i,), daemon=True) for i in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(3.0)
+    assert sorted(admitted) == [0, 1]
@@ -64,3 +64,41 @@ class TutorResponse(BaseModel):
     repeat: bool
     is_correct: bool | None = None
     errors: List[ErrorItem] = Field(default_factory=list)
+
+
+class TutorFeedback(BaseModel):
+    """Reduced answer used when error details are computed locally
+    (``phoneme_diff.complete`` turns it into a ``TutorResponse``)."""
+    mode: Literal["reading", "conversation", "silence"]
+    feedback_text: str = Field(...)
+    repeat: bool
+    is_correct: bool | None = None
+    # Reference words judged wrong, in sentence order (inserted words as heard)
+    error_words: List[str] = Field(default_factory=list)
+
+
+# ──────────────────────────────────────────────────────────────────────────
+#  Strict JSON schema for structured outputs
+# ──────────────────────────────────────────────────────────────────────────
+def _strict(node: Any) -> Any:
+    """Adapt a pydantic schema to OpenAI strict mode: every property required,
+    no extra keys, no defaults or titles."""
+    if isinstance(node, list):
+        return [_strict(n) for n in node]
+    if not isinstance(node, dict):
+        return node
+    out = {k: _strict(v) for k, v in node.items() if k not in ("default", "title")}
+    if out.get("type") == "object" and "properties" in out:
+        out["required"] = list(out["properties"])
+        out["additionalProperties"] = False
+    return out
+
+
+def tutor_response_json_schema(model: type[BaseModel] = TutorResponse) -> Dict[str, Any]:
+    """``response_format`` payload asking for a strict ``model`` answer."""
+    schema = model.model_json_schema(by_alias=False)
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": model.__name__, "strict": True, "schema": _strict(schema)},
+    }
+
@@ -12,13 +12,25 @@ import resampy
 from phonemizer import phonemize
 from prompt_builder import _strip_punctuation
 
-from FASE2_azure_process import AzurePronunciationEvaluator, AzurePlainTranscriber
-from FASE2_wav2vec2_process import Wav2Vec2PhonemeExtractor, Wav2Vec2Transcriber
-from . import config
+import engines
+from . import asset_pack, config
 
 
 def _ref_ph_map(text: str) -> Dict[str, str]:
-    """Return phoneme mapping for whitespace-separated words."""
+    """Return phoneme mapping for whitespace-separated words.
+
+    Sentences from the active asset pack are looked up instead of running
+    espeak on every recording.
+    """
+    pack = asset_pack.current()
+    if pack is not None:
+        packed = pack.phonemes(text)
+        if packed is not None:
+            return dict(packed)
+    return _compute_ref_ph_map(text)
+
+
+def _compute_ref_ph_map(text: str) -> Dict[str, str]:
     clean_text = _strip_punctuation(text)
     return {
         w: phonemize(
@@ -65,37 +77,26 @@ def analyze_audio(wav_bytes: bytes, sentence: str) -> Dict[str, Any]:
         "wav2vec2_phonemes": None,
         "metadata": {"language": "nl-NL", "chunk_duration": config.CHUNK_DURATION},
     }
-    engine_times: Dict[str, Dict[str, float]] = {
-        "azure_pron": {},
-        "azure_plain": {},
-        "w2v2_phonemes": {},
-        "w2v2_asr": {},
-    }
-
-    # Azure pronunciation
-    ap = AzurePronunciationEvaluator(sentence, results=results, realtime=False)
-    engine_times["azure_pron"]["start"] = time.perf_counter()
-    ap.process_file(wav_path)
-    engine_times["azure_pron"]["end"] = time.perf_counter()
-
-    # Azure plain transcription
-    at = AzurePlainTranscriber(results=results, realtime=False)
-    engine_times["azure_plain"]["start"] = time.perf_counter()
-    at.process_file(wav_path)
-    engine_times["azure_plain"]["end"] = time.perf_counter()
-
-    # Wav2Vec2 phonemes
-    pe = Wav2Vec2PhonemeExtractor(16000, config.CHUNK_DURATION, results, realtime=False)
-    engine_times["w2v2_phonemes"]["start"] = time.perf_counter()
-    pe.process_file(wav_path)
-    engine_times["w2v2_phonemes"]["end"] = time.perf_counter()
 
-    # Wav2Vec2 ASR
-    asr = Wav2Vec2Transcriber(16000, config.CHUNK_DURATION, results, realtime=False)
-    engine_times["w2v2_asr"]["start"] = time.perf_counter()
-    asr.process_file(wav_path)
-    engine_times["w2v2_asr"]["end"] = time.perf_counter()
+    plans = engines.scheduler.plan(
+        config.ENGINES, realtime=False, derive=not config.AZURE_PLAIN_PASS
+    )
+    if plans["azure_plain"].mode == "derived":
+        results["metadata"]["azure_plain_source"] = "pronunciation"
+    ctx = engines.EngineContext(sample_rate=16000, chunk_duration=config.CHUNK_DURATION)
+    active = engines.build(plans, ctx)
+    for engine in active.values():
+        engine.start(results, session_id)
+    report = engines.scheduler.finalize(
+        plans,
+        active,
+        results,
+        wav_path=wav_path,
+        audio_seconds=sf.info(wav_path).duration,
+        parallel=config.PARALLEL_OFFLINE,
+    )
 
     results["end_time"] = time.time()
-    results["timing"] = {"engines": engine_times}
+    # Scheduler report per engine; ``start``/``end`` as before (webapp/README.md)
+    results["timing"] = {"engines": report}
     return results
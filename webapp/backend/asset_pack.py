@@ -0,0 +1,216 @@
+"""Precomputed curriculum asset packs.
+
+All static content in :mod:`config` (``SENTENCES``, every section and
+direction of ``STORIES``, the filler clip and the fast-path praise) is known
+ahead of time.  This
+module synthesizes its sentence and word audio and reference phonemes once,
+in parallel, into ``storage/packs/<version>/`` with a ``manifest.json``.  The
+endpoints then serve static content from the pack without any API calls.
+
+Build a pack with::
+
+    python -m webapp.backend.asset_pack --workers 8
+
+The version is a hash of the content and the voice settings, so a config
+change yields a new pack; ``storage/packs/CURRENT`` names the active one.
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List
+
+from rich.console import Console
+
+from fast_path import PRAISE_TEXT
+
+from . import config, outbound, storage
+
+console = Console()
+
+PACKS_DIR = storage.STORAGE_DIR / "packs"
+CURRENT_FILE = PACKS_DIR / "CURRENT"
+FILLER_TEXT = "De zin was"
+
+
+def _voice_settings() -> Dict[str, str]:
+    return {
+        "model": config.VOICE_MODEL,
+        "voice": config.VOICE_NAME,
+        "instructions": config.VOICE_INSTRUCTIONS,
+        "word_model": config.WORD_VOICE_MODEL,
+        "word_instructions": config.WORD_VOICE_INSTRUCTIONS,
+    }
+
+
+def collect_content() -> Dict[str, List[str]]:
+    """Return the static sentences, directions and words to precompute."""
+    sentences = list(config.SENTENCES)
+    directions: List[str] = []
+    for levels in config.STORIES.values():
+        for story in levels.values():
+            sentences += story.get("section1", [])
+            directions += story.get("directions", [])
+    sentences = list(dict.fromkeys(sentences))
+    directions = list(dict.fromkeys(directions))
+    words = list(dict.fromkeys(w for s in sentences for w in s.split()))
+    return {"sentences": sentences, "directions": directions, "words": words}
+
+
+def pack_version(content: Dict[str, List[str]]) -> str:
+    blob = json.dumps(
+        {"content": content, "fixed": [FILLER_TEXT, PRAISE_TEXT], "voice": _voice_settings()},
+        sort_keys=True,
+    )
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()[:12]
+
+
+class AssetPack:
+    """Read-only view of a built pack."""
+
+    def __init__(self, root: Path, manifest: Dict[str, Any]) -> None:
+        self.root = root
+        self.manifest = manifest
+        self.version = manifest["version"]
+        self._audio = {
+            **{t: e["audio"] for t, e in manifest["sentences"].items()},
+            **{t: e["audio"] for t, e in manifest["directions"].items()},
+        }
+        for text, key in ((FILLER_TEXT, "filler"), (PRAISE_TEXT, "praise")):
+            if manifest.get(key):
+                self._audio[text] = manifest[key]
+
+    def audio(self, text: str) -> str | None:
+        """Path to the sentence/direction audio for ``text``, if packed."""
+        rel = self._audio.get(text)
+        return str(self.root / rel) if rel else None
+
+    def word_audio(self, word: str) -> str | None:
+        rel = self.manifest["words"].get(word)
+        return str(self.root / rel) if rel else None
+
+    def phonemes(self, text: str) -> Dict[str, str] | None:
+        entry = self.manifest["sentences"].get(text)
+        return entry.get("phonemes") if entry else None
+
+    def find_file(self, name: str) -> Path | None:
+        """Resolve an ``/api/audio/{name}`` request inside the pack."""
+        for sub in ("audio", "words"):
+            p = self.root / sub / name
+            if p.exists():
+                return p
+        return None
+
+
+_current: AssetPack | None = None
+_loaded = False
+
+
+def reload() -> AssetPack | None:
+    """Load the pack named in ``CURRENT`` if it matches the voice config."""
+    global _current, _loaded
+    _loaded = True
+    _current = None
+    try:
+        version = CURRENT_FILE.read_text(encoding="utf-8").strip()
+        root = PACKS_DIR / version
+        manifest = json.loads((root / "manifest.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if manifest.get("voice") != _voice_settings():
+        console.log(f"[yellow][asset_pack] {version} built with other voice settings; ignored[/yellow]")
+        return None
+    _current = AssetPack(root, manifest)
+    return _current
+
+
+def current() -> AssetPack | None:
+    """Return the active pack, loading it on first use."""
+    if not _loaded:
+        reload()
+    return _current
+
+
+def build(workers: int = 8, with_phonemes: bool = True) -> Path:
+    """Synthesize every static asset and write a new pack."""
+    from .tts import tts_to_file, word_tts_to_file
+
+    content = collect_content()
+    version = pack_version(content)
+    root = PACKS_DIR / version
+    (root / "audio").mkdir(parents=True, exist_ok=True)
+    (root / "words").mkdir(parents=True, exist_ok=True)
+
+    def _sentence(text: str) -> str:
+        with outbound.priority(outbound.Priority.PREGENERATE):
+            src = Path(tts_to_file(text))
+        shutil.copyfile(src, root / "audio" / src.name)
+        return f"audio/{src.name}"
+
+    def _word(word: str) -> str:
+        with outbound.priority(outbound.Priority.PREGENERATE):
+            src = Path(word_tts_to_file(word))
+        shutil.copyfile(src, root / "words" / src.name)
+        return f"words/{src.name}"
+
+    def _phonemes(text: str) -> Dict[str, str]:
+        from .analysis_pipeline import _compute_ref_ph_map
+
+        return _compute_ref_ph_map(text)
+
+    texts = content["sentences"] + content["directions"] + [FILLER_TEXT, PRAISE_TEXT]
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        audio = dict(zip(texts, pool.map(_sentence, texts)))
+        words = dict(zip(content["words"], pool.map(_word, content["words"])))
+        phonemes = (
+            dict(zip(content["sentences"], pool.map(_phonemes, content["sentences"])))
+            if with_phonemes
+            else {}
+        )
+
+    manifest = {
+        "version": version,
+        "created": time.time(),
+        "voice": _voice_settings(),
+        "filler": audio[FILLER_TEXT],
+        "praise": audio[PRAISE_TEXT],
+        "sentences": {
+            s: {
+                "audio": audio[s],
+                "words": [words[w] for w in s.split()],
+                "phonemes": phonemes.get(s),
+            }
+            for s in content["sentences"]
+        },
+        "directions": {d: {"audio": audio[d]} for d in content["directions"]},
+        "words": words,
+    }
+    (root / "manifest.json").write_text(
+        json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8"
+    )
+    CURRENT_FILE.write_text(version, encoding="utf-8")
+    console.log(
+        f"[green][asset_pack] built {version}: {len(texts)} clips, "
+        f"{len(words)} words in {time.perf_counter() - t0:.1f}s[/green]"
+    )
+    return root
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build the curriculum asset pack")
+    parser.add_argument("--workers", type=int, default=8, help="Parallel TTS requests")
+    parser.add_argument(
+        "--no-phonemes", action="store_true", help="Skip reference phonemes (no espeak)"
+    )
+    args = parser.parse_args()
+    print(build(workers=args.workers, with_phonemes=not args.no_phonemes))
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI entry point
+    main()
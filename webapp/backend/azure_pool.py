@@ -0,0 +1,353 @@
+"""Pre-connected Azure pronunciation recognizers shared across sessions.
+
+Building a ``SpeechRecognizer`` and opening its websocket to the speech
+service (TLS plus service handshake) used to happen on every ``/start``, and
+the asynchronous start could still be running when the child began to read.
+The pool keeps ``AZURE_POOL_SIZE`` recognizers per sample rate with their
+connection already open.  A session borrows one at ``/start``
+(:meth:`RecognizerPool.borrow`) and returns it at ``/stop``; a recognizer
+that was used is stopped in the background and replaced by a fresh one, an
+unused one goes back to the pool.
+
+Idle connections that are cancelled or dropped by the service, or that are
+older than ``AZURE_POOL_MAX_IDLE`` seconds, are reconnected by the pool's
+maintenance thread.  ``PronunciationAssessmentConfig`` objects are cached per
+reference sentence.
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List
+
+import azure.cognitiveservices.speech as speechsdk
+from dotenv import load_dotenv
+from rich.console import Console
+
+from . import config
+
+console = Console()
+
+# Seconds to wait for a new connection before handing it out anyway
+CONNECT_TIMEOUT = 5.0
+# Back-off after failing to create a recognizer (e.g. no credentials)
+ERROR_BACKOFF = 30.0
+
+
+def _speech_config() -> speechsdk.SpeechConfig:
+    load_dotenv()
+    key = os.getenv("AZURE_SPEECH_KEY")
+    region = os.getenv("AZURE_SPEECH_REGION")
+    if not key or not region:
+        raise ValueError("Set AZURE_SPEECH_KEY and AZURE_SPEECH_REGION env vars")
+    speech_config = speechsdk.SpeechConfig(subscription=key, region=region)
+    speech_config.speech_recognition_language = "nl-NL"
+    speech_config.output_format = speechsdk.OutputFormat.Detailed
+    return speech_config
+
+
+class Lease:
+    """One recognizer on its own push stream, connected ahead of use.
+
+    Recognizer events are forwarded to ``owner`` (an
+    ``AzurePronunciationEvaluator``) while the lease is borrowed.
+    """
+
+    def __init__(
+        self, pool: "RecognizerPool", speech_config, sample_rate: int, wait: bool = True
+    ) -> None:
+        self.pool = pool
+        self.sample_rate = sample_rate
+        self.owner = None
+        self.started = False
+        self.healthy = True
+        self.reference_text: str | None = None
+        self.pa_cfg = None
+        self._connected = threading.Event()
+
+        fmt = speechsdk.audio.AudioStreamFormat(
+            samples_per_second=sample_rate, bits_per_sample=16, channels=1
+        )
+        self.push_stream = speechsdk.audio.PushAudioInputStream(stream_format=fmt)
+        self.recognizer = speechsdk.SpeechRecognizer(
+            speech_config=speech_config,
+            audio_config=speechsdk.audio.AudioConfig(stream=self.push_stream),
+        )
+        self.recognizer.recognizing.connect(lambda evt: self._forward("_on_interim", evt))
+        self.recognizer.recognized.connect(lambda evt: self._forward("_on_final", evt))
+        self.recognizer.canceled.connect(self._on_canceled)
+        self.recognizer.session_stopped.connect(lambda _: self._done())
+
+        self.connection = speechsdk.Connection.from_recognizer(self.recognizer)
+        self.connection.connected.connect(lambda _: self._connected.set())
+        self.connection.disconnected.connect(self._on_disconnected)
+        t0 = time.perf_counter()
+        self.connection.open(True)
+        self.connect_seconds = (
+            time.perf_counter() - t0
+            if wait and self._connected.wait(CONNECT_TIMEOUT)
+            else None
+        )
+        self.idle_since = time.monotonic()
+
+    # ------------------------------------------------------------------ events
+    def _forward(self, name: str, evt) -> None:
+        owner = self.owner
+        if owner is not None:
+            getattr(owner, name)(evt)
+
+    def _done(self) -> None:
+        owner = self.owner
+        if owner is not None:
+            owner._done_event.set()
+
+    def _on_canceled(self, evt) -> None:
+        self.healthy = False
+        self._forward("_on_canceled", evt)
+        self._done()
+        self.pool._wake.set()
+
+    def _on_disconnected(self, evt) -> None:
+        self._connected.clear()
+        if self.owner is None:
+            self.healthy = False
+            self.pool._wake.set()
+
+    # ------------------------------------------------------------------ use
+    def prepare(self, sentence: str) -> None:
+        """Apply the pronunciation config and phrase list for ``sentence``."""
+        self.reference_text = sentence
+        self.pa_cfg = self.pool.pa_config(sentence)
+        self.pa_cfg.apply_to(self.recognizer)
+        phrase_list = speechsdk.PhraseListGrammar.from_recognizer(self.recognizer)
+        try:
+            phrase_list.clear()
+        except Exception:
+            pass
+        phrase_list.addPhrase(sentence)
+
+    def release(self) -> None:
+        self.pool.give_back(self)
+
+    def close(self) -> None:
+        """Stop recognition and drop the connection (blocking)."""
+        try:
+            self.push_stream.close()
+        except Exception:
+            pass
+        if self.started:
+            try:
+                self.recognizer.stop_continuous_recognition()
+            except Exception:
+                pass
+        try:
+            self.connection.close()
+        except Exception:
+            pass
+
+
+class RecognizerPool:
+    """Keep ``size`` connected :class:`Lease` objects per sample rate."""
+
+    def __init__(
+        self,
+        size: int = config.AZURE_POOL_SIZE,
+        max_idle: float = config.AZURE_POOL_MAX_IDLE,
+        pa_cache_size: int = config.AZURE_PA_CACHE_SIZE,
+    ) -> None:
+        self.size = size
+        self.max_idle = max_idle
+        self.pa_cache_size = pa_cache_size
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._idle: Dict[int, Deque[Lease]] = {}
+        self._retired: Deque[Lease] = deque()
+        self._pa: "OrderedDict[str, Any]" = OrderedDict()
+        self._speech_config = None
+        self._thread: threading.Thread | None = None
+        self._closed = False
+        self._error_until = 0.0
+        self._connects: Deque[float] = deque(maxlen=200)
+        self.stats = {
+            "borrowed": 0,
+            "hits": 0,
+            "misses": 0,
+            "returned": 0,
+            "retired": 0,
+            "created": 0,
+            "reconnects": 0,
+            "expired": 0,
+            "errors": 0,
+            "pa_hits": 0,
+            "pa_misses": 0,
+        }
+
+    # ------------------------------------------------------------------ lifecycle
+    def start(self, sample_rate: int = 16000) -> None:
+        """Start the maintenance thread and warm ``sample_rate`` recognizers."""
+        with self._lock:
+            self._idle.setdefault(sample_rate, deque())
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._maintain, daemon=True, name="azure-pool"
+                )
+                self._thread.start()
+        self._wake.set()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._closed = True
+            leases = [lease for idle in self._idle.values() for lease in idle]
+            leases.extend(self._retired)
+            self._idle.clear()
+            self._retired.clear()
+        self._wake.set()
+        for lease in leases:
+            lease.close()
+
+    def _new_lease(self, sample_rate: int, wait: bool = True) -> Lease:
+        if self._speech_config is None:
+            self._speech_config = _speech_config()
+        lease = Lease(self, self._speech_config, sample_rate, wait)
+        with self._lock:
+            self.stats["created"] += 1
+            if lease.connect_seconds is not None:
+                self._connects.append(lease.connect_seconds)
+        return lease
+
+    def _maintain(self) -> None:
+        while not self._closed:
+            self._wake.wait(timeout=5.0)
+            self._wake.clear()
+            now = time.monotonic()
+            with self._lock:
+                stale: List[Lease] = list(self._retired)
+                self._retired.clear()
+                for idle in self._idle.values():
+                    for lease in list(idle):
+                        expired = now - lease.idle_since > self.max_idle
+                        if expired or not lease.healthy:
+                            idle.remove(lease)
+                            stale.append(lease)
+                            self.stats["expired" if expired else "reconnects"] += 1
+                missing = {
+                    rate: self.size - len(idle) for rate, idle in self._idle.items()
+                }
+                backing_off = now < self._error_until
+            for lease in stale:
+                lease.close()
+            if backing_off:
+                continue
+            for rate, n in missing.items():
+                for _ in range(n):
+                    try:
+                        lease = self._new_lease(rate)
+                    except Exception as exc:
+                        with self._lock:
+                            self.stats["errors"] += 1
+                            self._error_until = time.monotonic() + ERROR_BACKOFF
+                        console.log(f"[azure-pool] cannot connect recognizer: {exc}")
+                        break
+                    with self._lock:
+                        closed = self._closed
+                        if not closed:
+                            self._idle[rate].append(lease)
+                    if closed:
+                        # shutdown() ran while this one was connecting
+                        lease.close()
+                        return
+
+    # ------------------------------------------------------------------ borrowing
+    def pa_config(self, sentence: str):
+        """Cached ``PronunciationAssessmentConfig`` for ``sentence``."""
+        with self._lock:
+            cfg = self._pa.get(sentence)
+            if cfg is not None:
+                self._pa.move_to_end(sentence)
+                self.stats["pa_hits"] += 1
+                return cfg
+            self.stats["pa_misses"] += 1
+        cfg = speechsdk.PronunciationAssessmentConfig(
+            json_string=json.dumps({
+                "referenceText": sentence,
+                "gradingSystem": "HundredMark",
+                "granularity": "Phoneme",
+                "phonemeAlphabet": "SAPI",
+                "nBestPhonemeCount": 1,
+            })
+        )
+        cfg.enable_prosody_assessment()
+        with self._lock:
+            self._pa[sentence] = cfg
+            while len(self._pa) > self.pa_cache_size:
+                self._pa.popitem(last=False)
+        return cfg
+
+    def borrow(self, sentence: str, sample_rate: int = 16000) -> Lease:
+        """A connected recognizer prepared for ``sentence``.
+
+        Falls back to connecting one on the spot when none is idle.
+        """
+        lease = None
+        with self._lock:
+            self.stats["borrowed"] += 1
+            idle = self._idle.setdefault(sample_rate, deque())
+            while idle and lease is None:
+                candidate = idle.popleft()
+                if candidate.healthy:
+                    lease = candidate
+                else:
+                    self._retired.append(candidate)
+                    self.stats["reconnects"] += 1
+            self.stats["hits" if lease is not None else "misses"] += 1
+        self.start(sample_rate)
+        if lease is None:
+            # Connects while the session starts, like an unpooled recognizer
+            lease = self._new_lease(sample_rate, wait=False)
+        lease.prepare(sentence)
+        return lease
+
+    def give_back(self, lease: Lease) -> None:
+        """Return ``lease``; used recognizers are retired and replaced."""
+        with self._lock:
+            self.stats["returned"] += 1
+            reusable = (
+                not self._closed
+                and lease.healthy
+                and not lease.started
+                and len(self._idle.setdefault(lease.sample_rate, deque())) < self.size
+            )
+            if reusable:
+                lease.idle_since = time.monotonic()
+                self._idle[lease.sample_rate].append(lease)
+            else:
+                self._retired.append(lease)
+                self.stats["retired"] += 1
+        self._wake.set()
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            connects = sorted(self._connects)
+            return {
+                **self.stats,
+                "idle": {rate: len(idle) for rate, idle in self._idle.items()},
+                "pa_cached": len(self._pa),
+                "avg_connect_seconds": (
+                    round(sum(connects) / len(connects), 3) if connects else None
+                ),
+                "hit_rate": (
+                    round(self.stats["hits"] / self.stats["borrowed"], 3)
+                    if self.stats["borrowed"]
+                    else None
+                ),
+            }
+
+
+def enabled() -> bool:
+    return config.AZURE_POOL_SIZE > 0 and config.AZURE_PUSH_STREAM
+
+
+pool = RecognizerPool()
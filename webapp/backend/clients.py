@@ -0,0 +1,98 @@
+"""Application-scoped HTTP connection pools for OpenAI and Azure OpenAI.
+
+Every outbound call (tutor feedback, story and word generation, TTS) shares
+one keep-alive pool per provider instead of paying for a TCP/TLS handshake per
+request.  Pools are created lazily, registered with :mod:`gpt_client` and
+closed by :func:`shutdown` when the application stops.
+"""
+from __future__ import annotations
+
+import threading
+
+import httpx
+
+import gpt_client
+
+from . import config, outbound
+
+_lock = threading.Lock()
+_async_http: dict[str, httpx.AsyncClient] = {}
+_sync_http: httpx.Client | None = None
+# ``openai`` is imported lazily, like in the endpoints that used to create
+# their own clients, so lightweight endpoints work without it installed.
+_openai_async = None
+_openai_sync = None
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=config.HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=config.HTTP_MAX_KEEPALIVE,
+        keepalive_expiry=config.HTTP_KEEPALIVE_EXPIRY,
+    )
+
+
+def async_http(provider: str = "openai") -> httpx.AsyncClient:
+    """Return the shared async pool for ``provider`` ("openai" or "azure")."""
+    global _openai_async
+    with _lock:
+        client = _async_http.get(provider)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                timeout=config.HTTP_TIMEOUT, http2=config.HTTP2, limits=_limits()
+            )
+            _async_http[provider] = client
+            gpt_client.set_http_client(provider, client)
+            if provider == "openai":
+                _openai_async = None
+        return client
+
+
+def openai_async():
+    """Shared ``openai.AsyncOpenAI`` client for story and word generation."""
+    import openai
+
+    global _openai_async
+    http = async_http("openai")
+    with _lock:
+        if _openai_async is None:
+            _openai_async = openai.AsyncOpenAI(http_client=http)
+        return _openai_async
+
+
+def openai_sync():
+    """Shared synchronous ``openai.OpenAI`` client for TTS worker threads."""
+    import openai
+
+    global _sync_http, _openai_sync
+    with _lock:
+        if _openai_sync is None or _sync_http is None or _sync_http.is_closed:
+            _sync_http = httpx.Client(
+                timeout=config.HTTP_TIMEOUT, http2=config.HTTP2, limits=_limits()
+            )
+            _openai_sync = openai.OpenAI(http_client=_sync_http)
+        return _openai_sync
+
+
+def startup() -> None:
+    """Create the pools for the configured providers up front."""
+    gpt_client.set_limiter(lambda provider: outbound.lane(provider).slot())
+    async_http("openai")
+    for provider in gpt_client.providers():
+        async_http(provider)
+
+
+async def shutdown() -> None:
+    """Close every pool; later calls lazily create fresh ones."""
+    global _sync_http, _openai_sync, _openai_async
+    with _lock:
+        pools = list(_async_http.values())
+        _async_http.clear()
+        sync_http, _sync_http = _sync_http, None
+        _openai_sync = None
+        _openai_async = None
+    for client in pools:
+        await client.aclose()
+    if sync_http is not None:
+        sync_http.close()
+    await gpt_client.aclose()
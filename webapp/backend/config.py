@@ -51,15 +51,18 @@ DELAY_SECONDS = 0.5
 # instead of realtime chunks.
 REALTIME = os.getenv("REALTIME", "true").lower() not in {"0", "false", "no"}
 
-# Analysis settings for the individual engines.  These flags are independent of
-# ``REALTIME`` and control which recognisers run in either mode.
-REALTIME_FLAGS = {
-    "azure_pron": True,
-    "azure_plain": True,
-    "w2v2_phonemes": False,
-    "w2v2_asr": True,
+# Analysis engines (registered in engines.py).  ``realtime`` streams the audio
+# to an engine while the child reads instead of processing the WAV after
+# /stop; ``enabled: False`` drops an engine and ``budget`` overrides the
+# seconds after the end of the audio before its result is given up on.
+ENGINES = {
+    "azure_pron": {"realtime": True},
+    "azure_plain": {"realtime": True},
+    "w2v2_phonemes": {"realtime": False},
+    "w2v2_asr": {"realtime": True},
 }
 
+# Run the engines that process the WAV file in parallel
 PARALLEL_OFFLINE = True
 CHUNK_DURATION = 10
 
@@ -70,6 +73,20 @@ AZURE_PUSH_STREAM = True
 # Keep Azure recognisers alive between recordings and start them asynchronously
 KEEP_AZURE_RUNNING = True
 
+# Run a separate Azure plain transcriber.  When ``False`` the "azure_plain"
+# results are derived from the pronunciation stream (one connection instead of
+# two); that transcript is biased towards the reference sentence, so it is
+# left out of the tutor request and the local verdict gates.
+AZURE_PLAIN_PASS = True
+
+# Pre-connected Azure pronunciation recognizers kept per sample rate and lent
+# to sessions at /start (see azure_pool.py); 0 builds one per recording.
+AZURE_POOL_SIZE = 2
+# Seconds an idle pooled connection is kept before it is renewed
+AZURE_POOL_MAX_IDLE = 120.0
+# Pronunciation-assessment configs cached per reference sentence
+AZURE_PA_CACHE_SIZE = 256
+
 # GPT model settings
 GPT_PROVIDER = os.getenv("GPT_TUTOR_PROVIDER", "openai")
 GPT_MODEL = os.getenv("GPT_TUTOR_MODEL", "gpt-4o")
@@ -80,3 +97,75 @@ GPT_TEMPERATURE = float(os.getenv("GPT_TUTOR_TEMPERATURE", "0.0"))
 os.environ.setdefault("GPT_TUTOR_PROVIDER", GPT_PROVIDER)
 os.environ.setdefault("GPT_TUTOR_MODEL", GPT_MODEL)
 os.environ.setdefault("GPT_TUTOR_TEMPERATURE", str(GPT_TEMPERATURE))
+
+# Write-behind persistence of results (audio move + database insert)
+PERSIST_MAX_RETRIES = 3
+# Base delay between retries in seconds (multiplied by the attempt number)
+PERSIST_RETRY_DELAY = 1.0
+
+# Shared keep-alive connection pools for OpenAI / Azure OpenAI (per provider)
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "20"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "10"))
+# Seconds an idle pooled connection is kept open
+HTTP_KEEPALIVE_EXPIRY = 60.0
+HTTP_TIMEOUT = 200.0
+HTTP2 = True
+
+# Size budget of the sentence TTS cache (storage/tts) in megabytes
+TTS_CACHE_MAX_MB = int(os.getenv("TTS_CACHE_MAX_MB", "500"))
+
+# Speculatively generate both story continuations while the child reads
+STORY_PREFETCH = True
+# Seconds a prefetched continuation stays valid
+STORY_PREFETCH_TTL = 600.0
+
+# Story sections shared between students: distinct variants kept per request
+STORY_CACHE_VARIANTS = 3
+# Seconds before a cached story request is generated afresh
+STORY_CACHE_TTL = 24 * 3600.0
+STORY_CACHE_MAX_KEYS = 2000
+
+# Strict stories: follow-up calls that rewrite only undecodable sentences
+STORY_REPAIR_ATTEMPTS = 1
+
+# Skip GPT for clearly correct readings (see fast_path.py); scores are 0-100
+FAST_PATH = True
+FAST_PATH_MIN_PRON_SCORE = 90.0
+FAST_PATH_MIN_ACCURACY_SCORE = 90.0
+FAST_PATH_MIN_COMPLETENESS_SCORE = 95.0
+FAST_PATH_MIN_WORD_ACCURACY = 80.0
+FAST_PATH_REQUIRE_WAV2VEC2 = True
+
+# Seconds a finished two-tier feedback channel (/api/feedback/{id}) is kept
+FEEDBACK_CHANNEL_TTL = 300.0
+
+# Cache of tutor GPT answers (only used while GPT_TEMPERATURE is 0)
+TUTOR_CACHE = True
+TUTOR_CACHE_MAX_ENTRIES = 5000
+TUTOR_CACHE_TTL = 7 * 24 * 3600.0
+# Scores in the prompt are rounded to this step before hashing (0 = exact)
+TUTOR_CACHE_SCORE_STEP = 5.0
+
+# Send the tutor only decision-relevant fields in a dense format (prompt_builder)
+TUTOR_PROMPT_COMPACT = True
+
+# Route easy tutor requests to a small model (see model_router.py)
+MODEL_ROUTING = True
+GPT_SMALL_MODEL = os.getenv("GPT_TUTOR_SMALL_MODEL", "gpt-4o-mini")
+ROUTING_MAX_MISMATCHES = 1
+ROUTING_MAX_SCORE_SPREAD = 25.0
+ROUTING_MAX_FLAGGED_WORDS = 1
+ROUTING_MIN_WORD_ACCURACY = 60.0
+
+# GPT returns only the verdict and feedback_text; phonemes and letter errors
+# of the wrong words are computed locally (phoneme_diff.py)
+LOCAL_ERROR_DETAILS = True
+
+# Outbound request lanes (see outbound.py): parallel requests, sustained
+# requests per second and burst size per provider.  "tts" is the OpenAI
+# speech endpoint, which has its own rate limits.
+OUTBOUND_LIMITS = {
+    "openai": {"concurrency": 16, "rate": 8.0, "burst": 16.0},
+    "azure": {"concurrency": 16, "rate": 8.0, "burst": 16.0},
+    "tts": {"concurrency": 8, "rate": 5.0, "burst": 10.0},
+}
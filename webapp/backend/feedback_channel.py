@@ -0,0 +1,99 @@
+"""Push channels for feedback that is still being generated.
+
+``/api/realtime/stop`` can answer with a local verdict straight away and
+start the GPT feedback in the background.  Its SSE events are buffered in a
+:class:`FeedbackChannel`, so ``GET /api/feedback/{id}`` can connect at any
+moment and still receive every event from the start.  Generation runs to the
+end even without a subscriber, because it also persists the result.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+import uuid
+from typing import Any, AsyncIterator, Dict, List
+
+from rich.console import Console
+
+from . import config
+
+console = Console()
+
+
+class FeedbackChannel:
+    """Replayable buffer of the events produced by one feedback generator."""
+
+    def __init__(self, events: AsyncIterator[Dict[str, Any]]) -> None:
+        self.created = time.monotonic()
+        self.finished: float | None = None
+        self._events: List[Dict[str, Any]] = []
+        self._changed = asyncio.Condition()
+        self.task = asyncio.create_task(self._pump(events))
+
+    async def _pump(self, events: AsyncIterator[Dict[str, Any]]) -> None:
+        try:
+            async for ev in events:
+                async with self._changed:
+                    self._events.append(ev)
+                    self._changed.notify_all()
+        except Exception as exc:
+            console.log(f"[red][feedback] generation failed: {exc}[/red]")
+            async with self._changed:
+                self._events.append(
+                    {"event": "error", "data": json.dumps({"detail": str(exc)})}
+                )
+                self._changed.notify_all()
+        finally:
+            async with self._changed:
+                self.finished = time.monotonic()
+                self._changed.notify_all()
+
+    async def subscribe(self) -> AsyncIterator[Dict[str, Any]]:
+        """Yield every event so far, then new ones until generation ends."""
+        sent = 0
+        while True:
+            async with self._changed:
+                await self._changed.wait_for(
+                    lambda: sent < len(self._events) or self.finished is not None
+                )
+                batch = self._events[sent:]
+                done = self.finished is not None
+            for ev in batch:
+                yield ev
+            sent += len(batch)
+            if done and sent == len(self._events):
+                return
+
+
+class FeedbackChannels:
+    """Open channels by id; finished ones expire after ``ttl`` seconds."""
+
+    def __init__(self, ttl: float = config.FEEDBACK_CHANNEL_TTL) -> None:
+        self.ttl = ttl
+        self._channels: Dict[str, FeedbackChannel] = {}
+        self.stats = {"opened": 0, "subscribed": 0, "expired": 0}
+
+    def _expire(self) -> None:
+        now = time.monotonic()
+        for fid, ch in list(self._channels.items()):
+            if ch.finished is not None and now - ch.finished > self.ttl:
+                del self._channels[fid]
+                self.stats["expired"] += 1
+
+    def open(self, events: AsyncIterator[Dict[str, Any]]) -> str:
+        self._expire()
+        fid = uuid.uuid4().hex
+        self._channels[fid] = FeedbackChannel(events)
+        self.stats["opened"] += 1
+        return fid
+
+    def get(self, fid: str) -> FeedbackChannel | None:
+        self._expire()
+        ch = self._channels.get(fid)
+        if ch is not None:
+            self.stats["subscribed"] += 1
+        return ch
+
+    def metrics(self) -> Dict[str, Any]:
+        return {**self.stats, "open": len(self._channels)}
@@ -0,0 +1,109 @@
+"""Decodability checks on top of the shared grapheme inventory.
+
+The inventory, :func:`segment` and :func:`pattern` live in the root module
+``dutch_graphemes`` (shared with ``phoneme_diff``) and are re-exported here.
+Forbidden-grapheme checks go through :class:`ForbiddenMatcher`, compiled
+once per forbidden set, so a clean word list or story is scanned in one pass
+regardless of how many graphemes are forbidden.
+"""
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from typing import Iterable, Sequence
+
+from dutch_graphemes import DUTCH_MULTI_GRAPHEMES, VOWEL_GRAPHEMES, pattern, segment
+
+
+def undecodable_words(
+    text: str, allowed: Iterable[str], patterns: Iterable[str], max_words: int
+) -> list[str] | None:
+    """Words of ``text`` that break the unit rules, mirroring ``isDecodable``.
+
+    Returns ``None`` when the sentence is decodable, otherwise the offending
+    words (or ``[]`` when only the word limit is exceeded).  An empty
+    ``patterns`` list disables the pattern check.
+    """
+    words = text.strip().split()
+    allowed_set = normalize_set(allowed)
+    pattern_set = {p.strip() for p in patterns if p.strip()}
+    bad = []
+    for w in words:
+        clean = w.replace(".", "")
+        if any(g not in allowed_set for g in segment(clean)) or (
+            pattern_set and pattern(clean) not in pattern_set
+        ):
+            bad.append(w)
+    if bad or len(words) > max_words:
+        return bad
+    return None
+
+
+def normalize_set(items: Iterable[str]) -> frozenset[str]:
+    return frozenset(x.strip().lower() for x in items if x and x.strip())
+
+
+def forbidden_sequences_from_allowed(allowed_list: list[str]) -> list[str]:
+    """Return multi-letter graphemes that are NOT allowed for this unit."""
+    allowed = {a.strip() for a in allowed_list if a and a.strip()}
+    # We only forbid multi-letter graphemes; single letters are handled by 'allowed' itself.
+    return [g for g in DUTCH_MULTI_GRAPHEMES if g not in allowed]
+
+
+class ForbiddenMatcher:
+    """Compiled matcher for a fixed set of forbidden graphemes.
+
+    A text is forbidden when one of its words, segmented with
+    :func:`segment`, contains a forbidden grapheme, so "school" passes when
+    "sch" is allowed even though "ch" is not.  Every such grapheme is also a
+    substring of the text, so one compiled alternation (the scan runs in C)
+    clears the common clean case before any word is segmented.
+    """
+
+    def __init__(self, sequences: Iterable[str]) -> None:
+        self.sequences: tuple[str, ...] = tuple(dict.fromkeys(s.lower() for s in sequences if s))
+        self._forbidden = frozenset(self.sequences)
+        self._regex = (
+            re.compile("|".join(re.escape(s) for s in sorted(self.sequences, key=len, reverse=True)))
+            if self.sequences
+            else None
+        )
+        # A single scan over newline-joined texts is only exact when no
+        # sequence can span the separator.
+        self._joinable = not any("\n" in s for s in self.sequences)
+
+    def search(self, text: str) -> bool:
+        """Does ``text`` contain a word with a forbidden grapheme?"""
+        if self._regex is None:
+            return False
+        t = text.lower()
+        if self._regex.search(t) is None:
+            return False
+        return any(g in self._forbidden for w in t.split() for g in segment(w))
+
+    def check_many(self, texts: Sequence[str]) -> list[bool]:
+        """Batch variant of :meth:`search` for word lists and story outputs.
+
+        The common all-clean case costs a single scan over the joined texts.
+        """
+        if self._regex is None:
+            return [False] * len(texts)
+        if self._joinable and self._regex.search("\n".join(texts).lower()) is None:
+            return [False] * len(texts)
+        return [self.search(t) for t in texts]
+
+
+@lru_cache(maxsize=256)
+def compile_forbidden(sequences: tuple[str, ...]) -> ForbiddenMatcher:
+    """Compiled matcher for ``sequences`` (cached)."""
+    return ForbiddenMatcher(sequences)
+
+
+def forbidden_matcher(allowed_list: Iterable[str]) -> ForbiddenMatcher:
+    """Compiled matcher for everything not in ``allowed_list`` (cached per set)."""
+    return _matcher_for_allowed(frozenset(a.strip() for a in allowed_list if a and a.strip()))
+
+
+@lru_cache(maxsize=256)
+def _matcher_for_allowed(allowed: frozenset[str]) -> ForbiddenMatcher:
+    return compile_forbidden(tuple(forbidden_sequences_from_allowed(list(allowed))))
@@ -20,8 +20,14 @@ import asyncio
 from rich.console import Console
 from pydantic import BaseModel
 
-from . import config, storage
+from . import asset_pack, clients, config, outbound, storage, tutor_cache
+from .graphemes import forbidden_matcher, forbidden_sequences_from_allowed, undecodable_words
+from .feedback_channel import FeedbackChannels
+from .persistence import writer
 from .session_manager import EnginePool
+from .story_cache import StoryCache
+from .story_prefetch import StoryPrefetcher, story_key
+from .word_bank import bank as word_bank
 
 # Heavy dependencies such as the analysis pipeline, text to speech and
 # realtime processing pull in a number of third party libraries.  Importing
@@ -34,12 +40,22 @@ from .session_manager import EnginePool
 # Import helper modules from the repository root
 import prompt_builder
 import gpt_client
+import fast_path
+import alignment
+import model_router
+import push_feeder
+import engines
+from tutor_schema import TutorFeedback, TutorResponse
+from json_stream import JsonFieldStream, SentenceSplitter
 
 # `sessions` will map realtime session ids to RealtimeSession objects.  The
 # class itself is imported lazily in `realtime_start` to avoid importing heavy
 # dependencies when they are not installed.
 sessions: dict[str, object] = {}
 engine_pool = EnginePool()
+story_prefetcher = StoryPrefetcher()
+story_cache = StoryCache()
+feedback_channels = FeedbackChannels()
 
 console = Console()
 
@@ -80,50 +96,6 @@ app.mount(
 sent_index = 0
 models_ready = False
 
-# Canonical Dutch grapheme inventory used for decodability checks.
-# Include multi-letter vowel groups and consonant clusters that function as a unit.
-DUTCH_MULTI_GRAPHEMES: list[str] = [
-    # long/double vowels & common digraphs
-    "aa",
-    "ee",
-    "oo",
-    "uu",
-    "ij",
-    "ei",
-    "ie",
-    "ou",
-    "au",
-    "ui",
-    "eu",
-    "oe",
-    # complex clusters and endings
-    "ng",
-    "nk",
-    "ch",
-    "sch",
-    # vowel triphthongs/groups introduced later in Start
-    "aai",
-    "ooi",
-    "oei",
-    # -uw families
-    "uw",
-    "ieuw",
-    "eeuw",
-]
-
-
-def forbidden_sequences_from_allowed(allowed_list: list[str]) -> list[str]:
-    """Return multi-letter graphemes that are NOT allowed for this unit."""
-    allowed = {a.strip() for a in allowed_list if a and a.strip()}
-    # We only forbid multi-letter graphemes; single letters are handled by 'allowed' itself.
-    return [g for g in DUTCH_MULTI_GRAPHEMES if g not in allowed]
-
-
-def contains_forbidden_seq(text: str, forbidden: list[str]) -> bool:
-    t = text.lower()
-    return any(seq in t for seq in forbidden if seq)
-
-
 def _dump_prompt(prompt_text: str, json_text: str) -> None:
     try:
         console.rule("[bold green]System Prompt[/bold green]")
@@ -152,6 +124,9 @@ def _print_timeline(results: dict) -> None:
         ("first_chunk_received", "azure_first_write", "azure first write"),
         ("w2v2_ready_ph", "w2v2_first_decode", "w2v2 first decode"),
         ("/stop_in", "json_ready", "/stop roundtrip"),
+        ("json_ready", "gpt_first_token", "gpt first token"),
+        ("/stop_in", "tts_first_audio", "stop to first audio"),
+        ("/stop_in", "local_verdict", "stop to local verdict"),
     ]:
         d = _delta(tb, a, b)
         if d is not None:
@@ -398,23 +373,112 @@ async def _warm_models() -> None:
         AzurePlainTranscriber(realtime=False)
     except Exception:
         pass
+    if config.REALTIME:
+        try:
+            from . import azure_pool
+
+            if azure_pool.enabled():
+                azure_pool.pool.start()
+        except Exception:
+            pass
 
     # Generate the fixed filler sentence once so it's ready for reuse
     try:
-        from .tts import tts_to_file
+        from .tts import load_word_index, tts_to_file
+
+        load_word_index()
         if not FILLER_AUDIO_PATH.exists():
-            tmp = tts_to_file("De zin was")
-            shutil.move(tmp, FILLER_AUDIO_PATH)
+            # The TTS file lives in the shared cache or asset pack, so copy
+            # instead of move.
+            pack = asset_pack.current()
+            src = pack.audio(asset_pack.FILLER_TEXT) if pack else None
+            shutil.copyfile(src or tts_to_file(asset_pack.FILLER_TEXT), FILLER_AUDIO_PATH)
+    except Exception:
+        pass
+    # Fast-path praise comes from the TTS cache (or the asset pack)
+    try:
+        from .tts import tts_to_file
+
+        pack = asset_pack.current()
+        if not (pack and pack.audio(fast_path.PRAISE_TEXT)):
+            tts_to_file(fast_path.PRAISE_TEXT)
     except Exception:
         pass
 
 
+@app.on_event("startup")
+async def _startup() -> None:
+    """Start the result writer and shared HTTP clients; load the asset pack."""
+    writer.start()
+    clients.startup()
+    pack = asset_pack.reload()
+    if pack is not None:
+        console.log(f"[green]Serving static audio from asset pack {pack.version}[/green]")
+
+
+@app.on_event("shutdown")
+async def _shutdown() -> None:
+    """Flush pending result writes, then close the shared HTTP and Azure pools."""
+    await writer.drain()
+    await clients.shutdown()
+    pool = _azure_pool()
+    if pool is not None:
+        await asyncio.to_thread(pool.shutdown)
+
+
+def _azure_pool():
+    """The recognizer pool if the Azure SDK is available, else ``None``."""
+    try:
+        from . import azure_pool
+    except ImportError:
+        return None
+    return azure_pool.pool
+
+
 @app.get("/api/config")
 async def get_config():
     """Expose minimal runtime configuration to the frontend."""
     return {"realtime": config.REALTIME, "delay_seconds": config.DELAY_SECONDS}
 
 
+@app.get("/api/metrics")
+async def get_metrics():
+    """Return cache and background-worker counters for monitoring."""
+    from .tts import sentence_cache, word_stats
+
+    azure = _azure_pool()
+    return {
+        "tts_cache": sentence_cache.metrics(),
+        "word_cache": dict(word_stats),
+        "persistence": dict(writer.stats),
+        "story_prefetch": story_prefetcher.metrics(),
+        "story_cache": story_cache.metrics(),
+        "word_bank": word_bank().metrics(),
+        "story_repair": story_repair_stats,
+        "fast_path": fast_path.metrics(),
+        "tutor_cache": tutor_cache.cache.metrics(),
+        "gpt_usage": gpt_client.usage_stats,
+        "gpt_retries": gpt_client.retry_stats,
+        "gpt_providers": gpt_client.provider_metrics(),
+        "model_routing": tutor_router.metrics(),
+        "outbound": outbound.metrics(),
+        "feedback_channels": feedback_channels.metrics(),
+        "azure_pool": azure.metrics() if azure is not None else None,
+        "azure_feed": push_feeder.feeder.metrics(),
+        "engines": engines.scheduler.metrics(),
+    }
+
+
+def _sentence_payload(sentence: str, index: int, total: int) -> dict:
+    """Sentence info plus its pre-built audio when an asset pack has it."""
+    payload = {"sentence": sentence, "index": index, "total": total}
+    pack = asset_pack.current()
+    audio = pack.audio(sentence) if pack else None
+    if audio:
+        payload["audio"] = os.path.basename(audio)
+    return payload
+
+
 @app.get("/api/next_sentence")
 async def next_sentence():
     global sent_index
@@ -423,11 +487,7 @@ async def next_sentence():
         sent_index = 0
     sentence = config.SENTENCES[sent_index]
     sent_index += 1
-    return {
-        "sentence": sentence,
-        "index": sent_index,
-        "total": total,
-    }
+    return _sentence_payload(sentence, sent_index, total)
 
 
 @app.get("/api/prev_sentence")
@@ -437,11 +497,7 @@ async def prev_sentence():
     sent_index = (sent_index - 2) % total
     sentence = config.SENTENCES[sent_index]
     sent_index += 1
-    return {
-        "sentence": sentence,
-        "index": sent_index,
-        "total": total,
-    }
+    return _sentence_payload(sentence, sent_index, total)
 
 
 @app.get("/api/results/{teacher_id}")
@@ -467,6 +523,92 @@ async def get_result(res_id: str):
     return r
 
 
+FAST_PATH_THRESHOLDS = fast_path.Thresholds(
+    min_pron_score=config.FAST_PATH_MIN_PRON_SCORE,
+    min_accuracy_score=config.FAST_PATH_MIN_ACCURACY_SCORE,
+    min_completeness_score=config.FAST_PATH_MIN_COMPLETENESS_SCORE,
+    min_word_accuracy=config.FAST_PATH_MIN_WORD_ACCURACY,
+    require_wav2vec2=config.FAST_PATH_REQUIRE_WAV2VEC2,
+)
+
+
+def _fast_verdict(results: dict, req):
+    """Local praise for clearly correct readings; marks ``results`` when used."""
+    if not config.FAST_PATH:
+        return None
+    resp = fast_path.verdict(req, FAST_PATH_THRESHOLDS)
+    if resp is not None:
+        results["fast_path"] = True
+    return resp
+
+
+tutor_router = model_router.Router(
+    small_model=config.GPT_SMALL_MODEL,
+    large_model=config.GPT_MODEL,
+    rules=model_router.Rules(
+        max_mismatches=config.ROUTING_MAX_MISMATCHES,
+        max_score_spread=config.ROUTING_MAX_SCORE_SPREAD,
+        max_flagged_words=config.ROUTING_MAX_FLAGGED_WORDS,
+        min_word_accuracy=config.ROUTING_MIN_WORD_ACCURACY,
+    ),
+)
+
+
+def _build_prompt(results: dict):
+    return prompt_builder.build(
+        results,
+        state={},
+        compact=config.TUTOR_PROMPT_COMPACT,
+        local_errors=config.LOCAL_ERROR_DETAILS,
+    )
+
+
+def _response_model():
+    return TutorFeedback if config.LOCAL_ERROR_DETAILS else TutorResponse
+
+
+def _with_error_details(req, resp):
+    """Full ``TutorResponse``; local error details for a ``TutorFeedback``."""
+    if isinstance(resp, TutorFeedback):
+        import phoneme_diff  # numpy; only needed with LOCAL_ERROR_DETAILS
+
+        return phoneme_diff.complete(req, resp)
+    return resp
+
+
+async def _gpt_tutor(req, messages):
+    """GPT tutor answer, on the model the difficulty router picks."""
+    if config.MODEL_ROUTING:
+        resp = await tutor_router.chat(req, messages, _response_model())
+    else:
+        resp = await gpt_client.chat(messages, response_model=_response_model())
+    return _with_error_details(req, resp)
+
+
+async def _gpt_tutor_stream(req, messages):
+    if config.MODEL_ROUTING:
+        source = tutor_router.chat_stream(req, messages, _response_model())
+    else:
+        source = gpt_client.chat_stream(messages, response_model=_response_model())
+    async for kind, value in source:
+        yield kind, _with_error_details(req, value) if kind == "response" else value
+
+
+async def _tutor_feedback(results: dict, req, messages):
+    """Fast-path verdict if it applies, otherwise the (cached) GPT tutor."""
+    return _fast_verdict(results, req) or await tutor_cache.cache.chat(
+        messages, lambda m: _gpt_tutor(req, m)
+    )
+
+
+def _feedback_audio(text: str) -> str:
+    """Feedback clip for ``text``; the fixed praise usually sits in the pack."""
+    from .tts import tts_to_file
+
+    pack = asset_pack.current()
+    return (pack.audio(text) if pack else None) or tts_to_file(text)
+
+
 @app.post("/api/process")
 async def process(
     sentence: str = Form(...),
@@ -480,24 +622,17 @@ async def process(
     # Import heavy modules lazily to avoid requiring them when only the
     # authentication endpoints are used.
     from .analysis_pipeline import analyze_audio
-    from .tts import tts_to_file
 
     results = analyze_audio(wav_bytes, sentence)
-    req, messages = prompt_builder.build(results, state={})
-    tutor_resp = await gpt_client.chat(messages)
-    feedback_audio = tts_to_file(tutor_resp.feedback_text)
+    req, messages = _build_prompt(results)
+    with outbound.priority(outbound.Priority.FEEDBACK):
+        tutor_resp = await _tutor_feedback(results, req, messages)
+        feedback_audio = await asyncio.to_thread(_feedback_audio, tutor_resp.feedback_text)
 
     results["correct"] = tutor_resp.is_correct
 
-    dest_audio = storage.STORAGE_DIR / f"{results['session_id']}.wav"
-    shutil.move(results["audio_file"], dest_audio)
-    storage.save_result(
-        teacher_id,
-        student_id,
-        results,
-        str(dest_audio),
-        req.model_dump_json(),
-    )
+    # Audio move and database insert happen after the response is sent.
+    writer.submit(teacher_id, student_id, results, req)
 
     return JSONResponse(
         {
@@ -524,6 +659,14 @@ async def get_audio(name: str):
     word_path = storage.STORAGE_DIR / "words" / name
     if word_path.exists():
         return FileResponse(word_path, media_type="audio/wav")
+    pack = asset_pack.current()
+    packed = pack.find_file(name) if pack else None
+    if packed is not None:
+        return FileResponse(packed, media_type="audio/wav")
+    # Sentence-level TTS lives in the content-addressed cache.
+    cached = storage.STORAGE_DIR / "tts" / name
+    if cached.exists():
+        return FileResponse(cached, media_type="audio/wav")
     raise HTTPException(status_code=404, detail="Audio not found")
 
 
@@ -608,24 +751,24 @@ async def realtime_stop(sid: str, request: Request, background: BackgroundTasks)
     if sess.timeline:
         sess.timeline.mark("json_ready")
         results["timeline_backend"] = sess.timeline.to_dict()
+    req, messages = _build_prompt(results)
+    if isinstance(payload, dict) and payload.get("two_tier"):
+        return _two_tier_feedback(results, req, messages, sess)
+    if isinstance(payload, dict) and payload.get("stream"):
+        return EventSourceResponse(
+            _stream_feedback(
+                results, req, messages, sess.timeline, sess.teacher_id, sess.student_id
+            )
+        )
     _print_timeline(results)
-    req, messages = prompt_builder.build(results, state={})
-    tutor_resp = await gpt_client.chat(messages)
-    from .tts import tts_to_file
-
-    feedback_audio = tts_to_file(tutor_resp.feedback_text)
+    with outbound.priority(outbound.Priority.FEEDBACK):
+        tutor_resp = await _tutor_feedback(results, req, messages)
+        feedback_audio = await asyncio.to_thread(_feedback_audio, tutor_resp.feedback_text)
 
     results["correct"] = tutor_resp.is_correct
 
-    dest_audio = storage.STORAGE_DIR / f"{results['session_id']}.wav"
-    shutil.move(results["audio_file"], dest_audio)
-    storage.save_result(
-        sess.teacher_id,
-        sess.student_id,
-        results,
-        str(dest_audio),
-        req.model_dump_json(),
-    )
+    # Only the feedback is on the critical path; persistence is write-behind.
+    writer.submit(sess.teacher_id, sess.student_id, results, req)
     return JSONResponse(
         {
             "feedback_text": tutor_resp.feedback_text,
@@ -637,6 +780,163 @@ async def realtime_stop(sid: str, request: Request, background: BackgroundTasks)
     )
 
 
+def _two_tier_feedback(results, req, messages, sess) -> JSONResponse:
+    """Answer with a local verdict now; GPT feedback follows on a channel.
+
+    The verdict comes from the transcript alignment (``alignment.py``) or,
+    for clearly correct readings, the fast path.  The full feedback is
+    generated right away and pushed on ``GET /api/feedback/{feedback_id}``.
+    """
+    if config.FAST_PATH and fast_path.blocker(req, FAST_PATH_THRESHOLDS) is None:
+        verdict = alignment.LocalVerdict(True)
+    else:
+        verdict = alignment.local_verdict(req)
+    if sess.timeline:
+        sess.timeline.mark("local_verdict")
+    fid = feedback_channels.open(
+        _stream_feedback(
+            results, req, messages, sess.timeline, sess.teacher_id, sess.student_id
+        )
+    )
+    return JSONResponse(
+        {
+            "feedback_id": fid,
+            "correct": verdict.correct,
+            "errors": verdict.errors,
+            "suspects": verdict.suspects,
+            "delay_seconds": config.DELAY_SECONDS,
+        }
+    )
+
+
+@app.get("/api/feedback/{feedback_id}")
+async def feedback_events(feedback_id: str):
+    """SSE stream of the GPT feedback for a two-tier ``/stop``."""
+    channel = feedback_channels.get(feedback_id)
+    if channel is None:
+        raise HTTPException(status_code=404, detail="Unknown feedback id")
+    return EventSourceResponse(channel.subscribe())
+
+
+async def _fast_stream(resp):
+    """Replay a local verdict in the shape of ``gpt_client.chat_stream``."""
+    yield "feedback", resp.feedback_text
+    yield "response", resp
+
+
+# Feedback producers that outlive a disconnected stream.
+_producers: set[asyncio.Task] = set()
+
+
+async def _stream_feedback(results, req, messages, timeline, teacher_id, student_id):
+    """Pipe streamed GPT feedback straight into per-sentence TTS.
+
+    Yields SSE events: ``text`` for every ``feedback_text`` delta, ``audio``
+    for each synthesized sentence (with its ``index`` so the browser can play
+    them in order while later sentences are still being generated) and a
+    final ``feedback`` event carrying the regular ``/stop`` payload.
+    """
+    from .tts import tts_to_file
+
+    events: asyncio.Queue = asyncio.Queue()
+    splitter = SentenceSplitter()
+    tts_tasks: list[asyncio.Task] = []
+    done = object()
+
+    def _mark_once(name: str) -> None:
+        if timeline and name not in getattr(timeline, "_marks", {}):
+            timeline.mark(name)
+
+    def _speak(sentence: str) -> None:
+        idx = len(tts_tasks)
+
+        async def _run() -> str:
+            path = await asyncio.to_thread(tts_to_file, sentence, True)
+            _mark_once("tts_first_audio")
+            await events.put(
+                {
+                    "event": "audio",
+                    "data": json.dumps(
+                        {"index": idx, "text": sentence, "audio": os.path.basename(path)}
+                    ),
+                }
+            )
+            return path
+
+        if idx == 0:
+            _mark_once("gpt_first_sentence")
+        tts_tasks.append(asyncio.create_task(_run()))
+
+    async def _produce() -> None:
+        try:
+            tutor_resp = None
+            fast = _fast_verdict(results, req)
+            key = tutor_cache.cache_key(messages) if not fast and tutor_cache.enabled() else None
+            if key is not None:
+                fast = await tutor_cache.cache.get(key)
+            source = _fast_stream(fast) if fast else _gpt_tutor_stream(req, messages)
+            async for kind, value in source:
+                if kind == "feedback":
+                    _mark_once("gpt_first_token")
+                    await events.put({"event": "text", "data": json.dumps({"delta": value})})
+                    for sentence in splitter.feed(value):
+                        _speak(sentence)
+                else:
+                    tutor_resp = value
+            for sentence in splitter.flush():
+                _speak(sentence)
+            _mark_once("gpt_done")
+            if key is not None and not fast and tutor_resp is not None:
+                tutor_cache.cache.put(key, tutor_resp)
+            audio_paths = await asyncio.gather(*tts_tasks)
+            if tutor_resp is not None:
+                results["correct"] = tutor_resp.is_correct
+                if timeline:
+                    results["timeline_backend"] = timeline.to_dict()
+                _print_timeline(results)
+                writer.submit(teacher_id, student_id, results, req)
+            await events.put((done, tutor_resp, audio_paths))
+        except Exception as exc:
+            for t in tts_tasks:
+                t.cancel()
+            await events.put((done, exc, []))
+
+    # GPT and TTS calls made by the producer inherit the feedback priority.
+    # The producer also saves the result, so it runs to the end even when
+    # the client disconnects mid-stream.
+    with outbound.priority(outbound.Priority.FEEDBACK):
+        producer = asyncio.create_task(_produce())
+    _producers.add(producer)
+    producer.add_done_callback(_producers.discard)
+    while True:
+        item = await events.get()
+        if isinstance(item, dict):
+            yield item
+            continue
+        _, tutor_resp, audio_paths = item
+        break
+
+    if isinstance(tutor_resp, Exception) or tutor_resp is None:
+        console.print(f"[red]Streaming feedback failed: {tutor_resp}[/red]")
+        yield {"event": "error", "data": json.dumps({"detail": str(tutor_resp)})}
+        return
+
+    audio_names = [os.path.basename(p) for p in audio_paths]
+    yield {
+        "event": "feedback",
+        "data": json.dumps(
+            {
+                "feedback_text": tutor_resp.feedback_text,
+                "feedback_audio": audio_names[0] if audio_names else None,
+                "feedback_audio_parts": audio_names,
+                "correct": tutor_resp.is_correct,
+                "errors": [e.model_dump(by_alias=True) for e in tutor_resp.errors],
+                "delay_seconds": config.DELAY_SECONDS,
+            }
+        ),
+    }
+
+
 # ---------------------------------------------------------------------------
 # New endpoints for the interactive story feature
 # ---------------------------------------------------------------------------
@@ -644,17 +944,24 @@ async def realtime_stop(sid: str, request: Request, background: BackgroundTasks)
 
 @app.post("/api/generate_words")
 async def generate_words(payload: WordsPayload):
-    import openai
+    words = word_bank().select(payload.allowed, payload.focus, payload.patterns, 8)
+    if len(words) < 8:
+        word_bank().record_fallback()
+        words += await _gpt_words(payload, 8 - len(words), exclude=words)
+    return JSONResponse(content={"words": words[:8]})
 
-    client = openai.AsyncOpenAI()
+
+async def _gpt_words(payload: WordsPayload, count: int, exclude: list[str]) -> list[str]:
+    """Ask GPT for ``count`` extra words when the word bank falls short."""
+    client = clients.openai_async()
 
     sys_prompt = (
         "Je genereert oefenwoorden voor beginnende lezers.\n"
         "Regels:\n"
-        "• Genereer exact 8 decodabele Nederlandse woorden.\n"
+        f"• Genereer exact {count} decodabele Nederlandse woorden.\n"
         "• Gebruik uitsluitend de opgegeven letters/klanken. Andere zijn VERBODEN.\n"
         "• Eén woord per item. Geen hoofdletters, geen namen. Bij voorkeur één lettergreep.\n\n"
-        "Uitvoer (STRICT JSON): { \"words\": [8 strings] }"
+        f"Uitvoer (STRICT JSON): {{ \"words\": [{count} strings] }}"
     )
     forb = forbidden_sequences_from_allowed(payload.allowed)
     forbidden_line = ""
@@ -664,58 +971,86 @@ async def generate_words(payload: WordsPayload):
             f"[{', '.join(forb)}]\n"
             "Voorbeelden: o+u → 'ou' is verboden; s+c+h → 'sch' is verboden; n+g → 'ng' is verboden.\n"
         )
+    exclude_line = f"Gebruik deze woorden NIET: [{', '.join(exclude)}]\n" if exclude else ""
 
     user_prompt = (
         f"Toegestane letters/klanken (strikt): [{', '.join(payload.allowed)}]\n"
         f"{forbidden_line}"
         f"Focusklanken: [{', '.join(payload.focus)}]\n"
         f"Woordpatronen (informatief): [{', '.join(payload.patterns)}]\n"
-        "Genereer nu de 8 woorden."
-    )
-    resp = await client.chat.completions.create(
-        model="gpt-4o",
-        temperature=1.0,
-        top_p=1.0,
-        max_tokens=200,
-        messages=[{"role": "system", "content": sys_prompt}, {"role": "user", "content": user_prompt}],
-        response_format={"type": "json_object"},
+        f"{exclude_line}"
+        f"Genereer nu de {count} woorden."
     )
+    async with outbound.lane("openai").slot():
+        resp = await client.chat.completions.create(
+            model="gpt-4o",
+            temperature=1.0,
+            top_p=1.0,
+            max_tokens=200,
+            messages=[{"role": "system", "content": sys_prompt}, {"role": "user", "content": user_prompt}],
+            response_format={"type": "json_object"},
+        )
     j = json.loads(resp.choices[0].message.content)
     words = [w.strip() for w in j.get("words", []) if isinstance(w, str)]
-    clean = [w for w in words if not contains_forbidden_seq(w, forb)]
+    matcher = forbidden_matcher(payload.allowed)
+    clean = [w for w, bad in zip(words, matcher.check_many(words)) if not bad and w not in exclude]
 
     # Optional single retry if we lost items:
-    if len(clean) < 8 and forb:
+    if len(clean) < count and forb:
         bad = [w for w in words if w not in clean]
         retry_user = (
             user_prompt
             + "\nLET OP: De vorige lijst bevatte verboden lettergroepen in: "
             + ", ".join(bad)
-            + ". Genereer 8 nieuwe, allemaal toegestaan."
-        )
-        resp2 = await client.chat.completions.create(
-            model="gpt-4o",
-            temperature=1.0,
-            top_p=1.0,
-            max_tokens=200,
-            messages=[{"role": "system", "content": sys_prompt}, {"role": "user", "content": retry_user}],
-            response_format={"type": "json_object"},
+            + f". Genereer {count} nieuwe, allemaal toegestaan."
         )
+        async with outbound.lane("openai").slot():
+            resp2 = await client.chat.completions.create(
+                model="gpt-4o",
+                temperature=1.0,
+                top_p=1.0,
+                max_tokens=200,
+                messages=[{"role": "system", "content": sys_prompt}, {"role": "user", "content": retry_user}],
+                response_format={"type": "json_object"},
+            )
         words2 = [
             w.strip()
             for w in json.loads(resp2.choices[0].message.content).get("words", [])
             if isinstance(w, str)
         ]
-        clean = [w for w in words2 if not contains_forbidden_seq(w, forb)]
+        clean = [w for w, bad in zip(words2, matcher.check_many(words2)) if not bad and w not in exclude]
 
-    return JSONResponse(content={"words": clean[:8]})
+    return clean[:count]
 
 
-@app.post("/api/continue_story")
-async def continue_story_post(payload: StoryPayload):
-    import openai
+def _story_key(payload: StoryPayload) -> str:
+    return story_key(
+        payload.theme,
+        payload.level,
+        payload.direction,
+        payload.story,
+        payload.focus,
+        payload.allowed,
+        payload.patterns,
+        payload.max_words,
+        payload.strict_forbid,
+    )
+
+
+async def _generate_section(payload: StoryPayload, on_item=None) -> dict:
+    """Next section (``sentences`` + ``directions``), shared across students.
+
+    ``on_item(kind, index, text)`` is called for every sentence/direction as
+    soon as it has been streamed, but only when this call actually generates.
+    """
+    return await story_cache.get(
+        _story_key(payload), lambda: _request_section(payload, on_item)
+    )
 
-    client = openai.AsyncOpenAI()
+
+async def _request_section(payload: StoryPayload, on_item=None) -> dict:
+    """Ask GPT for the next section, streaming and parsing it incrementally."""
+    client = clients.openai_async()
 
     sys_prompt = get_system_prompt_by_level(payload.level)
     user_prompt = build_user_prompt_story(
@@ -729,15 +1064,220 @@ async def continue_story_post(payload: StoryPayload):
         payload.max_words or 7,
         payload.strict_forbid,
     )
-    resp = await client.chat.completions.create(
-        model="gpt-4o",
-        temperature=1.0,
-        top_p=1.0,
-        max_tokens=300,
-        messages=[{"role": "system", "content": sys_prompt}, {"role": "user", "content": user_prompt}],
-        response_format={"type": "json_object"},
+    if os.environ.get("DEBUG"):
+        console.rule("[bold blue]System[/bold blue]")
+        console.print(sys_prompt)
+        console.rule("[bold blue]User[/bold blue]")
+        console.print(user_prompt)
+
+    # In strict mode undecodable sentences are held back until repaired.
+    strict = payload.strict_forbid and bool(payload.allowed)
+    parser = JsonFieldStream()
+    async with outbound.lane("openai").slot():
+        stream = await client.chat.completions.create(
+            model="gpt-4o",
+            temperature=1.0,
+            top_p=1.0,
+            max_tokens=300,
+            messages=[{"role": "system", "content": sys_prompt}, {"role": "user", "content": user_prompt}],
+            response_format={"type": "json_object"},
+            stream=True,
+        )
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if not delta:
+                continue
+            for ev in parser.feed(delta):
+                if ev.done and ev.index is not None and on_item is not None:
+                    if ev.key == "sentences":
+                        if not strict or _undecodable(payload, ev.text) is None:
+                            on_item("sentence", ev.index, ev.text)
+                    elif ev.key == "directions":
+                        on_item("direction", ev.index, ev.text)
+    section = json.loads(parser.text)
+    if strict:
+        await _repair_section(payload, section)
+    return section
+
+
+story_repair_stats = {"checked": 0, "offending": 0, "repair_calls": 0, "repaired": 0, "unresolved": 0}
+
+
+def _undecodable(payload: StoryPayload, sentence: str) -> list[str] | None:
+    return undecodable_words(sentence, payload.allowed, payload.patterns, payload.max_words or 7)
+
+
+async def _repair_section(payload: StoryPayload, section: dict) -> None:
+    """Regenerate, in place, only the sentences that are not decodable."""
+    sentences = section.get("sentences")
+    if not isinstance(sentences, list):
+        return
+    bad = {}
+    for i, sent in enumerate(sentences):
+        words = _undecodable(payload, sent) if isinstance(sent, str) else None
+        if words is not None:
+            bad[i] = words
+    story_repair_stats["checked"] += len(sentences)
+    story_repair_stats["offending"] += len(bad)
+
+    for _ in range(config.STORY_REPAIR_ATTEMPTS):
+        if not bad:
+            break
+        story_repair_stats["repair_calls"] += 1
+        try:
+            fixes = await _request_repairs(payload, sentences, bad)
+        except Exception as exc:
+            console.log(f"[yellow][story] sentence repair failed: {exc}[/yellow]")
+            break
+        for i, text in fixes.items():
+            if i not in bad:
+                continue
+            words = _undecodable(payload, text)
+            if words is None:
+                sentences[i] = text
+                del bad[i]
+                story_repair_stats["repaired"] += 1
+            else:
+                bad[i] = words
+    # Whatever could not be fixed is kept, as before strict validation existed.
+    story_repair_stats["unresolved"] += len(bad)
+
+
+async def _request_repairs(
+    payload: StoryPayload, sentences: list[str], bad: dict[int, list[str]]
+) -> dict[int, str]:
+    """Ask GPT to rewrite the sentences in ``bad``; returns index -> sentence."""
+    client = clients.openai_async()
+
+    forb = forbidden_sequences_from_allowed(payload.allowed)
+    numbered = "\n".join(f"{i}. {s}" for i, s in enumerate(sentences))
+    problems = "\n".join(
+        f"• Zin {i}: " + (f"woorden [{', '.join(w)}] zijn niet toegestaan" if w else "te veel woorden")
+        for i, w in bad.items()
+    )
+    sys_prompt = (
+        "Je herschrijft losse zinnen uit een kinderverhaal zodat ze decodeerbaar zijn.\n"
+        "Houd de betekenis en de samenhang met de andere zinnen.\n"
+        "Uitvoer (STRICT JSON): { \"fixes\": [{\"index\": <nummer>, \"sentence\": \"<nieuwe zin>\"}] }"
+    )
+    user_prompt = "\n".join(
+        p
+        for p in [
+            f"Verhaal tot nu toe: \"{payload.story or ''}\"",
+            f"Nieuwe zinnen:\n{numbered}",
+            f"Herschrijf alleen deze zinnen:\n{problems}",
+            build_allowed_rule(payload.level, payload.allowed, True),
+            f"• Verboden lettergroepen: [{', '.join(forb)}]" if forb else "",
+            f"• Toegestane woordstructuren: [{', '.join(p for p in payload.patterns if p.strip())}]",
+            f"• Maximaal {payload.max_words or 7} woorden per zin, alleen een punt als leesteken.",
+        ]
+        if p
+    )
+    async with outbound.lane("openai").slot():
+        resp = await client.chat.completions.create(
+            model="gpt-4o",
+            temperature=0.7,
+            max_tokens=60 * len(bad) + 40,
+            messages=[{"role": "system", "content": sys_prompt}, {"role": "user", "content": user_prompt}],
+            response_format={"type": "json_object"},
+        )
+    fixes = {}
+    for item in json.loads(resp.choices[0].message.content).get("fixes", []):
+        try:
+            fixes[int(item["index"])] = str(item["sentence"]).strip()
+        except (KeyError, TypeError, ValueError):
+            continue
+    return fixes
+
+
+async def _synthesize_section(section: dict) -> None:
+    """Fill the TTS caches for every sentence, word and direction."""
+    from .tts import tts_to_file, word_tts_to_file
+
+    texts = list(section.get("sentences", [])) + list(section.get("directions", []))
+    words = {w for s in section.get("sentences", []) for w in s.split()}
+    await asyncio.gather(
+        *(asyncio.to_thread(tts_to_file, t) for t in texts),
+        *(asyncio.to_thread(word_tts_to_file, w) for w in words),
+    )
+
+
+def _schedule_prefetch(
+    session: str, base: StoryPayload, story_so_far: str, directions: list[str]
+) -> None:
+    """Speculatively prepare the continuation for each offered direction."""
+    if not config.STORY_PREFETCH:
+        return
+    branches = {}
+    for direc in directions:
+        branch = base.model_copy(update={"direction": direc, "story": story_so_far})
+
+        async def _produce(branch: StoryPayload = branch) -> dict:
+            with outbound.priority(outbound.Priority.PREFETCH):
+                section = await _generate_section(branch)
+                await _synthesize_section(section)
+            return section
+
+        branches[_story_key(branch)] = _produce
+    story_prefetcher.schedule(session, branches)
+
+
+@app.post("/api/continue_story")
+async def continue_story_post(payload: StoryPayload):
+    return JSONResponse(content=await _generate_section(payload))
+
+
+class PrefetchPayload(BaseModel):
+    student_id: str | None = None
+    theme: str | None = None
+    level: str
+    story: str | None = None
+    directions: list[str]
+    focus: list[str] = []
+    allowed: list[str] = []
+    patterns: list[str] = []
+    max_words: int | None = None
+    strict_forbid: bool = False
+
+
+@app.post("/api/prefetch_story")
+async def prefetch_story(payload: PrefetchPayload):
+    """Start preparing both continuations while the child is still reading."""
+    base = StoryPayload(
+        theme=payload.theme,
+        level=payload.level,
+        direction="",
+        focus=payload.focus,
+        allowed=payload.allowed,
+        patterns=payload.patterns,
+        max_words=payload.max_words,
+        strict_forbid=payload.strict_forbid,
     )
-    return JSONResponse(content=json.loads(resp.choices[0].message.content))
+    _schedule_prefetch(payload.student_id or "", base, payload.story or "", payload.directions)
+    return {"status": "scheduled"}
+
+
+async def _static_audio(text: str) -> str:
+    """Audio for static content: asset pack first, TTS as fallback."""
+    pack = asset_pack.current()
+    packed = pack.audio(text) if pack else None
+    if packed:
+        return packed
+    from .tts import tts_to_file
+
+    return await asyncio.to_thread(tts_to_file, text)
+
+
+async def _static_word_audio(word: str) -> str:
+    pack = asset_pack.current()
+    packed = pack.word_audio(word) if pack else None
+    if packed:
+        return packed
+    from .tts import word_tts_to_file
+
+    return await asyncio.to_thread(word_tts_to_file, word)
 
 
 @app.get("/api/start_story")
@@ -763,23 +1303,20 @@ async def start_story(theme: str, level: str):
     if not story:
         raise HTTPException(status_code=400, detail="Story not found")
 
-    from .tts import tts_to_file, word_tts_to_file
-
     async def event_stream():
         total = len(story["section1"]) + len(story["directions"])
         done = 0
 
         sentence_tasks = []
         for sent in story["section1"]:
-            audio_task = asyncio.create_task(asyncio.to_thread(tts_to_file, sent))
+            audio_task = asyncio.create_task(_static_audio(sent))
             word_tasks = [
-                asyncio.create_task(asyncio.to_thread(word_tts_to_file, w))
-                for w in sent.split()
+                asyncio.create_task(_static_word_audio(w)) for w in sent.split()
             ]
             sentence_tasks.append((sent, audio_task, word_tasks))
 
         direction_tasks = [
-            (d, asyncio.create_task(asyncio.to_thread(tts_to_file, d)))
+            (d, asyncio.create_task(_static_audio(d)))
             for d in story["directions"]
         ]
 
@@ -831,100 +1368,103 @@ async def continue_story(
     patterns: str | None = None,
     max_words: int | None = None,
     strict_forbid: bool = False,
+    student_id: str | None = None,
 ):
     """Generate the next story section based on the chosen direction."""
 
-    import openai
-
-    client = openai.AsyncOpenAI()
-
-    focus_list = focus.split(",") if focus else []
-    allowed_list = allowed.split(",") if allowed else []
-    patterns_list = patterns.split(",") if patterns else []
-    user_prompt = build_user_prompt_story(
-        theme,
-        direction,
-        story or "",
-        level,
-        focus_list,
-        allowed_list,
-        patterns_list,
-        max_words or 7,
-        strict_forbid,
+    payload = StoryPayload(
+        theme=theme,
+        level=level,
+        direction=direction,
+        story=story,
+        focus=focus.split(",") if focus else [],
+        allowed=allowed.split(",") if allowed else [],
+        patterns=patterns.split(",") if patterns else [],
+        max_words=max_words,
+        strict_forbid=strict_forbid,
     )
-    sys_prompt = get_system_prompt_by_level(level)
-    if os.environ.get("DEBUG"):
-        console.rule("[bold blue]System[/bold blue]")
-        console.print(sys_prompt)
-        console.rule("[bold blue]User[/bold blue]")
-        console.print(user_prompt)
-
-    resp = await client.chat.completions.create(
-        model="gpt-4o",
-        temperature=1.0,
-        top_p=1.0,
-        max_tokens=300,
-        messages=[{"role": "system", "content": sys_prompt}, {"role": "user", "content": user_prompt}],
-        response_format={"type": "json_object"},
-    )
-
-    try:
-        j = json.loads(resp.choices[0].message.content)
-        sentences = j["sentences"]
-        directions = j["directions"]
-    except Exception as exc:
-        console.print(f"[red]Model output parsing failed: {exc}[/red]")
-        raise HTTPException(status_code=500, detail="Model gaf geen geldig JSON")
-
     from .tts import tts_to_file, word_tts_to_file
 
     async def event_stream():
-        total = len(sentences) + len(directions)
+        # Everything funnels into ``events``: finished sentence/direction
+        # events from ``_prepare`` and ``None`` once the full section is known.
+        # Items are synthesized as soon as GPT has streamed them and sent in
+        # arrival order with an explicit ``index``.
+        events: asyncio.Queue = asyncio.Queue()
+        started: set[tuple[str, int]] = set()
+        # Synthesis tasks, kept alive here and cancelled if the client leaves
+        pending: set[asyncio.Task] = set()
+        key = _story_key(payload)
+
+        async def _prepare(kind: str, idx: int, text: str) -> None:
+            data = {"type": kind, "index": idx, "text": text, "audio": None}
+            try:
+                audio_task = asyncio.to_thread(tts_to_file, text)
+                if kind == "sentence":
+                    data["words"] = []
+                    word_tasks = [asyncio.to_thread(word_tts_to_file, w) for w in text.split()]
+                    audio, *words = await asyncio.gather(audio_task, *word_tasks)
+                    data["words"] = [os.path.basename(w) for w in words]
+                else:
+                    audio = await audio_task
+                data["audio"] = os.path.basename(audio)
+            except Exception as exc:
+                # Still send the text so the section is complete.
+                console.print(f"[red]TTS failed for {kind} {idx}: {exc}[/red]")
+            await events.put({"event": kind, "data": json.dumps(data)})
+
+        def _start(kind: str, idx: int, text: str) -> None:
+            if (kind, idx) in started:
+                return
+            started.add((kind, idx))
+            task = asyncio.create_task(_prepare(kind, idx, text))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+
+        async def _section() -> dict:
+            section = await story_prefetcher.take(student_id or "", key)
+            if section is None:
+                section = await _generate_section(payload, on_item=_start)
+            return section
+
+        section_task = asyncio.create_task(_section())
+        section_task.add_done_callback(lambda _: events.put_nowait(None))
+
+        total = None
+        expected = 7  # 5 sentences + 2 directions, as the prompt asks
         done = 0
-
-        sentence_tasks = []
-        for sent in sentences:
-            audio_task = asyncio.create_task(asyncio.to_thread(tts_to_file, sent))
-            word_tasks = [
-                asyncio.create_task(asyncio.to_thread(word_tts_to_file, w))
-                for w in sent.split()
-            ]
-            sentence_tasks.append((sent, audio_task, word_tasks))
-
-        direction_tasks = [
-            (d, asyncio.create_task(asyncio.to_thread(tts_to_file, d)))
-            for d in directions
-        ]
-
-        for sent, audio_task, word_tasks in sentence_tasks:
-            audio = await audio_task
-            word_audios = [os.path.basename(await t) for t in word_tasks]
-            yield {
-                "event": "sentence",
-                "data": json.dumps({
-                    "type": "sentence",
-                    "text": sent,
-                    "audio": os.path.basename(audio),
-                    "words": word_audios,
-                }),
-            }
-            done += 1
-            yield {"event": "progress", "data": str(done / total)}
-
-        for direc, audio_task in direction_tasks:
-            audio = await audio_task
-            yield {
-                "event": "direction",
-                "data": json.dumps({
-                    "type": "direction",
-                    "text": direc,
-                    "audio": os.path.basename(audio),
-                }),
-            }
-            done += 1
-            yield {"event": "progress", "data": str(done / total)}
-
-        yield {"event": "complete", "data": "ok"}
+        try:
+            while total is None or done < total:
+                ev = await events.get()
+                if ev is None:
+                    try:
+                        section = section_task.result()
+                        sentences = section["sentences"]
+                        directions = section["directions"]
+                    except Exception as exc:
+                        console.print(f"[red]Model output parsing failed: {exc}[/red]")
+                        yield {"event": "error", "data": "Model gaf geen geldig JSON"}
+                        return
+                    for idx, sent in enumerate(sentences):
+                        _start("sentence", idx, sent)
+                    for idx, direc in enumerate(directions):
+                        _start("direction", idx, direc)
+                    total = len(sentences) + len(directions)
+                    _schedule_prefetch(
+                        student_id or "",
+                        payload,
+                        " ".join(x for x in [story or "", *sentences] if x),
+                        directions,
+                    )
+                    continue
+                yield ev
+                done += 1
+                yield {"event": "progress", "data": str(done / max(total or expected, done))}
+
+            yield {"event": "complete", "data": "ok"}
+        finally:
+            for task in pending:
+                task.cancel()
 
     return EventSourceResponse(event_stream())
 
@@ -0,0 +1,242 @@
+"""Priority scheduling of outbound LLM and TTS requests.
+
+Tutor feedback, story and word generation, story prefetching and TTS
+pre-generation share the same provider rate limits.  Every request takes a
+slot in the lane of its provider first; a lane admits requests in priority
+order, at most ``concurrency`` at a time and no faster than its token bucket
+(``rate`` requests per second with bursts of ``burst``) allows.  A child
+waiting for feedback is therefore served before a class-wide story start or
+a prefetch.
+
+The priority of a request comes from the context (:func:`priority`), so it
+carries over into ``asyncio.to_thread`` workers and tasks created inside the
+block.  Lanes are thread-safe: TTS runs in worker threads and uses
+:meth:`Lane.slot_sync`.
+"""
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List
+
+from . import config
+
+
+class Priority(IntEnum):
+    FEEDBACK = 0  # tutor feedback (and its audio) a child is waiting for
+    INTERACTIVE = 1  # story sections, words and TTS requested right now
+    PREFETCH = 2  # speculative story continuations
+    PREGENERATE = 3  # asset packs, warm-up
+
+
+_priority: ContextVar[Priority] = ContextVar("outbound_priority", default=Priority.INTERACTIVE)
+
+
+@contextmanager
+def priority(level: Priority) -> Iterator[None]:
+    """Run the requests made inside the block with priority ``level``."""
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class _Waiter:
+    __slots__ = ("priority", "seq", "wake", "admitted", "cancelled", "enqueued")
+
+    def __init__(self, priority: Priority, seq: int, wake: Callable[[], None]) -> None:
+        self.priority = priority
+        self.seq = seq
+        self.wake = wake
+        self.admitted = False
+        self.cancelled = False
+        self.enqueued = time.monotonic()
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class Lane:
+    """Concurrency limit plus token bucket for one provider."""
+
+    def __init__(self, name: str, concurrency: int, rate: float, burst: float) -> None:
+        self.name = name
+        self.concurrency = concurrency
+        self.rate = rate
+        self.burst = burst
+        self._lock = threading.Lock()
+        self._heap: List[_Waiter] = []
+        self._seq = itertools.count()
+        self._active = 0
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._timer: threading.Timer | None = None
+        self._waits: Dict[Priority, deque] = {p: deque(maxlen=500) for p in Priority}
+        self.stats: Dict[Priority, Dict[str, float]] = {
+            p: {"requests": 0, "queued": 0, "wait_seconds": 0.0, "max_wait": 0.0}
+            for p in Priority
+        }
+
+    def _dispatch(self) -> float | None:
+        """Admit waiters in priority order.
+
+        Returns the seconds until the bucket has a token again when a waiter
+        is still blocked by the rate limit, else ``None``.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self.rate > 0:
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            while self._heap and self._active < self.concurrency:
+                if self._heap[0].cancelled:
+                    heapq.heappop(self._heap)
+                    continue
+                if self.rate > 0 and self._tokens < 1.0:
+                    delay = (1.0 - self._tokens) / self.rate
+                    self._arm(delay)
+                    return delay
+                w = heapq.heappop(self._heap)
+                if self.rate > 0:
+                    self._tokens -= 1.0
+                self._active += 1
+                w.admitted = True
+                self._record(w, now)
+                w.wake()
+            return None
+
+    def _arm(self, delay: float) -> None:
+        """Dispatch again once the bucket has refilled (lock held).
+
+        Waiters blocked on concurrency wait without a timeout, so when a
+        release finds the bucket empty nobody else would admit them.
+        """
+        if self._timer is not None:
+            return
+        self._timer = threading.Timer(delay, self._redispatch)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _redispatch(self) -> None:
+        with self._lock:
+            self._timer = None
+        self._dispatch()
+
+    def _record(self, w: _Waiter, now: float) -> None:
+        waited = now - w.enqueued
+        st = self.stats[w.priority]
+        st["requests"] += 1
+        st["wait_seconds"] += waited
+        st["max_wait"] = max(st["max_wait"], waited)
+        if waited > 0.001:
+            st["queued"] += 1
+        self._waits[w.priority].append(waited)
+
+    def _enqueue(self, wake: Callable[[], None]) -> _Waiter:
+        w = _Waiter(_priority.get(), next(self._seq), wake)
+        with self._lock:
+            heapq.heappush(self._heap, w)
+        return w
+
+    def _release(self) -> None:
+        with self._lock:
+            self._active -= 1
+        self._dispatch()
+
+    def _abandon(self, w: _Waiter) -> None:
+        with self._lock:
+            admitted = w.admitted
+            w.cancelled = True
+        if admitted:
+            self._release()
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold one request slot of this lane (async callers)."""
+        loop = asyncio.get_running_loop()
+        admitted = loop.create_future()
+
+        def _wake() -> None:
+            loop.call_soon_threadsafe(
+                lambda: admitted.done() or admitted.set_result(None)
+            )
+
+        w = self._enqueue(_wake)
+        try:
+            while True:
+                delay = self._dispatch()
+                if w.admitted:
+                    break
+                try:
+                    await asyncio.wait_for(asyncio.shield(admitted), delay)
+                except asyncio.TimeoutError:
+                    continue
+        except BaseException:
+            self._abandon(w)
+            raise
+        try:
+            yield
+        finally:
+            self._release()
+
+    @contextmanager
+    def slot_sync(self) -> Iterator[None]:
+        """Hold one request slot of this lane (worker threads)."""
+        event = threading.Event()
+        w = self._enqueue(event.set)
+        try:
+            while True:
+                delay = self._dispatch()
+                if w.admitted:
+                    break
+                event.wait(delay)
+        except BaseException:
+            self._abandon(w)
+            raise
+        try:
+            yield
+        finally:
+            self._release()
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            out: Dict[str, Any] = {
+                "active": self._active,
+                "waiting": sum(1 for w in self._heap if not w.cancelled),
+            }
+            for p, st in self.stats.items():
+                waits = sorted(self._waits[p])
+                n = st["requests"]
+                out[p.name.lower()] = {
+                    **st,
+                    "wait_seconds": round(st["wait_seconds"], 3),
+                    "max_wait": round(st["max_wait"], 3),
+                    "avg_wait": round(st["wait_seconds"] / n, 3) if n else None,
+                    "p95_wait": (
+                        round(waits[min(len(waits) - 1, int(0.95 * len(waits)))], 3)
+                        if waits
+                        else None
+                    ),
+                }
+            return out
+
+
+lanes: Dict[str, Lane] = {
+    name: Lane(name, **limits) for name, limits in config.OUTBOUND_LIMITS.items()
+}
+
+
+def lane(name: str) -> Lane:
+    return lanes[name]
+
+
+def metrics() -> Dict[str, Any]:
+    return {name: ln.metrics() for name, ln in lanes.items()}
@@ -0,0 +1,148 @@
+"""Write-behind persistence of analysed recordings.
+
+The feedback endpoints only need GPT's answer and the feedback audio before
+they can respond.  Moving the recorded WAV into :data:`storage.STORAGE_DIR`
+and inserting the result row are handed to :data:`writer`, which performs
+them on a worker thread after the response was sent and retries transient
+failures.
+"""
+from __future__ import annotations
+
+import asyncio
+import copy
+import shutil
+import sqlite3
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict
+
+from rich.console import Console
+
+from . import config, storage
+
+console = Console()
+
+
+@dataclass
+class PersistJob:
+    """Everything needed to store one result outside the request."""
+
+    teacher_id: int
+    student_id: int
+    results: Dict[str, Any]
+    request: Any  # ``TutorRequest``; serialised lazily on the worker
+    attempts: int = 0
+
+
+def _persist(job: PersistJob) -> None:
+    """Move the recording into storage and insert the result row.
+
+    Safe to call again after a partial failure: an already moved file or an
+    already inserted row is treated as done.
+    """
+    results = job.results
+    src = results.get("audio_file")
+    dest_audio = storage.STORAGE_DIR / f"{results['session_id']}.wav"
+    if src and Path(src).exists() and not dest_audio.exists():
+        shutil.move(src, dest_audio)
+    prompt_json = job.request.model_dump_json() if job.request is not None else "{}"
+    try:
+        storage.save_result(
+            job.teacher_id,
+            job.student_id,
+            results,
+            str(dest_audio),
+            prompt_json,
+        )
+    except sqlite3.IntegrityError:
+        # Row was written by an earlier attempt.
+        pass
+
+
+class WriteBehindQueue:
+    """Single background worker draining :class:`PersistJob` objects."""
+
+    def __init__(
+        self,
+        max_retries: int = config.PERSIST_MAX_RETRIES,
+        retry_delay: float = config.PERSIST_RETRY_DELAY,
+    ) -> None:
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self._queue: asyncio.Queue[PersistJob] | None = None
+        self._worker: asyncio.Task | None = None
+        self._retries: set[asyncio.Task] = set()
+        self.stats = {"submitted": 0, "written": 0, "retried": 0, "failed": 0}
+
+    def start(self) -> None:
+        """Create the queue and worker task on the running event loop."""
+        if self._worker is not None and not self._worker.done():
+            return
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._run(), name="write-behind")
+
+    def submit(self, teacher_id: int, student_id: int, results: Dict[str, Any], request: Any) -> None:
+        """Queue ``results`` for persistence.
+
+        ``results`` is copied because realtime sessions reuse and clear their
+        results dict on the next ``/start``.
+        """
+        self.start()
+        job = PersistJob(teacher_id, student_id, copy.deepcopy(results), request)
+        self.stats["submitted"] += 1
+        self._queue.put_nowait(job)
+
+    async def _run(self) -> None:
+        assert self._queue is not None
+        while True:
+            job = await self._queue.get()
+            retrying = False
+            try:
+                await asyncio.to_thread(_persist, job)
+                self.stats["written"] += 1
+            except Exception as exc:
+                job.attempts += 1
+                if job.attempts > self.max_retries:
+                    self.stats["failed"] += 1
+                    console.log(
+                        f"[red][persist] giving up on {job.results.get('session_id')}: {exc}[/red]"
+                    )
+                else:
+                    self.stats["retried"] += 1
+                    console.log(
+                        f"[yellow][persist] retry {job.attempts} for {job.results.get('session_id')}: {exc}[/yellow]"
+                    )
+                    # Wait out the delay off the worker so later jobs keep
+                    # flowing; ``task_done`` follows the requeue.
+                    retrying = True
+                    task = asyncio.create_task(self._retry_later(job))
+                    self._retries.add(task)
+                    task.add_done_callback(self._retries.discard)
+            finally:
+                if not retrying:
+                    self._queue.task_done()
+
+    async def _retry_later(self, job: PersistJob) -> None:
+        assert self._queue is not None
+        try:
+            await asyncio.sleep(self.retry_delay * job.attempts)
+            # Requeue before ``task_done`` so ``drain`` keeps waiting.
+            self._queue.put_nowait(job)
+        finally:
+            self._queue.task_done()
+
+    async def drain(self, timeout: float = 10.0) -> None:
+        """Wait for queued jobs to finish, then stop the worker."""
+        if self._queue is None or self._worker is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            console.log(f"[red][persist] {self._queue.qsize()} jobs left unwritten[/red]")
+        self._worker.cancel()
+        self._worker = None
+        for task in list(self._retries):
+            task.cancel()
+
+
+writer = WriteBehindQueue()
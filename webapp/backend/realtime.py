@@ -4,16 +4,13 @@ import wave
 import tempfile
 import time
 import json
-import queue
-import threading
 from time import perf_counter_ns
 from typing import Dict, Any
 
 import numpy as np
-from FASE2_wav2vec2_process import Wav2Vec2PhonemeExtractor, Wav2Vec2Transcriber
-from FASE2_azure_process import AzurePronunciationEvaluator, AzurePlainTranscriber
 from rich.console import Console
-from . import config, analysis_pipeline
+from . import config, analysis_pipeline, azure_pool
+import engines
 import prompt_builder
 
 console = Console()
@@ -42,7 +39,8 @@ class RealtimeSession:
 
     A ``RealtimeSession`` instance is intended to be reused for multiple
     recordings.  Heavy recogniser objects are created once and a lightweight
-    :py:meth:`reset` prepares the session for a new recording.
+    :py:meth:`reset` prepares the session for a new recording.  Which engines
+    run, and how, comes from the registry in ``engines.py``.
     """
 
     def __init__(
@@ -64,10 +62,14 @@ class RealtimeSession:
 
         self.timeline = timeline or Timeline()
 
-        self.phon_q = queue.Queue()
-        self.asr_q = queue.Queue()
-        self.azure_pron_q = None
-        self.azure_plain_q = None
+        self.ctx = engines.EngineContext(
+            sample_rate=sample_rate,
+            chunk_duration=config.CHUNK_DURATION,
+            push_stream=config.AZURE_PUSH_STREAM,
+            async_start=config.KEEP_AZURE_RUNNING,
+        )
+        self.plans: Dict[str, engines.Plan] = {}
+        self.engines: Dict[str, engines.Engine] = {}
 
         self.results: Dict[str, Any] = {}
         self._prompt_dump = None
@@ -92,9 +94,6 @@ class RealtimeSession:
         timeline: Timeline | None = None,
     ) -> None:
         """Prepare the session for a new recording."""
-        console.log(
-            f"[reset] ASR thread alive before reset? {getattr(self, 'asr_thread', None) is not None and self.asr_thread.is_alive()}"
-        )
         self.id = str(uuid.uuid4())
         self.last_used = time.time()
         self.sentence = sentence
@@ -105,17 +104,6 @@ class RealtimeSession:
 
         self.timeline = timeline or Timeline()
 
-        rt = config.REALTIME_FLAGS
-        self.phon_q = queue.Queue()
-        self.asr_q = queue.Queue()
-        self.azure_pron_q = queue.Queue() if config.AZURE_PUSH_STREAM and rt.get("azure_pron", True) else None
-        self.azure_plain_q = queue.Queue() if config.AZURE_PUSH_STREAM and rt.get("azure_plain", True) else None
-
-        if getattr(self, "phon_thread", None) is not None:
-            self.phon_thread.on_new_recording(self.phon_q)
-        if getattr(self, "asr_thread", None) is not None:
-            self.asr_thread.on_new_recording(self.asr_q)
-
         self.results.clear()
         self.results.update(
             {
@@ -141,23 +129,8 @@ class RealtimeSession:
         )
 
         self._init_engines()
-
-        if self.azure_pron is not None and self.azure_pron_q is not None:
-            self.azure_pron.update_reference_text(sentence)
-            self.azure_pron.reset_stream(self.azure_pron_q, self.sample_rate)
-        if self.azure_plain is not None and self.azure_plain_q is not None:
-            self.azure_plain.reset_stream(self.azure_plain_q, self.sample_rate)
-
-        sid = self.results["session_id"]
-        if self.azure_pron:
-            self.azure_pron.begin_turn(sid, self.results)
-        if self.azure_plain:
-            self.azure_plain.begin_turn(sid, self.results)
-
-        if getattr(self, "phon_thread", None) is not None:
-            self.phon_thread.results = self.results
-        if getattr(self, "asr_thread", None) is not None:
-            self.asr_thread.results = self.results
+        if self.plans["azure_plain"].mode == "derived":
+            self.results["metadata"]["azure_plain_source"] = "pronunciation"
 
         tmp = tempfile.NamedTemporaryFile(suffix=".wav", delete=False)
         self.wav_path = tmp.name
@@ -167,97 +140,27 @@ class RealtimeSession:
         self.wavefile.setsampwidth(2)
         self.wavefile.setframerate(self.sample_rate)
         self.chunk_count = 0
+        self.samples = 0
 
-        if config.KEEP_AZURE_RUNNING:
-            if (
-                (self.azure_pron and not self.azure_pron._running)
-                or (self.azure_plain and not self.azure_plain._running)
-            ):
-                self._ensure_azure_running_async()
-        else:
-            if self.azure_pron:
-                self.azure_pron.start_if_needed()
-            if self.azure_plain:
-                self.azure_plain.start_if_needed()
+        for engine in self.engines.values():
+            engine.start(self.results, self.id)
 
-        console.log(
-            f"[reset] ASR thread alive after init? {getattr(self, 'asr_thread', None) is not None and self.asr_thread.is_alive()}"
-        )
         if self.timeline:
             self.timeline.mark("engine_reset_done")
 
     def _init_engines(self) -> None:
-        """Create or restart recogniser engines."""
-        rt = config.REALTIME_FLAGS
-
-        if getattr(self, "phon_thread", None) is None or not self.phon_thread.is_alive():
-            self.phon_thread = Wav2Vec2PhonemeExtractor(
-                sample_rate=self.sample_rate,
-                chunk_duration=config.CHUNK_DURATION,
-                results=self.results,
-                realtime=rt.get("w2v2_phonemes", True),
-                audio_queue=self.phon_q,
-                timeline=self.timeline,
-            )
-            if self.phon_thread.realtime:
-                self.phon_thread.start()
-                if self.timeline:
-                    self.timeline.mark("w2v2_ready_ph")
-        else:
-            if self.timeline:
-                self.timeline.mark("w2v2_ready_ph")
-
-        if getattr(self, "asr_thread", None) is None or not self.asr_thread.is_alive():
-            self.asr_thread = Wav2Vec2Transcriber(
-                sample_rate=self.sample_rate,
-                chunk_duration=config.CHUNK_DURATION,
-                results=self.results,
-                realtime=rt.get("w2v2_asr", True),
-                audio_queue=self.asr_q,
-                timeline=self.timeline,
-            )
-            if self.asr_thread.realtime:
-                self.asr_thread.start()
-                if self.timeline:
-                    self.timeline.mark("w2v2_ready_asr")
-        else:
-            if self.timeline:
-                self.timeline.mark("w2v2_ready_asr")
-
-        if self.azure_pron_q is not None:
-            if getattr(self, "azure_pron", None) is None:
-                self.azure_pron = AzurePronunciationEvaluator(
-                    self.sentence,
-                    results=self.results,
-                    realtime=rt.get("azure_pron", True),
-                    audio_queue=self.azure_pron_q,
-                    sample_rate=self.sample_rate,
-                    timeline=self.timeline,
-                )
-
-        if self.azure_plain_q is not None:
-            if getattr(self, "azure_plain", None) is None:
-                self.azure_plain = AzurePlainTranscriber(
-                    results=self.results,
-                    realtime=rt.get("azure_plain", True),
-                    audio_queue=self.azure_plain_q,
-                    sample_rate=self.sample_rate,
-                    timeline=self.timeline,
-                )
-
-    def _ensure_azure_running_async(self) -> None:
-        def _run():
-            if self.timeline:
-                self.timeline.mark("azure_start_called")
-            try:
-                if self.azure_pron:
-                    self.azure_pron.start_if_needed()
-                if self.azure_plain:
-                    self.azure_plain.start_if_needed()
-            finally:
-                if self.timeline:
-                    self.timeline.mark("azure_start_returned")
-        threading.Thread(target=_run, daemon=True, name="azure-start").start()
+        """Plan the engines for this recording; create or reuse their adapters."""
+        if self.ctx.sample_rate != self.sample_rate:
+            for engine in self.engines.values():
+                engine.shutdown()
+            self.engines = {}
+        self.ctx.sample_rate = self.sample_rate
+        self.ctx.timeline = self.timeline
+        self.ctx.lease = azure_pool.pool.borrow if azure_pool.enabled() else None
+        self.plans = engines.scheduler.plan(
+            config.ENGINES, realtime=True, derive=not config.AZURE_PLAIN_PASS
+        )
+        self.engines = engines.build(self.plans, self.ctx, self.engines)
 
     @property
     def idle_seconds(self) -> float:
@@ -265,96 +168,44 @@ class RealtimeSession:
 
     def shutdown(self) -> None:
         """Terminate all recogniser threads and wait for them to finish."""
-        try:
-            if getattr(self, "phon_thread", None) is not None:
-                self.phon_thread.terminate()
-                self.phon_thread.join()
-        except Exception:
-            pass
-        try:
-            if getattr(self, "asr_thread", None) is not None:
-                self.asr_thread.terminate()
-                self.asr_thread.join()
-        except Exception:
-            pass
-        try:
-            self.azure_pron.stop()
-        except Exception:
-            pass
-        try:
-            self.azure_plain.stop()
-        except Exception:
-            pass
+        for engine in self.engines.values():
+            try:
+                engine.shutdown()
+            except Exception:
+                pass
 
     def add_chunk(self, pcm_data: bytes):
         """Add a chunk of 16‑bit mono PCM data."""
         arr = np.frombuffer(pcm_data, dtype=np.int16)
         self.chunk_count += 1
+        self.samples += arr.size
         if self.chunk_count == 1 and self.timeline:
             self.timeline.mark("first_chunk_received")
         if DEBUG_CHUNKS:
             console.log(f"received chunk {self.chunk_count} of {len(pcm_data)} bytes")
-        # Fan out chunk to all engine queues
-        self.phon_q.put(arr)
-        self.asr_q.put(arr)
-        if self.azure_pron_q is not None:
-            self.azure_pron_q.put(arr)
-        if self.azure_plain_q is not None:
-            self.azure_plain_q.put(arr)
+        # Fan out chunk to all realtime engines
+        for engine in self.engines.values():
+            engine.feed(arr)
         self.wavefile.writeframes(pcm_data)
 
     def stop(self) -> Dict[str, Any]:
         """Finalize processing and return results."""
-        # Mark end of the current recording for each engine.  The W2V2 threads
-        # remain alive, so we only enqueue ``None`` to signal a boundary.
-        self.phon_q.put(None)
-        self.asr_q.put(None)
-        if self.azure_pron_q is not None:
-            self.azure_pron_q.put(None)
-        if self.azure_plain_q is not None:
-            self.azure_plain_q.put(None)
-
-        if getattr(self, "phon_thread", None) is not None and self.phon_thread.realtime:
-            self.phon_thread.eor_event.wait()
-        if getattr(self, "asr_thread", None) is not None and self.asr_thread.realtime:
-            self.asr_thread.eor_event.wait()
-
         self.wavefile.close()
 
-        # Offline modes still run synchronously on the recorded file.
-        if not self.phon_thread.realtime:
-            self.phon_thread.process_file(self.wav_path)
-
-        if not self.asr_thread.realtime:
-            self.asr_thread.process_file(self.wav_path)
-
-        if self.azure_pron and self.azure_pron._feed_thread:
-            self.azure_pron._feed_thread.join()
-        if self.azure_plain and self.azure_plain._feed_thread:
-            self.azure_plain._feed_thread.join()
-
-        got_pron = True
-        got_plain = True
-        if self.azure_pron.realtime:
-            got_pron = self.azure_pron.wait_for_final(timeout=1.0)
-        else:
-            self.azure_pron.process_file(self.wav_path)
-        if self.azure_plain.realtime:
-            got_plain = self.azure_plain.wait_for_final(timeout=1.0)
-        else:
-            self.azure_plain.process_file(self.wav_path)
-
-        if self.azure_pron.realtime and not got_pron:
-            self.azure_pron.stop_if_needed()
-            self.azure_pron._done_event.wait(timeout=1.0)
-        if self.azure_plain.realtime and not got_plain:
-            self.azure_plain.stop_if_needed()
-            self.azure_plain._done_event.wait(timeout=1.0)
-
-        if self.azure_pron:
-            self.azure_pron.end_turn()
-        if self.azure_plain:
-            self.azure_plain.end_turn()
+        # Realtime engines flush and hand in their last result, offline ones
+        # run on the recorded file; each is given up on at its deadline.
+        report = engines.scheduler.finalize(
+            self.plans,
+            self.engines,
+            self.results,
+            wav_path=self.wav_path,
+            audio_seconds=self.samples / self.sample_rate,
+            parallel=config.PARALLEL_OFFLINE,
+        )
+        self.results["timing"] = {"engines": report}
+        late = [name for name, entry in report.items() if entry["status"] in ("timeout", "error")]
+        if late:
+            console.log(f"[engines] no result in time from {', '.join(late)}")
 
         console.log(
             f"wrote {self.chunk_count} chunks totalling {os.path.getsize(self.wav_path)} bytes"
@@ -362,14 +213,16 @@ class RealtimeSession:
         self.results["end_time"] = time.time()
         self.last_used = self.results["end_time"]
 
-        req, messages = prompt_builder.build(self.results, state={})
-
-        # Build once, but do not print here.
-        json_str = req.model_dump_json(indent=2)
-
-        # Only stash if debug is requested (don’t bloat memory by default)
+        # Only build and stash the prompt if debug is requested (the /stop
+        # endpoint builds the real one; don’t pay for it twice by default)
         self._prompt_dump = None
         if os.getenv("DEBUG_PROMPT", "0") == "1":
-            self._prompt_dump = (messages[0]["content"], json_str)
+            req, messages = prompt_builder.build(
+                self.results,
+                state={},
+                compact=config.TUTOR_PROMPT_COMPACT,
+                local_errors=config.LOCAL_ERROR_DETAILS,
+            )
+            self._prompt_dump = (messages[0]["content"], req.model_dump_json(indent=2))
 
         return self.results
@@ -0,0 +1,110 @@
+"""Story sections shared across students.
+
+Classes tend to walk through the same theme, level and direction choices, so
+identical generation requests are common.  :class:`StoryCache` keeps up to
+``variants`` sections per normalized request (see
+:func:`story_prefetch.story_key`) and serves a random one once that many
+exist, so stories still vary.  Concurrent identical requests share a single
+GPT call.
+"""
+from __future__ import annotations
+
+import asyncio
+import copy
+import random
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List
+
+from . import config
+
+
+@dataclass
+class _Entry:
+    created: float = field(default_factory=time.monotonic)
+    variants: List[Dict[str, Any]] = field(default_factory=list)
+
+
+class StoryCache:
+    """LRU map of request key to cached story-section variants."""
+
+    def __init__(
+        self,
+        variants: int = config.STORY_CACHE_VARIANTS,
+        ttl: float = config.STORY_CACHE_TTL,
+        max_keys: int = config.STORY_CACHE_MAX_KEYS,
+    ) -> None:
+        self.variants = variants
+        self.ttl = ttl
+        self.max_keys = max_keys
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.stats = {"hits": 0, "misses": 0, "coalesced": 0}
+
+    def _entry(self, key: str) -> _Entry | None:
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() - entry.created > self.ttl:
+            del self._entries[key]
+            entry = None
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def _store(self, key: str, section: Dict[str, Any]) -> None:
+        if not section.get("sentences") or not section.get("directions"):
+            return  # never cache malformed output
+        entry = self._entry(key)
+        if entry is None:
+            entry = self._entries[key] = _Entry()
+        entry.variants.append(copy.deepcopy(section))
+        while len(self._entries) > self.max_keys:
+            self._entries.popitem(last=False)
+
+    async def get(
+        self, key: str, produce: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """Return a section for ``key``, calling ``produce`` when needed."""
+        entry = self._entry(key)
+        if entry is not None and len(entry.variants) >= self.variants:
+            self.stats["hits"] += 1
+            return copy.deepcopy(random.choice(entry.variants))
+
+        while (fut := self._inflight.get(key)) is not None:
+            try:
+                section = await asyncio.shield(fut)
+            except asyncio.CancelledError:
+                if not fut.cancelled():
+                    raise  # this caller was cancelled
+                continue  # leader (e.g. a dropped prefetch) was cancelled
+            self.stats["coalesced"] += 1
+            return copy.deepcopy(section)
+
+        self.stats["misses"] += 1
+        fut = asyncio.get_running_loop().create_future()
+        self._inflight[key] = fut
+        try:
+            section = await produce()
+        except asyncio.CancelledError:
+            fut.cancel()
+            raise
+        except Exception as exc:
+            fut.set_exception(exc)
+            fut.exception()  # mark retrieved when nobody else was waiting
+            raise
+        else:
+            self._store(key, section)
+            fut.set_result(section)
+            return section
+        finally:
+            self._inflight.pop(key, None)
+
+    def metrics(self) -> Dict[str, Any]:
+        lookups = sum(self.stats.values())
+        return {
+            **self.stats,
+            "keys": len(self._entries),
+            "hit_rate": round(
+                (self.stats["hits"] + self.stats["coalesced"]) / lookups, 3
+            ) if lookups else None,
+        }
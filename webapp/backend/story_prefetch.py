@@ -0,0 +1,131 @@
+"""Speculative generation of the story continuations a child can choose.
+
+While the child reads a section ending in two directions, both continuations
+are generated and synthesized in the background.  When the child picks one,
+``/api/continue_story`` takes the finished (or still running) branch and the
+other branch of the same choice is cancelled.  Branches belong to one
+session (the student), so two children reading the same story never take or
+cancel each other's branches.  Entries expire after
+``config.STORY_PREFETCH_TTL`` seconds.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterable, Tuple
+
+from rich.console import Console
+
+from . import config
+
+console = Console()
+
+
+def story_key(
+    theme: str | None,
+    level: str,
+    direction: str,
+    story: str | None,
+    focus: Iterable[str],
+    allowed: Iterable[str],
+    patterns: Iterable[str],
+    max_words: int | None,
+    strict_forbid: bool,
+) -> str:
+    """Normalized identity of a story-generation request."""
+
+    def _clean(items: Iterable[str]) -> list[str]:
+        return [x.strip() for x in items if x and x.strip()]
+
+    return json.dumps(
+        [
+            (theme or "").strip(),
+            level.strip().lower(),
+            direction.strip(),
+            " ".join((story or "").split()),
+            _clean(focus),
+            _clean(allowed),
+            _clean(patterns),
+            max_words or 7,
+            bool(strict_forbid),
+        ],
+        ensure_ascii=False,
+    )
+
+
+@dataclass
+class _Branch:
+    task: asyncio.Task
+    created: float
+    group: str
+
+
+class StoryPrefetcher:
+    """Per-session, per-choice cache of speculatively generated story sections."""
+
+    def __init__(self, ttl: float = config.STORY_PREFETCH_TTL, max_branches: int = 200) -> None:
+        self.ttl = ttl
+        self.max_branches = max_branches
+        # Keyed by ``(session, story_key)``
+        self._branches: Dict[Tuple[str, str], _Branch] = {}
+        self.stats = {"scheduled": 0, "hits": 0, "misses": 0, "cancelled": 0, "expired": 0}
+
+    def _drop(self, key: Tuple[str, str], stat: str) -> None:
+        branch = self._branches.pop(key, None)
+        if branch is not None:
+            if not branch.task.done():
+                branch.task.cancel()
+            self.stats[stat] += 1
+
+    def _expire(self) -> None:
+        now = time.monotonic()
+        for key, branch in list(self._branches.items()):
+            if now - branch.created > self.ttl:
+                self._drop(key, "expired")
+
+    def schedule(
+        self, session: str, branches: Dict[str, Callable[[], Awaitable[Dict[str, Any]]]]
+    ) -> None:
+        """Start every sibling branch of one choice of ``session``, keyed by request key."""
+        self._expire()
+        group = f"{session}:{uuid.uuid4().hex}"
+        for story, produce in branches.items():
+            key = (session, story)
+            if key in self._branches or len(self._branches) >= self.max_branches:
+                continue
+            task = asyncio.create_task(produce())
+            task.add_done_callback(_log_failure)
+            self._branches[key] = _Branch(task, time.monotonic(), group)
+            self.stats["scheduled"] += 1
+
+    async def take(self, session: str, key: str) -> Dict[str, Any] | None:
+        """Return the section prefetched for ``session`` and ``key`` or ``None``.
+
+        Sibling branches of the same choice are cancelled.
+        """
+        self._expire()
+        branch = self._branches.pop((session, key), None)
+        if branch is None:
+            self.stats["misses"] += 1
+            return None
+        for other, b in list(self._branches.items()):
+            if b.group == branch.group:
+                self._drop(other, "cancelled")
+        try:
+            section = await branch.task
+        except (asyncio.CancelledError, Exception):
+            self.stats["misses"] += 1
+            return None
+        self.stats["hits"] += 1
+        return section
+
+    def metrics(self) -> Dict[str, Any]:
+        return {**self.stats, "pending": len(self._branches)}
+
+
+def _log_failure(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        console.log(f"[yellow][prefetch] branch failed: {task.exception()}[/yellow]")
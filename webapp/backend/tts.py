@@ -1,26 +1,38 @@
 """Helpers to generate TTS audio files using OpenAI."""
-import os
 import re
-import tempfile
+import threading
 
-import openai
+from . import clients, config, outbound, storage
+from .tts_cache import SingleFlight, TTSCache, atomic_write, cache_key
 
-from . import config, storage
-
-openai.api_key = openai.api_key or None  # use env var
-openai.api_type = "openai"  # TTS should always use the standard OpenAI API
+# TTS always uses the standard OpenAI API through the shared connection pool
+# (see ``clients.openai_sync``), regardless of the tutor GPT provider.
 
 # Directory for caching word-level TTS files
 WORD_CACHE_DIR = storage.STORAGE_DIR / "words"
 WORD_CACHE_DIR.mkdir(parents=True, exist_ok=True)
 
+# In-memory index of ``WORD_CACHE_DIR`` so lookups don't hit the filesystem,
+# plus single-flight so repeated words in one story trigger one API call.
+_word_index: set[str] = set()
+_word_lock = threading.Lock()
+_word_flight = SingleFlight()
+word_stats = {"hits": 0, "misses": 0, "coalesced": 0}
 
-def tts_to_file(text: str, stream: bool = False) -> str:
-    """Generate speech and return path to WAV file."""
-    tmp = tempfile.NamedTemporaryFile(suffix=".wav", delete=False)
-    tmp_path = tmp.name
+# Content-addressed cache for sentence-level TTS
+TTS_CACHE_DIR = storage.STORAGE_DIR / "tts"
+sentence_cache = TTSCache(TTS_CACHE_DIR, config.TTS_CACHE_MAX_MB * 1024 * 1024)
+
+
+def _synthesize(text: str, stream: bool) -> bytes:
+    with outbound.lane("tts").slot_sync():
+        return _speech(text, stream)
+
+
+def _speech(text: str, stream: bool) -> bytes:
     if stream:
-        with openai.audio.speech.with_streaming_response.create(
+        chunks = []
+        with clients.openai_sync().audio.speech.with_streaming_response.create(
             model=config.VOICE_MODEL,
             voice=config.VOICE_NAME,
             input=text,
@@ -28,35 +40,66 @@ def tts_to_file(text: str, stream: bool = False) -> str:
             response_format="wav",
         ) as resp:
             for chunk in resp.iter_bytes():
-                tmp.write(chunk)
-    else:
-        resp = openai.audio.speech.create(
-            model=config.VOICE_MODEL,
-            voice=config.VOICE_NAME,
-            input=text,
-            instructions=config.VOICE_INSTRUCTIONS,
-            response_format="wav",
-        )
-        tmp.write(resp.content)
-    tmp.flush()
-    tmp.close()
-    return tmp_path
+                chunks.append(chunk)
+        return b"".join(chunks)
+    resp = clients.openai_sync().audio.speech.create(
+        model=config.VOICE_MODEL,
+        voice=config.VOICE_NAME,
+        input=text,
+        instructions=config.VOICE_INSTRUCTIONS,
+        response_format="wav",
+    )
+    return resp.content
+
+
+def tts_to_file(text: str, stream: bool = False) -> str:
+    """Return path to a WAV file with ``text`` spoken by the tutor voice.
+
+    Results are cached by text and voice settings, so repeated sentences and
+    feedback phrases are synthesized once.  The returned file belongs to the
+    cache: copy it rather than moving it.
+    """
+    key = cache_key(text, config.VOICE_MODEL, config.VOICE_NAME, config.VOICE_INSTRUCTIONS)
+    return sentence_cache.get_or_create(key, lambda: _synthesize(text, stream))
+
+
+def load_word_index() -> None:
+    """(Re)load the names of all cached word files into memory."""
+    names = {p.name for p in WORD_CACHE_DIR.glob("*.wav")}
+    with _word_lock:
+        _word_index.clear()
+        _word_index.update(names)
 
 
 def word_tts_to_file(text: str) -> str:
     """Return path to cached word-level TTS, generating it if needed."""
     safe = re.sub(r"[^a-zA-Z0-9_-]", "_", text.lower())
-    path = WORD_CACHE_DIR / f"{safe}.wav"
-    if path.exists():
+    name = f"{safe}.wav"
+    path = WORD_CACHE_DIR / name
+    with _word_lock:
+        cached = name in _word_index
+        if cached:
+            word_stats["hits"] += 1
+    if cached:
         return str(path)
 
-    resp = openai.audio.speech.create(
-        model=config.WORD_VOICE_MODEL,
-        voice=config.VOICE_NAME,
-        input=text,
-        instructions=config.WORD_VOICE_INSTRUCTIONS,
-        response_format="wav",
-    )
-    with open(path, "wb") as f:
-        f.write(resp.content)
+    def _fill() -> None:
+        with outbound.lane("tts").slot_sync():
+            resp = clients.openai_sync().audio.speech.create(
+                model=config.WORD_VOICE_MODEL,
+                voice=config.VOICE_NAME,
+                input=text,
+                instructions=config.WORD_VOICE_INSTRUCTIONS,
+                response_format="wav",
+            )
+        atomic_write(path, resp.content)
+        with _word_lock:
+            _word_index.add(name)
+
+    _, shared = _word_flight.do(name, _fill)
+    with _word_lock:
+        word_stats["coalesced" if shared else "misses"] += 1
     return str(path)
+
+
+load_word_index()
@@ -0,0 +1,166 @@
+"""Content-addressed on-disk cache for synthesized speech.
+
+Files are named after a SHA-256 of the text and the voice settings, so the
+same sentence spoken with the same voice is synthesized only once for all
+students.  An in-memory index keeps the LRU order and total size, which lets
+lookups skip the filesystem and keeps the directory below a size budget.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Callable, Dict, Tuple
+
+
+class SingleFlight:
+    """Run at most one call per key; concurrent callers share its result."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Future] = {}
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Return ``(result, shared)``; ``shared`` is ``True`` for followers."""
+        with self._lock:
+            fut = self._calls.get(key)
+            leader = fut is None
+            if leader:
+                fut = Future()
+                self._calls[key] = fut
+        if not leader:
+            return fut.result(), True
+        try:
+            result = fn()
+            fut.set_result(result)
+            return result, False
+        except BaseException as exc:
+            fut.set_exception(exc)
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+
+def atomic_write(path: Path, data: bytes) -> None:
+    """Write ``data`` to ``path`` so readers never see a partial file."""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def cache_key(text: str, *settings: str) -> str:
+    """Hash ``text`` together with the voice ``settings``."""
+    h = hashlib.sha256()
+    for part in (text, *settings):
+        h.update((part or "").encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class TTSCache:
+    """Size-bounded LRU cache of WAV files with single-flight synthesis."""
+
+    def __init__(self, directory: Path, max_bytes: int) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._index: "OrderedDict[str, int]" = OrderedDict()
+        self._bytes = 0
+        self._flight = SingleFlight()
+        self.stats = {"hits": 0, "misses": 0, "coalesced": 0, "bytes_saved": 0, "evictions": 0}
+        self._load_index()
+
+    def _load_index(self) -> None:
+        """Rebuild the LRU order from file modification times."""
+        entries = []
+        for p in self.directory.glob("*.wav"):
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, p.stem, st.st_size))
+        for _, key, size in sorted(entries):
+            self._index[key] = size
+            self._bytes += size
+
+    def path_for(self, key: str) -> Path:
+        return self.directory / f"{key}.wav"
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._index
+
+    def get_or_create(self, key: str, synthesize: Callable[[], bytes]) -> str:
+        """Return the cached file for ``key``, calling ``synthesize`` on a miss."""
+        path = self.path_for(key)
+        with self._lock:
+            size = self._index.get(key)
+            if size is not None:
+                self._index.move_to_end(key)
+                self.stats["hits"] += 1
+                self.stats["bytes_saved"] += size
+        if size is not None:
+            try:
+                os.utime(path)  # keep LRU order across restarts
+            except OSError:
+                pass
+            return str(path)
+
+        def _fill() -> int:
+            data = synthesize()
+            atomic_write(path, data)
+            self.add(key, len(data))
+            return len(data)
+
+        size, shared = self._flight.do(key, _fill)
+        with self._lock:
+            if shared:
+                self.stats["coalesced"] += 1
+                self.stats["bytes_saved"] += size
+            else:
+                self.stats["misses"] += 1
+        return str(path)
+
+    def add(self, key: str, size: int) -> None:
+        """Register a file written to :meth:`path_for` outside the cache."""
+        with self._lock:
+            self._bytes += size - self._index.get(key, 0)
+            self._index[key] = size
+            self._index.move_to_end(key)
+            self._evict_locked()
+
+    def _evict_locked(self) -> None:
+        while self._bytes > self.max_bytes and len(self._index) > 1:
+            key, size = self._index.popitem(last=False)
+            self._bytes -= size
+            self.stats["evictions"] += 1
+            try:
+                self.path_for(key).unlink()
+            except OSError:
+                pass
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"] + self.stats["coalesced"]
+            served = self.stats["hits"] + self.stats["coalesced"]
+            return {
+                **self.stats,
+                "entries": len(self._index),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hit_rate": round(served / lookups, 3) if lookups else None,
+            }
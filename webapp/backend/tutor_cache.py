@@ -0,0 +1,197 @@
+"""Cache of tutor GPT answers keyed on the normalized prompt.
+
+With ``GPT_TEMPERATURE`` at 0 the same prompt gets the same answer, and
+children misread simple sentences in the same ways all the time.  The key is
+a hash of the ``prompt_builder`` messages with volatile fields removed
+(session and sentence ids, timestamps, the start and end times of words,
+interim transcripts) and scores rounded to ``TUTOR_CACHE_SCORE_STEP``; the
+words themselves, their scores and error types stay in the key.  Entries live in a bounded
+in-memory LRU backed by SQLite and expire after ``TUTOR_CACHE_TTL`` seconds.
+Hits are served from memory; SQLite is only read on a memory miss and both
+reads and writes run in worker threads, off the event loop.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+from tutor_schema import TutorResponse
+
+from . import config, storage
+
+DB_PATH = storage.STORAGE_DIR / "tutor_cache.db"
+
+# Dropped wherever they occur in the request payload.
+VOLATILE_KEYS = {
+    "session_id",
+    "sentence_id",
+    "timestamp",
+    "start_s",
+    "end_s",
+    "interim_transcripts",
+    "wav2vec2_phonemes_debug",
+    "wav2vec2_asr_debug",
+}
+
+
+def _normalize(value: Any, step: float) -> Any:
+    if isinstance(value, dict):
+        return {k: _normalize(v, step) for k, v in value.items() if k not in VOLATILE_KEYS}
+    if isinstance(value, list):
+        return [_normalize(v, step) for v in value]
+    if isinstance(value, float) and step:
+        return round(value / step) * step
+    if isinstance(value, str):
+        return " ".join(value.split())
+    return value
+
+
+def cache_key(messages: List[Dict[str, str]], step: float = config.TUTOR_CACHE_SCORE_STEP) -> str:
+    """Stable hash of ``messages`` without per-request noise."""
+    parts = []
+    for m in messages:
+        content = m.get("content", "")
+        if m.get("role") == "user":
+            try:
+                content = _normalize(json.loads(content), step)
+            except (TypeError, ValueError):
+                pass
+        parts.append([m.get("role"), content])
+    blob = json.dumps(
+        {
+            "model": config.GPT_MODEL,
+            "small_model": config.GPT_SMALL_MODEL if config.MODEL_ROUTING else None,
+            "temperature": config.GPT_TEMPERATURE,
+            "messages": parts,
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class TutorCache:
+    """LRU of ``TutorResponse`` objects with SQLite persistence and TTL."""
+
+    def __init__(
+        self,
+        max_entries: int = config.TUTOR_CACHE_MAX_ENTRIES,
+        ttl: float = config.TUTOR_CACHE_TTL,
+        db_path=DB_PATH,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        # Held only by worker threads, so slow disk I/O never blocks the loop
+        self._db_lock = threading.Lock()
+        self._mem: "OrderedDict[str, Tuple[float, TutorResponse]]" = OrderedDict()
+        self._conn: sqlite3.Connection | None = None
+        self._writes: set[asyncio.Task] = set()
+        self.stats = {"hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "expired": 0}
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS tutor_cache ("
+                "key TEXT PRIMARY KEY, response TEXT NOT NULL, created REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "DELETE FROM tutor_cache WHERE created < ?", (time.time() - self.ttl,)
+            )
+            self._conn.commit()
+        return self._conn
+
+    def _remember(self, key: str, created: float, resp: TutorResponse) -> None:
+        self._mem[key] = (created, resp)
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.max_entries:
+            self._mem.popitem(last=False)
+
+    def _load(self, key: str) -> Tuple[str, float] | None:
+        with self._db_lock:
+            return self._db().execute(
+                "SELECT response, created FROM tutor_cache WHERE key=?", (key,)
+            ).fetchone()
+
+    def _store(self, key: str, response: str, created: float) -> None:
+        with self._db_lock:
+            db = self._db()
+            db.execute(
+                "INSERT OR REPLACE INTO tutor_cache(key, response, created) VALUES (?,?,?)",
+                (key, response, created),
+            )
+            db.commit()
+
+    async def get(self, key: str) -> TutorResponse | None:
+        now = time.time()
+        with self._lock:
+            entry = self._mem.get(key)
+            if entry is not None and now - entry[0] <= self.ttl:
+                self._mem.move_to_end(key)
+                self.stats["hits"] += 1
+                return entry[1].model_copy(deep=True)
+            if entry is not None:
+                del self._mem[key]
+                self.stats["expired"] += 1
+        row = await asyncio.to_thread(self._load, key)
+        with self._lock:
+            if row is not None and now - row[1] <= self.ttl:
+                resp = TutorResponse.model_validate_json(row[0])
+                self._remember(key, row[1], resp)
+                self.stats["hits"] += 1
+                self.stats["disk_hits"] += 1
+                return resp.model_copy(deep=True)
+            self.stats["misses"] += 1
+            return None
+
+    def put(self, key: str, resp: TutorResponse) -> None:
+        """Remember ``resp`` now; the SQLite write happens in the background."""
+        now = time.time()
+        with self._lock:
+            self._remember(key, now, resp.model_copy(deep=True))
+            self.stats["stores"] += 1
+        task = asyncio.create_task(
+            asyncio.to_thread(self._store, key, resp.model_dump_json(by_alias=True), now)
+        )
+        self._writes.add(task)
+        task.add_done_callback(self._writes.discard)
+
+    async def chat(
+        self,
+        messages: List[Dict[str, str]],
+        call: Callable[[List[Dict[str, str]]], Awaitable[TutorResponse]],
+    ) -> TutorResponse:
+        """Cached answer for ``messages`` or ``await call(messages)``."""
+        if not enabled():
+            return await call(messages)
+        key = cache_key(messages)
+        resp = await self.get(key)
+        if resp is None:
+            resp = await call(messages)
+            self.put(key, resp)
+        return resp
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return {
+                **self.stats,
+                "entries": len(self._mem),
+                "hit_rate": round(self.stats["hits"] / lookups, 3) if lookups else None,
+            }
+
+
+def enabled() -> bool:
+    """Only deterministic (temperature 0) answers are worth caching."""
+    return config.TUTOR_CACHE and config.GPT_TEMPERATURE == 0
+
+
+cache = TutorCache()
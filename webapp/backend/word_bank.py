@@ -0,0 +1,111 @@
+"""Local bank of decodable Dutch practice words for ``/api/generate_words``.
+
+Words from ``data/word_bank.txt`` are segmented into graphemes once and
+grouped by their grapheme set and C/V pattern.  A query only has to test each
+distinct grapheme set against the allowed set, so a unit's word list comes
+back in well under a millisecond; GPT is only asked to top up when the bank
+has fewer matches than requested.  Only the graphemes filter; focus
+graphemes and word patterns (informative, as in the GPT prompt) rank.
+"""
+from __future__ import annotations
+
+import random
+import threading
+import time
+from collections import defaultdict
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, List
+
+from .graphemes import normalize_set, pattern, segment
+
+DATA_FILE = Path(__file__).resolve().parent / "data" / "word_bank.txt"
+
+
+class WordBank:
+    """Words indexed by ``frozenset(graphemes) -> pattern -> [words]``."""
+
+    def __init__(self, words: Iterable[str]) -> None:
+        self._index: Dict[frozenset, Dict[str, List[str]]] = defaultdict(lambda: defaultdict(list))
+        self.size = 0
+        for word in dict.fromkeys(w.strip().lower() for w in words if w.strip()):
+            self._index[frozenset(segment(word))][pattern(word)].append(word)
+            self.size += 1
+        self._lock = threading.Lock()
+        self.stats = {"queries": 0, "fallbacks": 0, "query_ms": 0.0, "max_query_ms": 0.0}
+        self._matches = lru_cache(maxsize=256)(self._matches_uncached)
+
+    @classmethod
+    def load(cls, path: Path = DATA_FILE) -> "WordBank":
+        lines = path.read_text(encoding="utf-8").splitlines()
+        return cls(line for line in lines if line.strip() and not line.startswith("#"))
+
+    def _matches_uncached(self, allowed: frozenset) -> tuple[tuple[str, str], ...]:
+        out: List[tuple[str, str]] = []
+        for graphemes, by_pattern in self._index.items():
+            if not graphemes <= allowed:
+                continue
+            for pat, words in by_pattern.items():
+                out.extend((word, pat) for word in words)
+        return tuple(out)
+
+    def select(
+        self,
+        allowed: Iterable[str],
+        focus: Iterable[str] = (),
+        patterns: Iterable[str] = (),
+        count: int = 8,
+    ) -> List[str]:
+        """Return up to ``count`` decodable words.
+
+        Words with focus graphemes come first, then words with one of the
+        requested ``patterns``.
+        """
+        t0 = time.perf_counter()
+        matches = self._matches(normalize_set(allowed))
+        focus_set = normalize_set(focus)
+        pattern_set = {p.strip() for p in patterns if p.strip()}
+        tiers: List[List[str]] = [[], [], [], []]
+        for word, pat in matches:
+            has_focus = bool(focus_set.intersection(segment(word)))
+            tiers[2 * (not has_focus) + (pat not in pattern_set)].append(word)
+        picked: List[str] = []
+        for tier in tiers:
+            if len(picked) >= count:
+                break
+            picked += random.sample(tier, min(count - len(picked), len(tier)))
+        random.shuffle(picked)
+        ms = (time.perf_counter() - t0) * 1000
+        with self._lock:
+            self.stats["queries"] += 1
+            self.stats["query_ms"] += ms
+            self.stats["max_query_ms"] = max(self.stats["max_query_ms"], ms)
+        return picked
+
+    def record_fallback(self) -> None:
+        """Count a query that needed GPT to top up the list."""
+        with self._lock:
+            self.stats["fallbacks"] += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            q = self.stats["queries"]
+            return {
+                "words": self.size,
+                "queries": q,
+                "fallbacks": self.stats["fallbacks"],
+                "fallback_rate": round(self.stats["fallbacks"] / q, 3) if q else None,
+                "avg_query_ms": round(self.stats["query_ms"] / q, 3) if q else None,
+                "max_query_ms": round(self.stats["max_query_ms"], 3),
+            }
+
+
+_bank: WordBank | None = None
+
+
+def bank() -> WordBank:
+    """Return the shared bank, loading the data file on first use."""
+    global _bank
+    if _bank is None:
+        _bank = WordBank.load()
+    return _bank